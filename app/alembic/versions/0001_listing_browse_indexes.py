@@ -0,0 +1,37 @@
+"""listing browse indexes
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+
+Baseline is the schema created by db/init_db.py before migrations existed.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    "ix_listings_active_created": ["is_active", "created_at", "id"],
+    "ix_listings_active_price": ["is_active", "price", "id"],
+    "ix_listings_category_active_created": ["category", "is_active", "created_at", "id"],
+    "ix_listings_category_active_price": ["category", "is_active", "price", "id"],
+    "ix_listings_vendor_active_created": ["vendor_id", "is_active", "created_at", "id"],
+}
+
+
+def upgrade() -> None:
+    for name, columns in INDEXES.items():
+        op.create_index(name, "listings", columns, if_not_exists=True)
+
+
+def downgrade() -> None:
+    for name in INDEXES:
+        op.drop_index(name, table_name="listings", if_exists=True)
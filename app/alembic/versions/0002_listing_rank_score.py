@@ -0,0 +1,40 @@
+"""listing rank score
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+
+Backfills recency only; run jobs/refresh_ranks.py afterwards to apply
+vendor plan and rating bonuses.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("listings") as batch_op:
+        batch_op.add_column(sa.Column("rank_score", sa.Float(), nullable=False, server_default="0"))
+
+    listings = sa.table("listings", sa.column("created_at", sa.DateTime), sa.column("rank_score", sa.Float))
+    op.execute(
+        listings.update().values(rank_score=sa.extract("epoch", listings.c.created_at) / 3600.0)
+    )
+
+    op.create_index("ix_listings_active_rank", "listings", ["is_active", "rank_score", "id"])
+    op.create_index("ix_listings_category_active_rank", "listings", ["category", "is_active", "rank_score", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_listings_category_active_rank", table_name="listings")
+    op.drop_index("ix_listings_active_rank", table_name="listings")
+    with op.batch_alter_table("listings") as batch_op:
+        batch_op.drop_column("rank_score")
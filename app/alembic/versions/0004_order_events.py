@@ -0,0 +1,38 @@
+"""order events
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+
+Log behind GET /orders/events; pruned by jobs/prune_order_events.py.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "order_events",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("order_id", sa.Integer(), sa.ForeignKey("orders.id"), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_order_events_user_id_id", "order_events", ["user_id", "id"])
+    op.create_index("ix_order_events_created_at", "order_events", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_order_events_created_at", table_name="order_events")
+    op.drop_index("ix_order_events_user_id_id", table_name="order_events")
+    op.drop_table("order_events")
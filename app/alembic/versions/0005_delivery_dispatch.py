@@ -0,0 +1,38 @@
+"""delivery dispatch
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+
+Tracking and claim columns used by services/delivery.py.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("delivery_requests") as batch_op:
+        batch_op.add_column(sa.Column("tracking_reference", sa.String(), nullable=True))
+        batch_op.add_column(sa.Column("created_at", sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column("dispatched_at", sa.DateTime(), nullable=True))
+
+    op.create_index("ix_delivery_requests_order_id", "delivery_requests", ["order_id"])
+    op.create_index("ix_delivery_requests_status_id", "delivery_requests", ["delivery_status", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_delivery_requests_status_id", table_name="delivery_requests")
+    op.drop_index("ix_delivery_requests_order_id", table_name="delivery_requests")
+    with op.batch_alter_table("delivery_requests") as batch_op:
+        batch_op.drop_column("dispatched_at")
+        batch_op.drop_column("created_at")
+        batch_op.drop_column("tracking_reference")
@@ -0,0 +1,52 @@
+"""order settlement
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+
+Adds shipped_at and settled_at for the escrow sweeper. Orders already
+delivered are treated as settled: confirm-delivery paid them out.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("orders") as batch_op:
+        batch_op.add_column(sa.Column("shipped_at", sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column("settled_at", sa.DateTime(), nullable=True))
+
+    orders = sa.table(
+        "orders",
+        sa.column("status", sa.String),
+        sa.column("ordered_at", sa.DateTime),
+        sa.column("delivered_at", sa.DateTime),
+        sa.column("settled_at", sa.DateTime),
+    )
+    op.execute(
+        orders.update()
+        .where(orders.c.status == "delivered")
+        .values(settled_at=sa.func.coalesce(orders.c.delivered_at, orders.c.ordered_at))
+    )
+
+    op.create_index(
+        "ix_orders_unsettled_status_id", "orders", ["status", "id"],
+        postgresql_where=sa.text("settled_at IS NULL"),
+        sqlite_where=sa.text("settled_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_orders_unsettled_status_id", table_name="orders")
+    with op.batch_alter_table("orders") as batch_op:
+        batch_op.drop_column("settled_at")
+        batch_op.drop_column("shipped_at")
@@ -0,0 +1,57 @@
+"""vendor sales rollups
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19
+
+Tables behind GET /vendors/me/dashboard; fill them with
+jobs/rebuild_vendor_sales.py after upgrading.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _money(name: str) -> sa.Column:
+    return sa.Column(name, sa.DECIMAL(14, 2), nullable=False, server_default="0")
+
+
+def _count(name: str) -> sa.Column:
+    return sa.Column(name, sa.Integer(), nullable=False, server_default="0")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "vendor_sales_summary",
+        sa.Column("vendor_id", sa.Integer(), sa.ForeignKey("vendors.id"), primary_key=True),
+        _count("orders"), _money("gross"), _money("escrow"), _money("payouts"),
+        _count("pending"), _count("confirmed"), _count("shipped"), _count("delivered"), _count("cancelled"),
+    )
+    op.create_table(
+        "vendor_daily_sales",
+        sa.Column("vendor_id", sa.Integer(), sa.ForeignKey("vendors.id"), primary_key=True),
+        sa.Column("day", sa.Date(), primary_key=True),
+        _count("orders"), _money("gross"), _money("payouts"),
+    )
+    op.create_table(
+        "vendor_listing_sales",
+        sa.Column("vendor_id", sa.Integer(), sa.ForeignKey("vendors.id"), primary_key=True),
+        sa.Column("listing_id", sa.Integer(), sa.ForeignKey("listings.id"), primary_key=True),
+        _count("orders"), _money("gross"),
+    )
+    op.create_index("ix_vendor_listing_sales_vendor_gross", "vendor_listing_sales", ["vendor_id", "gross"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_vendor_listing_sales_vendor_gross", table_name="vendor_listing_sales")
+    op.drop_table("vendor_listing_sales")
+    op.drop_table("vendor_daily_sales")
+    op.drop_table("vendor_sales_summary")
@@ -0,0 +1,51 @@
+"""order payouts
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19
+
+Stores what each settled order paid the seller. Plans seeded with the
+remittance rate as a fraction (0.92) are converted to the percentage
+(92.00) the rest of the code expects. Payouts already credited under the
+fractional rates are not re-credited here; run jobs/reconcile_payouts.py
+and jobs/rebuild_vendor_sales.py after upgrading.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same arithmetic as PayoutService: integer cents times basis points, half
+# up, in 64 bits (tests/test_payout.py keeps the two in step)
+BACKFILL = """
+    UPDATE orders SET payout = (
+        SELECT (CAST(ROUND(listings.price * 100) AS BIGINT)
+                * CAST(ROUND(vendor_plans.remittance_rate * 100) AS BIGINT) + 5000) / 10000 * 0.01
+        FROM listings
+        JOIN vendors ON vendors.id = listings.vendor_id
+        JOIN vendor_plans ON vendor_plans.id = vendors.plan_id
+        WHERE listings.id = orders.listing_id
+    )
+    WHERE settled_at IS NOT NULL
+"""
+
+
+def upgrade() -> None:
+    op.execute("UPDATE vendor_plans SET remittance_rate = remittance_rate * 100 WHERE remittance_rate <= 1")
+
+    with op.batch_alter_table("orders") as batch_op:
+        batch_op.add_column(sa.Column("payout", sa.DECIMAL(10, 2), nullable=True))
+
+    op.execute(BACKFILL)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("orders") as batch_op:
+        batch_op.drop_column("payout")
@@ -0,0 +1,40 @@
+"""vendor plan charges
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19
+
+One row per vendor and billing period, written by jobs/bill_subscriptions.py.
+Wallets get the user_id index that batched debits and credits look up by.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0009"
+down_revision: Union[str, None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "vendor_plan_charges",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("vendor_id", sa.Integer(), sa.ForeignKey("vendors.id"), nullable=False),
+        sa.Column("period", sa.Date(), nullable=False),
+        sa.Column("plan_id", sa.Integer(), sa.ForeignKey("vendor_plans.id"), nullable=False),
+        sa.Column("amount", sa.DECIMAL(10, 2), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.UniqueConstraint("vendor_id", "period", name="uq_vendor_plan_charges_vendor_period"),
+    )
+    op.create_index("ix_wallets_user_id", "wallets", ["user_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_wallets_user_id", table_name="wallets")
+    op.drop_table("vendor_plan_charges")
@@ -0,0 +1,68 @@
+"""order vendor and price snapshot
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19
+
+Copies the seller and the price paid onto orders so seller queries are
+single-table range scans on (vendor_id, ordered_at), and later listing
+price edits cannot change what settlement pays. Safe on a live table: the
+columns are added nullable (no rewrite), existing rows are backfilled
+BATCH_SIZE ids per committed transaction, and on Postgres the indexes are
+built CONCURRENTLY. Rerunning the backfill only touches rows still NULL.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0010"
+down_revision: Union[str, None] = "0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 10000
+
+# The price is what the buyer's payment recorded; the listing's price may
+# have been edited since
+BACKFILL = sa.text("""
+    UPDATE orders SET
+        vendor_id = (SELECT listings.vendor_id FROM listings WHERE listings.id = orders.listing_id),
+        price = COALESCE(
+            (SELECT payments.amount FROM payments WHERE payments.order_id = orders.id
+             ORDER BY payments.id LIMIT 1),
+            (SELECT listings.price FROM listings WHERE listings.id = orders.listing_id)
+        )
+    WHERE orders.id >= :low AND orders.id < :high AND orders.vendor_id IS NULL
+""")
+
+
+def _create_index(name: str, table: str, columns: list) -> None:
+    op.create_index(name, table, columns, if_not_exists=True, postgresql_concurrently=True)
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("orders") as batch_op:
+        batch_op.add_column(sa.Column("vendor_id", sa.Integer(), sa.ForeignKey("vendors.id", name="fk_orders_vendor_id"), nullable=True))
+        batch_op.add_column(sa.Column("price", sa.DECIMAL(10, 2), nullable=True))
+
+    # Outside the migration's transaction: each statement commits by itself,
+    # so no lock is held for longer than one batch
+    with op.get_context().autocommit_block():
+        _create_index("ix_payments_order_id", "payments", ["order_id"])
+        bind = op.get_bind()
+        low, high = bind.execute(sa.text("SELECT MIN(id), MAX(id) FROM orders")).one()
+        if low is not None:
+            for start in range(low, high + 1, BATCH_SIZE):
+                bind.execute(BACKFILL, {"low": start, "high": start + BATCH_SIZE})
+        _create_index("ix_orders_vendor_id_ordered_at", "orders", ["vendor_id", "ordered_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_orders_vendor_id_ordered_at", table_name="orders")
+    op.drop_index("ix_payments_order_id", table_name="payments")
+    with op.batch_alter_table("orders") as batch_op:
+        batch_op.drop_column("price")
+        batch_op.drop_column("vendor_id")
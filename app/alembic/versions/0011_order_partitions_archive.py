@@ -0,0 +1,211 @@
+"""order partitions and archive
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19
+
+Adds the cold *_archive tables that closed orders move to past
+ORDER_RETENTION_DAYS (jobs/archive_orders.py) and the (buyer_id,
+ordered_at) index behind /orders/my-purchases. On Postgres it also
+rebuilds orders, payments and reviews as tables partitioned by month
+(as services/partitions.py maintains them; the DDL is inlined here so the
+revision keeps doing what it did): every row is copied under an exclusive
+lock, so run it in a maintenance window. The foreign keys from payments,
+delivery_requests and order_events to orders are dropped, as Postgres
+cannot enforce them against a partitioned table. Downgrading moves
+archived orders back into the hot tables.
+"""
+from datetime import date, datetime
+from typing import List, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0011"
+down_revision: Union[str, None] = "0010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Table -> monthly range partition key
+PARTITIONED = {"orders": "ordered_at", "payments": "created_at", "reviews": "created_at"}
+MONTHS_AHEAD = 3  # empty partitions created past the current month
+MISSING_KEY = "1970-01-01"  # rows without a timestamp land in the default partition
+
+# (table, foreign key to orders.id) dropped by the partitioning
+ORDER_REFERENCES = (
+    ("payments", "payments_order_id_fkey"),
+    ("delivery_requests", "delivery_requests_order_id_fkey"),
+    ("order_events", "order_events_order_id_fkey"),
+)
+
+ARCHIVED = {
+    "orders": "id, buyer_id, listing_id, vendor_id, price, status, ordered_at, "
+              "shipped_at, delivered_at, settled_at, payout",
+    "payments": "id, order_id, amount, payment_method, status, created_at",
+    "delivery_requests": "id, order_id, dispatch_option, logistics_partner, delivery_status, "
+                         "confirmed_by_buyer, tracking_reference, created_at, dispatched_at",
+}
+
+
+def _next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def _is_partitioned(bind, table: str) -> bool:
+    return bind.execute(
+        sa.text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table)"), {"table": table}
+    ).first() is not None
+
+
+def _rebuild(bind, table: str, partitioned: bool) -> List[str]:
+    """Recreate ``table`` with or without monthly partitions, copying every row.
+
+    Indexes and outgoing foreign keys are recreated as they were; foreign
+    keys from other tables to this one are dropped and their names returned.
+    """
+    key = PARTITIONED[table]
+    old = f"{table}_old"
+    params = {"table": table}
+    indexes = bind.execute(sa.text("""
+        SELECT pg_indexes.indexname, pg_indexes.indexdef FROM pg_indexes
+        WHERE pg_indexes.schemaname = current_schema() AND pg_indexes.tablename = :table
+        AND NOT EXISTS (SELECT 1 FROM pg_constraint WHERE pg_constraint.conname = pg_indexes.indexname
+                        AND pg_constraint.conrelid = to_regclass(:table) AND pg_constraint.contype = 'p')
+    """), params).all()
+    foreign_keys = bind.execute(sa.text(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = to_regclass(:table) AND contype = 'f'"
+    ), params).all()
+    primary_key = bind.execute(sa.text(
+        "SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(:table) AND contype = 'p'"
+    ), params).scalar()
+    referencing = bind.execute(sa.text(
+        "SELECT conname, conrelid::regclass::text FROM pg_constraint "
+        "WHERE confrelid = to_regclass(:table) AND contype = 'f'"
+    ), params).all()
+    columns = bind.execute(sa.text(
+        "SELECT column_name FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = :table ORDER BY ordinal_position"
+    ), params).scalars().all()
+    sequence = bind.execute(sa.text("SELECT pg_get_serial_sequence(:table, 'id')"), params).scalar()
+
+    for name, child in referencing:
+        bind.execute(sa.text(f"ALTER TABLE {child} DROP CONSTRAINT {name}"))
+    # Index names are schema-wide: free them for the new table
+    if primary_key:
+        bind.execute(sa.text(f"ALTER TABLE {table} DROP CONSTRAINT {primary_key}"))
+    for name, _ in indexes:
+        bind.execute(sa.text(f"DROP INDEX {name}"))
+    bind.execute(sa.text(f"ALTER TABLE {table} RENAME TO {old}"))
+
+    if partitioned:
+        bind.execute(sa.text(f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS) PARTITION BY RANGE ({key})"))
+        bind.execute(sa.text(f"ALTER TABLE {table} ALTER COLUMN {key} SET NOT NULL"))
+        low, high = bind.execute(sa.text(f"SELECT MIN({key}), MAX({key}) FROM {old}")).one()
+        now = datetime.utcnow()
+        month = date((low or now).year, (low or now).month, 1)
+        last = max(high or now, now)
+        last = date(last.year, last.month, 1)
+        for _ in range(MONTHS_AHEAD):
+            last = _next_month(last)
+        bind.execute(sa.text(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT"))
+        while month <= last:
+            bind.execute(sa.text(
+                f"CREATE TABLE {table}_{month:%Y_%m} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month}') TO ('{_next_month(month)}')"
+            ))
+            month = _next_month(month)
+    else:
+        bind.execute(sa.text(f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS)"))
+        bind.execute(sa.text(f"ALTER TABLE {table} ALTER COLUMN {key} DROP NOT NULL"))
+
+    source = [f"COALESCE({column}, '{MISSING_KEY}')" if column == key else column for column in columns]
+    bind.execute(sa.text(f"INSERT INTO {table} ({', '.join(columns)}) SELECT {', '.join(source)} FROM {old}"))
+    if sequence:
+        bind.execute(sa.text(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id"))
+    bind.execute(sa.text(f"DROP TABLE {old}"))
+
+    bind.execute(sa.text(
+        f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY ({'id, ' + key if partitioned else 'id'})"
+    ))
+    for _, definition in indexes:
+        bind.execute(sa.text(definition))
+    for name, definition in foreign_keys:
+        bind.execute(sa.text(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}"))
+    return [name for name, _ in referencing]
+
+
+def upgrade() -> None:
+    op.create_index("ix_orders_buyer_id_ordered_at", "orders", ["buyer_id", "ordered_at"])
+
+    op.create_table(
+        "orders_archive",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("buyer_id", sa.Integer(), nullable=False),
+        sa.Column("listing_id", sa.Integer(), nullable=False),
+        sa.Column("vendor_id", sa.Integer(), nullable=True),
+        sa.Column("price", sa.DECIMAL(10, 2), nullable=True),
+        sa.Column("status", sa.String(), nullable=True),
+        sa.Column("ordered_at", sa.DateTime(), nullable=True),
+        sa.Column("shipped_at", sa.DateTime(), nullable=True),
+        sa.Column("delivered_at", sa.DateTime(), nullable=True),
+        sa.Column("settled_at", sa.DateTime(), nullable=True),
+        sa.Column("payout", sa.DECIMAL(10, 2), nullable=True),
+    )
+    op.create_index("ix_orders_archive_vendor_id_ordered_at", "orders_archive", ["vendor_id", "ordered_at"])
+    op.create_index("ix_orders_archive_buyer_id_ordered_at", "orders_archive", ["buyer_id", "ordered_at"])
+    op.create_index("ix_orders_archive_listing_id", "orders_archive", ["listing_id"])
+    op.create_index("ix_orders_archive_settled_at", "orders_archive", ["settled_at"])
+
+    op.create_table(
+        "payments_archive",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("order_id", sa.Integer(), nullable=False),
+        sa.Column("amount", sa.DECIMAL(10, 2), nullable=False),
+        sa.Column("payment_method", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_payments_archive_order_id", "payments_archive", ["order_id"])
+    op.create_index("ix_payments_archive_created_at", "payments_archive", ["created_at"])
+
+    op.create_table(
+        "delivery_requests_archive",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("order_id", sa.Integer(), nullable=False),
+        sa.Column("dispatch_option", sa.String(), nullable=False),
+        sa.Column("logistics_partner", sa.String(), nullable=True),
+        sa.Column("delivery_status", sa.String(), nullable=True),
+        sa.Column("confirmed_by_buyer", sa.Boolean(), nullable=True),
+        sa.Column("tracking_reference", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("dispatched_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_delivery_requests_archive_order_id", "delivery_requests_archive", ["order_id"])
+
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        for table in PARTITIONED:
+            if not _is_partitioned(bind, table):
+                _rebuild(bind, table, True)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        for table in PARTITIONED:
+            if _is_partitioned(bind, table):
+                _rebuild(bind, table, False)
+
+    for table, columns in ARCHIVED.items():
+        op.execute(f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {table}_archive")
+    if bind.dialect.name == "postgresql":
+        for table, name in ORDER_REFERENCES:
+            op.create_foreign_key(name, table, "orders", ["order_id"], ["id"])
+
+    op.drop_table("delivery_requests_archive")
+    op.drop_table("payments_archive")
+    op.drop_table("orders_archive")
+    op.drop_index("ix_orders_buyer_id_ordered_at", table_name="orders")
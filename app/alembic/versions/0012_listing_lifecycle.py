@@ -0,0 +1,141 @@
+"""listing lifecycle
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-19
+
+Replaces listings.is_active with a status (active, paused, sold or
+archived) and rebuilds the browse indexes as partial indexes over active
+listings only, so listings that are not for sale no longer bloat them.
+Existing rows are backfilled BATCH_SIZE ids per committed transaction:
+active stays active, inactive listings with a live order become sold and
+the rest paused. On Postgres the new indexes are built CONCURRENTLY before
+the old ones are dropped. Also adds listings_archive, where
+jobs/compact_listings.py moves long-archived listings, and the
+orders.listing_id index its checks use. Downgrading moves compacted
+listings back into listings.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0012"
+down_revision: Union[str, None] = "0011"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 10000
+
+BROWSABLE = "status = 'active'"
+
+BROWSE_INDEXES = {
+    "ix_listings_browse_created": ["created_at", "id"],
+    "ix_listings_browse_price": ["price", "id"],
+    "ix_listings_browse_rank": ["rank_score", "id"],
+    "ix_listings_category_browse_created": ["category", "created_at", "id"],
+    "ix_listings_category_browse_price": ["category", "price", "id"],
+    "ix_listings_category_browse_rank": ["category", "rank_score", "id"],
+    "ix_listings_vendor_browse_created": ["vendor_id", "created_at", "id"],
+}
+
+# Created by 0001 and 0002
+OLD_INDEXES = {
+    "ix_listings_active_created": ["is_active", "created_at", "id"],
+    "ix_listings_active_price": ["is_active", "price", "id"],
+    "ix_listings_category_active_created": ["category", "is_active", "created_at", "id"],
+    "ix_listings_category_active_price": ["category", "is_active", "price", "id"],
+    "ix_listings_vendor_active_created": ["vendor_id", "is_active", "created_at", "id"],
+    "ix_listings_active_rank": ["is_active", "rank_score", "id"],
+    "ix_listings_category_active_rank": ["category", "is_active", "rank_score", "id"],
+}
+
+BACKFILL = sa.text("""
+    UPDATE listings SET status = CASE
+        WHEN is_active THEN 'active'
+        WHEN EXISTS (SELECT 1 FROM orders WHERE orders.listing_id = listings.id AND orders.status != 'cancelled')
+          OR EXISTS (SELECT 1 FROM orders_archive WHERE orders_archive.listing_id = listings.id
+                     AND orders_archive.status != 'cancelled') THEN 'sold'
+        ELSE 'paused'
+    END
+    WHERE listings.id >= :low AND listings.id < :high
+""")
+
+COMPACTED = "id, vendor_id, title, description, price, item_condition, category, image_url, created_at, status_changed_at"
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("listings") as batch_op:
+        batch_op.add_column(sa.Column("status", sa.String(), nullable=False, server_default="active"))
+        batch_op.add_column(sa.Column("status_changed_at", sa.DateTime(), nullable=True))
+
+    op.create_table(
+        "listings_archive",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("vendor_id", sa.Integer(), nullable=False),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("price", sa.DECIMAL(10, 2), nullable=False),
+        sa.Column("item_condition", sa.String(), nullable=False),
+        sa.Column("category", sa.String(), nullable=False),
+        sa.Column("image_url", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("status_changed_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_listings_archive_vendor_id", "listings_archive", ["vendor_id"])
+
+    # Outside the migration's transaction, as in 0010
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        low, high = bind.execute(sa.text("SELECT MIN(id), MAX(id) FROM listings")).one()
+        if low is not None:
+            for start in range(low, high + 1, BATCH_SIZE):
+                bind.execute(BACKFILL, {"low": start, "high": start + BATCH_SIZE})
+
+        for name, columns in BROWSE_INDEXES.items():
+            op.create_index(
+                name, "listings", columns, if_not_exists=True, postgresql_concurrently=True,
+                postgresql_where=sa.text(BROWSABLE), sqlite_where=sa.text(BROWSABLE)
+            )
+        op.create_index("ix_listings_vendor_id_status", "listings", ["vendor_id", "status"],
+                        if_not_exists=True, postgresql_concurrently=True)
+        op.create_index(
+            "ix_listings_archived_changed", "listings", ["status_changed_at"],
+            if_not_exists=True, postgresql_concurrently=True,
+            postgresql_where=sa.text("status = 'archived'"), sqlite_where=sa.text("status = 'archived'")
+        )
+        # Postgres cannot build an index on a partitioned table concurrently
+        partitioned = bind.dialect.name == "postgresql" and bind.execute(sa.text(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('orders')"
+        )).first() is not None
+        op.create_index("ix_orders_listing_id", "orders", ["listing_id"], if_not_exists=True,
+                        postgresql_concurrently=not partitioned)
+
+    for name in OLD_INDEXES:
+        op.drop_index(name, table_name="listings", if_exists=True)
+    op.drop_column("listings", "is_active")
+
+
+def downgrade() -> None:
+    op.add_column("listings", sa.Column("is_active", sa.Boolean(), nullable=True))
+    # rank_score is not archived; 0 until jobs/refresh_ranks.py runs, which
+    # only matters for active listings anyway
+    op.execute(
+        f"INSERT INTO listings ({COMPACTED}, status, rank_score) "
+        f"SELECT {COMPACTED}, 'archived', 0 FROM listings_archive"
+    )
+    op.execute("UPDATE listings SET is_active = (status = 'active')")
+    for name, columns in OLD_INDEXES.items():
+        op.create_index(name, "listings", columns)
+
+    op.drop_index("ix_orders_listing_id", table_name="orders")
+    op.drop_index("ix_listings_archived_changed", table_name="listings")
+    op.drop_index("ix_listings_vendor_id_status", table_name="listings")
+    for name in BROWSE_INDEXES:
+        op.drop_index(name, table_name="listings")
+    op.drop_table("listings_archive")
+    with op.batch_alter_table("listings") as batch_op:
+        batch_op.drop_column("status_changed_at")
+        batch_op.drop_column("status")
@@ -0,0 +1,38 @@
+"""listing status change index
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-19
+
+Every worker's similar-listings index (services/similar.py) polls for
+listings whose status changed recently, so status_changed_at gets a full
+index, built CONCURRENTLY on Postgres. It replaces the partial index over
+archived listings that compaction used, which filters on the same column.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0013"
+down_revision: Union[str, None] = "0012"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index("ix_listings_status_changed_at", "listings", ["status_changed_at"],
+                        if_not_exists=True, postgresql_concurrently=True)
+        op.drop_index("ix_listings_archived_changed", table_name="listings", if_exists=True,
+                      postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_listings_archived_changed", "listings", ["status_changed_at"],
+        postgresql_where=sa.text("status = 'archived'"), sqlite_where=sa.text("status = 'archived'")
+    )
+    op.drop_index("ix_listings_status_changed_at", table_name="listings")
@@ -0,0 +1,48 @@
+"""listing recommendations
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-19
+
+Adds listing_recommendations, the per-buyer cache of personalized listings
+that jobs/build_recommendations.py fills, and an index on reviews.buyer_id
+so the build reads each chunk of buyers' reviews without a scan. On
+Postgres the index is built CONCURRENTLY unless reviews is partitioned.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0014"
+down_revision: Union[str, None] = "0013"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "listing_recommendations",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("listing_ids", sa.JSON(), nullable=False),
+        sa.Column("computed_at", sa.DateTime(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_listing_recommendations_expires_at", "listing_recommendations", ["expires_at"])
+
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        # Postgres cannot build an index on a partitioned table concurrently
+        partitioned = bind.dialect.name == "postgresql" and bind.execute(sa.text(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('reviews')"
+        )).first() is not None
+        op.create_index("ix_reviews_buyer_id", "reviews", ["buyer_id"], if_not_exists=True,
+                        postgresql_concurrently=not partitioned)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_reviews_buyer_id", table_name="reviews")
+    op.drop_index("ix_listing_recommendations_expires_at", table_name="listing_recommendations")
+    op.drop_table("listing_recommendations")
@@ -0,0 +1,30 @@
+"""auth session previous refresh hash
+
+Revision ID: 0015
+Revises: 0014
+Create Date: 2026-10-19
+
+Sessions keep the hash of the refresh secret they last rotated away, so a
+refresh that fails is only treated as token reuse (and revokes the
+session) when it presents that secret; other wrong secrets are refused
+without touching the session.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0015"
+down_revision: Union[str, None] = "0014"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("auth_sessions", sa.Column("previous_token_hash", sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("auth_sessions", "previous_token_hash")
@@ -0,0 +1,37 @@
+"""listing vendor price index
+
+Revision ID: 0016
+Revises: 0015
+Create Date: 2026-10-19
+
+A vendor's listings sorted by price had no index with vendor_id followed
+by price, so they were read through the vendor/created_at index and
+sorted. Adds the partial (vendor_id, price, id) browse index, built
+CONCURRENTLY on Postgres.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0016"
+down_revision: Union[str, None] = "0015"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BROWSABLE = "status = 'active'"
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_listings_vendor_browse_price", "listings", ["vendor_id", "price", "id"],
+            if_not_exists=True, postgresql_concurrently=True,
+            postgresql_where=sa.text(BROWSABLE), sqlite_where=sa.text(BROWSABLE)
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_listings_vendor_browse_price", table_name="listings")
@@ -0,0 +1,49 @@
+"""one live delivery request per order
+
+Revision ID: 0017
+Revises: 0016
+Create Date: 2026-10-19
+
+Delivery requests were kept to one live request per order only by a
+check before the insert, which two concurrent requests could both pass.
+A partial unique index on order_id, over requests that have not failed,
+now enforces it (built CONCURRENTLY on Postgres); failed requests stay
+out of it so a delivery can be requested again. Duplicates that already
+exist are marked failed first, keeping each order's earliest request.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0017"
+down_revision: Union[str, None] = "0016"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LIVE_DELIVERY = "delivery_status != 'failed'"
+
+DEDUPLICATE = f"""
+    UPDATE delivery_requests SET delivery_status = 'failed'
+    WHERE {LIVE_DELIVERY} AND EXISTS (
+        SELECT 1 FROM delivery_requests AS earlier
+        WHERE earlier.order_id = delivery_requests.order_id
+          AND earlier.{LIVE_DELIVERY} AND earlier.id < delivery_requests.id
+    )
+"""
+
+
+def upgrade() -> None:
+    op.execute(DEDUPLICATE)
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "uq_delivery_requests_live_order", "delivery_requests", ["order_id"], unique=True,
+            if_not_exists=True, postgresql_concurrently=True,
+            postgresql_where=sa.text(LIVE_DELIVERY), sqlite_where=sa.text(LIVE_DELIVERY)
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_delivery_requests_live_order", table_name="delivery_requests")
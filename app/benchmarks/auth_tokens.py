@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Compare per-request authentication costs.
+
+Usage:
+    python benchmarks/auth_tokens.py --database-url sqlite:///bench_auth.db --iterations 5000
+
+Seeds a small database (see benchmarks/seed.py) and times, per request:
+  * the previous path: jwt.decode, then load the user (and the vendor for
+    seller routes) from the database
+  * verifying a token with an empty cache, for HS256, RS256 and ES256 keys
+  * verifying a token already in the verified-token cache
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import time
+from datetime import timedelta
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.seed import SeedSizes, seed
+from config import settings
+from models import Base, User, Vendor
+from services.auth import AuthService
+from utils import token
+
+
+def private_pem(key) -> str:
+    return key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+
+
+def use_key(algorithm: str, private_key: str = ""):
+    settings.ALGORITHM = algorithm
+    settings.JWT_PRIVATE_KEY = private_key
+    token.key_ring.cache_clear()
+    token.token_cache.clear()
+
+
+def timed(name: str, iterations: int, fn):
+    start = time.perf_counter()
+    for i in range(iterations):
+        fn(i)
+    per_call = (time.perf_counter() - start) / iterations * 1e6
+    print(f"{name:44} {per_call:10.1f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///bench_auth.db")
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    seed(db, SeedSizes(users=2000, vendors=200, listings=1000, orders=0, reviews=0))
+    sellers = db.query(User).filter(User.user_type == "seller").limit(100).all()
+    n = args.iterations
+
+    print(f"{'path':44} {'per request':>13}")
+
+    use_key("HS256")
+    tokens = [AuthService.create_user_token(user) for user in sellers]
+
+    def decode_and_query(i):
+        payload = jwt.decode(tokens[i % len(tokens)], settings.SECRET_KEY, algorithms=["HS256"],
+                             leeway=timedelta(seconds=10))
+        user = db.query(User).filter(User.id == int(payload["sub"])).first()
+        db.query(Vendor).filter(Vendor.user_id == user.id).first()
+
+    timed("decode + user and vendor queries (before)", n, decode_and_query)
+
+    keys = [
+        ("HS256", ""),
+        ("RS256", private_pem(rsa.generate_private_key(public_exponent=65537, key_size=2048))),
+        ("ES256", private_pem(ec.generate_private_key(ec.SECP256R1()))),
+    ]
+    for algorithm, pem in keys:
+        use_key(algorithm, pem)
+        tokens = [AuthService.create_user_token(user) for user in sellers]
+
+        def cold(i):
+            token.token_cache.clear()
+            AuthService.get_token_claims(db, tokens[i % len(tokens)])
+
+        timed(f"claims, empty cache ({algorithm})", n, cold)
+
+    timed("claims, cached", n, lambda i: AuthService.get_token_claims(db, tokens[i % len(tokens)]))
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
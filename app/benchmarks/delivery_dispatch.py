@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Time dispatching a backlog of delivery requests, batched vs one call per order.
+
+Usage:
+    python benchmarks/delivery_dispatch.py --database-url sqlite:///bench_delivery.db --requests 5000 --latency 0.05
+
+Seeds orders, files one delivery request per order spread over --partners
+partners, then runs DeliveryService.dispatch_pending against fake partner
+clients that sleep --latency per call, once for each batch size. Reports
+partner calls and wall time for dispatch and for one tracking round.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///bench_delivery.db")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--partners", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per partner call")
+    parser.add_argument("--batch-sizes", default="1,100")
+    args = parser.parse_args()
+
+    # Settings (and the engine) are read at import time
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ["LOGISTICS_CLIENT"] = "fake"
+    from datetime import datetime
+    from sqlalchemy import insert
+    from db.session import engine, SessionLocal
+    from models import Base, DeliveryRequest, Order
+    from services.delivery import DeliveryService
+    from utils import logistics
+    from benchmarks.seed import SeedSizes, seed
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    seed(db, SeedSizes(users=2000, vendors=200, listings=args.requests * 2, orders=args.requests, reviews=0))
+    order_ids = [row[0] for row in db.query(Order.id).order_by(Order.id).limit(args.requests)]
+    partners = [f"partner{i}" for i in range(args.partners)]
+
+    for batch_size in [int(size) for size in args.batch_sizes.split(",")]:
+        db.query(DeliveryRequest).delete()
+        now = datetime.utcnow()
+        db.execute(insert(DeliveryRequest), [
+            {"order_id": order_id, "dispatch_option": "pickup", "logistics_partner": partners[i % len(partners)],
+             "delivery_status": "pending", "confirmed_by_buyer": False, "created_at": now}
+            for i, order_id in enumerate(order_ids)
+        ])
+        db.commit()
+        clients = {partner: logistics.FakeLogisticsClient(partner, latency=args.latency) for partner in partners}
+        logistics._clients.clear()
+        logistics._clients.update(clients)
+
+        started = time.perf_counter()
+        totals = DeliveryService.dispatch_pending(db, batch_size=batch_size)
+        dispatched = time.perf_counter() - started
+        calls = sum(client.calls for client in clients.values())
+
+        started = time.perf_counter()
+        updated = DeliveryService.sync_statuses(db, batch_size=batch_size)
+        tracked = time.perf_counter() - started
+        track_calls = sum(client.calls for client in clients.values()) - calls
+
+        print(f"batch size {batch_size:>4}: dispatched {totals.get('accepted', 0)} in {dispatched:.2f}s "
+              f"with {calls} partner calls; tracked {updated} updates in {tracked:.2f}s with {track_calls} calls")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Throughput and memory of the finance exports on a multi-million-row table.
+
+Usage:
+    python benchmarks/export_throughput.py --database-url sqlite:///bench_export.db --orders 2000000
+
+Seeds --orders orders (one payment each; most end up delivered and
+settled), then runs every report in every format in a fresh process each
+and reports rows/s, output size and peak RSS. Peak RSS should stay about
+the same as the row count grows; compare with --orders 200000.
+"""
+
+import sys
+import os
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(APP_DIR)
+
+import argparse
+import subprocess
+import tempfile
+
+
+def prepare(args):
+    os.environ["DATABASE_URL"] = args.database_url
+    from db.session import engine, SessionLocal
+    from models import Base
+    from benchmarks.seed import SeedSizes, seed
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        seed(db, SeedSizes(users=50000, vendors=2000, listings=max(100000, 2 * args.orders),
+                           orders=args.orders, reviews=0))
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///bench_export.db")
+    parser.add_argument("--orders", type=int, default=2000000)
+    parser.add_argument("--formats", default="csv,parquet")
+    args = parser.parse_args()
+
+    prepare(args)
+    env = dict(os.environ, DATABASE_URL=args.database_url)
+    with tempfile.TemporaryDirectory() as out_dir:
+        for report in ("payments", "payouts"):
+            for fmt in args.formats.split(","):
+                out = os.path.join(out_dir, f"{report}.{fmt}")
+                # A process per export so peak RSS is that export's alone
+                subprocess.run(
+                    [sys.executable, os.path.join(APP_DIR, "jobs", "export_report.py"), report,
+                     "--format", fmt, "--out", out],
+                    env=env, check=True
+                )
+                os.remove(out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Hold thousands of idle listing-feed connections and time one fan-out.
+
+Usage:
+    python benchmarks/feed_fanout.py --database-url sqlite:///bench_feed.db --connections 2000
+
+Starts uvicorn (one worker), records its memory, opens --connections SSE
+streams on GET /listings/feed spread over a few categories, records memory
+again, then updates one listing per category through the API and reports
+how long each subscriber took to receive its event. Linux only (reads the
+server's RSS from /proc).
+"""
+
+import sys
+import os
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import socket
+import subprocess
+import time
+
+import httpx
+
+CATEGORIES = ["electronics", "clothing", "furniture", "home"]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def prepare(database_url: str):
+    """Schema plus one seller with a listing in each category"""
+    os.environ["DATABASE_URL"] = database_url
+    from db.session import engine, SessionLocal
+    from models import Base, Listing, User, Vendor
+    from benchmarks.seed import SeedSizes, seed
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        seed(db, SeedSizes(users=200, vendors=20, listings=2000, orders=0, reviews=0))
+        seller = db.query(User).join(Vendor, Vendor.user_id == User.id).first()
+        listings = {}
+        for category in CATEGORIES:
+            listing = db.query(Listing).filter(
+                Listing.vendor_id == seller.vendor_profile.id, Listing.category == category
+            ).first()
+            if listing is None:
+                listing = Listing(vendor_id=seller.vendor_profile.id, title=f"feed {category}", description="",
+                                  price=10, item_condition="good", category=category, status="active",
+                                  created_at=seller.created_at)
+                db.add(listing)
+                db.commit()
+            listings[category] = listing.id
+        return seller.email, listings
+    finally:
+        db.close()
+
+
+async def run(port: int, args, email: str, listings: dict, server_pid: int):
+    base = f"http://127.0.0.1:{port}"
+    limits = httpx.Limits(max_connections=args.connections + 10, max_keepalive_connections=0)
+    ready = asyncio.Semaphore(0)
+    sent_at = {}
+    delays = []
+
+    async with httpx.AsyncClient(base_url=base, limits=limits, timeout=None) as client:
+        async def subscriber(i: int):
+            category = CATEGORIES[i % len(CATEGORIES)]
+            async with client.stream("GET", f"/listings/feed?category={category}") as response:
+                ready.release()
+                async for line in response.aiter_lines():
+                    if line.startswith("data:"):
+                        delays.append(time.perf_counter() - sent_at[category])
+                        return
+
+        before = rss_mb(server_pid)
+        started = time.perf_counter()
+        tasks = [asyncio.ensure_future(subscriber(i)) for i in range(args.connections)]
+        for _ in range(args.connections):
+            await ready.acquire()
+        opened = time.perf_counter() - started
+        await asyncio.sleep(1)
+        after = rss_mb(server_pid)
+        print(f"opened {args.connections} streams in {opened:.1f}s")
+        print(f"server RSS {before:.1f} MB -> {after:.1f} MB "
+              f"({(after - before) * 1024 / args.connections:.1f} KB per idle connection)")
+
+        async with httpx.AsyncClient(base_url=base) as api:
+            login = await api.post("/auth/login", json={"email": email, "password": args.password})
+            token = login.json()["access_token"]
+            headers = {"Authorization": f"Bearer {token}"}
+            for category, listing_id in listings.items():
+                sent_at[category] = time.perf_counter()
+                await api.put(f"/listings/{listing_id}", headers=headers, json={"price": "11.00"})
+
+        await asyncio.wait_for(asyncio.gather(*tasks), timeout=60)
+
+    delays.sort()
+    ms = [d * 1000 for d in delays]
+    print(f"delivered to {len(ms)} subscribers: p50 {ms[len(ms) // 2]:.1f} ms, "
+          f"p99 {ms[int(len(ms) * 0.99)]:.1f} ms, max {ms[-1]:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///bench_feed.db")
+    parser.add_argument("--connections", type=int, default=2000)
+    args = parser.parse_args()
+
+    email, listings = prepare(args.database_url)
+    from benchmarks.seed import PASSWORD
+    args.password = PASSWORD
+
+    port = free_port()
+    env = dict(os.environ, DATABASE_URL=args.database_url, RATE_LIMIT_ENABLED="false")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning",
+         "--limit-concurrency", str(args.connections + 100)],
+        env=env, cwd=ROOT_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                    break
+            except httpx.HTTPError:
+                time.sleep(0.1)
+        asyncio.run(run(port, args, email, listings, server.pid))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
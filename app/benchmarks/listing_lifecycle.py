@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Measure browse latency and index size as dead listings pile up.
+
+Usage:
+    python benchmarks/listing_lifecycle.py --rows 1000000 --dead 0.8 \
+        --database-url postgresql://.../bench_lifecycle
+
+Seeds ``--rows`` listings into an empty database (see benchmarks/seed.py)
+and marks a ``--dead`` fraction of them paused, sold or archived, the way a
+long-running marketplace skews. Every browse scenario of
+benchmarks/listing_query.py is then timed three times:
+
+  full        composite indexes over every listing with status as a key
+              column, the shape the is_active indexes had
+  partial     the partial browse indexes over active listings only
+  compacted   partial indexes after jobs/compact_listings.py moved listings
+              archived more than --compact-days ago to listings_archive
+
+with the size of the listings table and its browse indexes at each stage.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import time
+
+from sqlalchemy import create_engine, func, text
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.listing_query import SCENARIOS
+from benchmarks.seed import SeedSizes, seed
+from models import Base, Listing
+from services.archive import ArchiveService
+from services.listing_query import ListingQueryBuilder
+
+# Equality prefix + status + sort key, as the pre-lifecycle indexes were laid out
+FULL_INDEXES = {
+    "bench_full_created": ["status", "created_at", "id"],
+    "bench_full_price": ["status", "price", "id"],
+    "bench_full_rank": ["status", "rank_score", "id"],
+    "bench_full_category_created": ["category", "status", "created_at", "id"],
+    "bench_full_category_price": ["category", "status", "price", "id"],
+    "bench_full_category_rank": ["category", "status", "rank_score", "id"],
+    "bench_full_vendor_created": ["vendor_id", "status", "created_at", "id"],
+}
+
+BROWSE_INDEXES = [index for index in Listing.__table__.indexes if "_browse_" in index.name]
+
+# Share of dead listings in each state; archived ones keep their creation
+# time as status_changed_at, so most are old enough to compact
+DEAD_SPLIT = "CASE WHEN id % 10 < 5 THEN 'archived' WHEN id % 10 < 8 THEN 'sold' ELSE 'paused' END"
+
+
+def prepare(engine, rows: int, dead: float):
+    """Seed ``rows`` listings and kill a ``dead`` fraction of them"""
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    try:
+        sizes = SeedSizes(users=max(10000, rows // 50), vendors=1000, listings=rows, orders=0, reviews=0)
+        if not seed(db, sizes):
+            print(f"Reusing {db.query(func.count(Listing.id)).scalar()} existing listings")
+            return
+        # Spread over ids with a multiplicative hash so every category and vendor skews alike
+        db.execute(text(f"""
+            UPDATE listings SET status = {DEAD_SPLIT}, status_changed_at = created_at
+            WHERE (id * 2654435761) % 1000 < :dead
+        """), {"dead": int(dead * 1000)})
+        db.execute(text("UPDATE listings SET status = 'active', status_changed_at = NULL "
+                        "WHERE NOT ((id * 2654435761) % 1000 < :dead)"), {"dead": int(dead * 1000)})
+        db.commit()
+    finally:
+        db.close()
+
+
+def analyze(engine):
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE listings" if engine.dialect.name == "postgresql" else "ANALYZE"))
+
+
+def use_full_indexes(engine):
+    with engine.begin() as conn:
+        for index in BROWSE_INDEXES:
+            index.drop(conn, checkfirst=True)
+        for name, columns in FULL_INDEXES.items():
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON listings ({', '.join(columns)})"))
+
+
+def use_partial_indexes(engine):
+    with engine.begin() as conn:
+        for name in FULL_INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        for index in BROWSE_INDEXES:
+            index.create(conn, checkfirst=True)
+
+
+def sizes(engine) -> str:
+    """Listings table and browse index sizes in MB"""
+    names = list(FULL_INDEXES) + [index.name for index in BROWSE_INDEXES]
+    with engine.connect() as conn:
+        if engine.dialect.name == "postgresql":
+            size = lambda name: conn.execute(text("SELECT pg_relation_size(to_regclass(:name))"), {"name": name}).scalar()
+        else:
+            try:
+                conn.execute(text("SELECT 1 FROM dbstat LIMIT 1"))
+            except Exception:
+                return "sizes need Postgres or SQLite built with dbstat"
+            size = lambda name: conn.execute(text("SELECT SUM(pgsize) FROM dbstat WHERE name = :name"), {"name": name}).scalar()
+        indexes = sum(size(name) or 0 for name in names)
+        rows = conn.execute(text("SELECT COUNT(*) FROM listings")).scalar()
+        return f"{rows} rows, table {size('listings') / 1e6:.1f} MB, browse indexes {indexes / 1e6:.1f} MB"
+
+
+def timings(engine, repeats: int) -> dict:
+    """p50 milliseconds per scenario"""
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    try:
+        result = {}
+        for name, params in SCENARIOS.items():
+            query = ListingQueryBuilder(**params).build(db)
+            query.all()  # warm the cache
+            samples = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                query.all()
+                samples.append((time.perf_counter() - start) * 1000)
+            samples.sort()
+            result[name] = samples[len(samples) // 2]
+        return result
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///bench_lifecycle.db")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--dead", type=float, default=0.8, help="fraction of listings not for sale")
+    parser.add_argument("--compact-days", type=int, default=90)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(bind=engine)
+    prepare(engine, args.rows, args.dead)
+
+    stages = {}
+    use_full_indexes(engine)
+    analyze(engine)
+    print(f"full:      {sizes(engine)}")
+    stages["full"] = timings(engine, args.repeats)
+
+    use_partial_indexes(engine)
+    analyze(engine)
+    print(f"partial:   {sizes(engine)}")
+    stages["partial"] = timings(engine, args.repeats)
+
+    db = sessionmaker(bind=engine)()
+    try:
+        summary = ArchiveService.compact_listings(db, args.compact_days)
+    finally:
+        db.close()
+    print(f"Compacted {summary['listings']} listings in {summary['seconds']:.1f}s "
+          f"({summary['listings'] / max(summary['seconds'], 1e-9):.0f}/s)")
+    analyze(engine)
+    print(f"compacted: {sizes(engine)}")
+    stages["compacted"] = timings(engine, args.repeats)
+
+    print(f"\n{'scenario (p50 ms)':32}" + "".join(f"{stage:>11}" for stage in stages))
+    for name in SCENARIOS:
+        print(f"{name:32}" + "".join(f"{stages[stage][name]:11.2f}" for stage in stages))
+
+
+if __name__ == "__main__":
+    main()
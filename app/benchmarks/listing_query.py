@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark the listing browse planner against a large seeded table.
+
+Usage:
+    python benchmarks/listing_query.py --rows 1000000 --database-url sqlite:///bench_listings.db
+
+Seeds ``--rows`` listings into an empty database (see benchmarks/seed.py), then
+times every browse scenario the query builder accepts and prints the plan the
+database actually chose next to the index the builder was shaped for.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import time
+from decimal import Decimal
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine, func, text
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.seed import SeedSizes, seed
+from models import Base, Listing
+from services.listing_query import ListingQueryBuilder
+
+SCENARIOS = {
+    "ranked": dict(),
+    "category ranked": dict(category="furniture"),
+    "newest": dict(sort="newest"),
+    "category newest": dict(category="furniture", sort="newest"),
+    "category price_asc": dict(category="furniture", sort="price_asc"),
+    "price range newest": dict(price_min=Decimal("10"), price_max=Decimal("50")),
+    "price range price_desc": dict(price_min=Decimal("10"), price_max=Decimal("50"), sort="price_desc"),
+    "conditions category": dict(category="books", conditions=["new", "like_new"]),
+    "vendor ranked": dict(vendor_id=1),
+    "vendor price_asc": dict(vendor_id=1, sort="price_asc"),
+    "search newest in category": dict(search="lamp", category="home", sort="newest"),
+    "search relevance in category": dict(search="lamp", category="home", sort="relevance"),
+    "deep page": dict(category="toys", skip=1000),
+}
+
+REJECTED = {
+    "relevance without search": dict(sort="relevance"),
+    "relevance without narrowing": dict(search="lamp", sort="relevance"),
+    "search without narrowing": dict(search="lamp", sort="newest"),
+    "offset past limit": dict(skip=100000),
+}
+
+
+def prepare(engine, rows: int):
+    """Seed an empty database with ``rows`` listings via benchmarks/seed.py"""
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    try:
+        sizes = SeedSizes(users=max(10000, rows // 50), vendors=1000, listings=rows, orders=0, reviews=0)
+        if not seed(db, sizes):
+            print(f"Reusing {db.query(func.count(Listing.id)).scalar()} existing listings")
+            return
+        # Fresh planner statistics so the plans below reflect the data
+        db.execute(text("ANALYZE"))
+        db.commit()
+    finally:
+        db.close()
+
+
+def explain(db, query) -> str:
+    """Return the database's plan for ``query`` on one line"""
+    compiled = query.statement.compile(db.bind, compile_kwargs={"literal_binds": True})
+    if db.bind.dialect.name == "sqlite":
+        rows = db.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).fetchall()
+        return " | ".join(row[-1] for row in rows)
+    rows = db.execute(text(f"EXPLAIN {compiled}")).fetchall()
+    return " | ".join(row[0].strip() for row in rows[:3])
+
+
+def run(engine, repeats: int):
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    try:
+        print(f"\n{'scenario':32} {'planned index':38} {'p50 ms':>8} {'max ms':>8}")
+        for name, params in SCENARIOS.items():
+            builder = ListingQueryBuilder(**params)
+            query = builder.build(db)
+            timings = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                query.all()
+                timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            print(f"{name:32} {builder.plan:38} {timings[len(timings) // 2]:8.2f} {timings[-1]:8.2f}")
+            print(f"    plan: {explain(db, query)}")
+
+        print("\nRejected before reaching the database:")
+        for name, params in REJECTED.items():
+            try:
+                ListingQueryBuilder(**params)
+                print(f"  {name}: NOT rejected")
+            except HTTPException as e:
+                print(f"  {name}: {e.detail}")
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///bench_listings.db")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(bind=engine)
+    prepare(engine, args.rows)
+    run(engine, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Mixed-workload benchmark across every router.
+
+Usage:
+    python benchmarks/load.py --database-url sqlite:///bench_load.db --requests 5000
+    python benchmarks/load.py --output before.json
+    python benchmarks/load.py --baseline before.json --threshold 20
+
+Seeds realistic volumes on first use (see benchmarks/seed.py), then drives
+a weighted mix of /auth, /users, /listings, /orders, /wallets, /reviews and
+/vendors requests in-process through httpx's ASGI transport. For every
+endpoint it reports throughput, p50/p95/p99 latency and SQL statements
+per request.
+
+With --baseline, results are compared against an earlier --output file and
+the script exits 1 when any endpoint's p95 grows by more than --threshold
+percent or it issues more queries per request than before.
+"""
+
+import sys
+import os
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(APP_DIR))
+sys.path.insert(0, APP_DIR)
+
+import argparse
+import asyncio
+import contextvars
+import json
+import random
+import time
+from collections import defaultdict
+
+import httpx
+
+# Per-request SQL statement counter; a mutable cell so worker threads that
+# copy the context still increment the same object
+_query_count = contextvars.ContextVar("query_count", default=None)
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+class Workload:
+    """Request mix and the fixtures it draws from"""
+
+    def __init__(self, db, rng: random.Random, sample: int = 200):
+        from models import User, Listing, Order
+        from services.auth import AuthService
+
+        self.rng = rng
+        buyers = db.query(User).filter(User.user_type == "buyer").limit(sample).all()
+        sellers = db.query(User).filter(User.user_type == "seller").limit(sample).all()
+        self.buyer_tokens = [AuthService.create_user_token(user) for user in buyers]
+        self.seller_tokens = [AuthService.create_user_token(user) for user in sellers]
+        self.login_emails = [user.email for user in sellers]
+        self.vendor_ids = [user.vendor_profile.id for user in sellers]
+        self.listing_ids = [row[0] for row in db.query(Listing.id).filter(Listing.status == "active").limit(5000)]
+        self.categories = [row[0] for row in db.query(Listing.category).distinct()]
+        # Each listing can be bought once, after which it 404s; keep the two pools apart
+        self.purchasable = self.listing_ids[len(self.listing_ids) // 2:]
+        self.listing_ids = self.listing_ids[:len(self.listing_ids) // 2]
+        rng.shuffle(self.purchasable)
+
+        # Confirmed orders each sampled seller may move to "shipped"
+        self.confirmed = defaultdict(list)
+        seller_index = {vendor_id: i for i, vendor_id in enumerate(self.vendor_ids)}
+        rows = db.query(Order.id, Order.vendor_id) \
+            .filter(Order.status == "confirmed", Order.vendor_id.in_(self.vendor_ids)).all()
+        for order_id, vendor_id in rows:
+            self.confirmed[seller_index[vendor_id]].append(order_id)
+
+        # name -> (weight, request factory)
+        self.scenarios = {
+            "GET /listings": (25, self.browse),
+            "GET /listings?category&sort": (10, self.browse_filtered),
+            "GET /listings/{id}": (15, self.listing_detail),
+            "GET /users/me": (4, self.me),
+            "GET /wallets/me": (8, self.wallet),
+            "POST /wallets/topup": (2, self.topup),
+            "POST /orders": (4, self.create_order),
+            "GET /orders/my-purchases": (6, self.my_purchases),
+            "GET /orders/my-sales": (3, self.my_sales),
+            "PUT /orders/{id}/status": (2, self.ship_order),
+            "POST /orders/ship": (1, self.ship_orders),
+            "GET /reviews/vendor/{id}": (5, self.vendor_reviews),
+            "GET /reviews/my-reviews": (2, self.my_reviews),
+            "GET /vendors/plans": (3, self.vendor_plans),
+            "GET /vendors/me": (3, self.vendor_me),
+            "POST /auth/login": (1, self.login),
+        }
+        self.names = list(self.scenarios)
+        self.weights = [weight for weight, _ in self.scenarios.values()]
+
+    def _buyer(self):
+        return {"Authorization": f"Bearer {self.rng.choice(self.buyer_tokens)}"}
+
+    def _seller(self, index=None):
+        index = self.rng.randrange(len(self.seller_tokens)) if index is None else index
+        return {"Authorization": f"Bearer {self.seller_tokens[index]}"}
+
+    def pick(self) -> str:
+        return self.rng.choices(self.names, weights=self.weights)[0]
+
+    def browse(self):
+        return "GET", "/listings", {}
+
+    def browse_filtered(self):
+        sort = self.rng.choice(["newest", "price_asc", "price_desc"])
+        return "GET", f"/listings?category={self.rng.choice(self.categories)}&sort={sort}", {}
+
+    def listing_detail(self):
+        return "GET", f"/listings/{self.rng.choice(self.listing_ids)}", {}
+
+    def me(self):
+        return "GET", "/users/me", {"headers": self._buyer()}
+
+    def wallet(self):
+        return "GET", "/wallets/me", {"headers": self._buyer()}
+
+    def topup(self):
+        return "POST", "/wallets/topup", {"headers": self._buyer(), "json": {"amount": "25.00"}}
+
+    def create_order(self):
+        if not self.purchasable:
+            return self.my_purchases()
+        return "POST", "/orders", {"headers": self._buyer(), "json": {"listing_id": self.purchasable.pop()}}
+
+    def my_purchases(self):
+        return "GET", "/orders/my-purchases", {"headers": self._buyer()}
+
+    def my_sales(self):
+        return "GET", "/orders/my-sales", {"headers": self._seller()}
+
+    def ship_order(self):
+        candidates = [index for index, orders in self.confirmed.items() if orders]
+        if not candidates:
+            return self.my_sales()
+        index = self.rng.choice(candidates)
+        order_id = self.confirmed[index].pop()
+        return "PUT", f"/orders/{order_id}/status", {"headers": self._seller(index), "json": {"status": "shipped"}}
+
+    def ship_orders(self):
+        candidates = [index for index, orders in self.confirmed.items() if orders]
+        if not candidates:
+            return self.my_sales()
+        index = self.rng.choice(candidates)
+        order_ids = [self.confirmed[index].pop() for _ in range(min(20, len(self.confirmed[index])))]
+        return "POST", "/orders/ship", {"headers": self._seller(index), "json": {"order_ids": order_ids}}
+
+    def vendor_reviews(self):
+        return "GET", f"/reviews/vendor/{self.rng.choice(self.vendor_ids)}", {}
+
+    def my_reviews(self):
+        return "GET", "/reviews/my-reviews", {"headers": self._buyer()}
+
+    def vendor_plans(self):
+        return "GET", "/vendors/plans", {}
+
+    def vendor_me(self):
+        return "GET", "/vendors/me", {"headers": self._seller()}
+
+    def login(self):
+        from benchmarks.seed import PASSWORD
+        return "POST", "/auth/login", {"json": {"email": self.rng.choice(self.login_emails), "password": PASSWORD}}
+
+
+async def drive(app, workload: Workload, total: int, concurrency: int, warmup: int):
+    """Run ``warmup`` unrecorded requests, then ``total`` recorded ones"""
+    stats = defaultdict(lambda: {"latencies": [], "queries": [], "errors": 0})
+    remaining = {"warmup": warmup, "total": total}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def worker():
+            while True:
+                if remaining["warmup"] > 0:
+                    remaining["warmup"] -= 1
+                    record = False
+                elif remaining["total"] > 0:
+                    remaining["total"] -= 1
+                    record = True
+                else:
+                    return
+
+                name = workload.pick()
+                method, url, kwargs = workload.scenarios[name][1]()
+                cell = [0]
+                token = _query_count.set(cell)
+                start = time.perf_counter()
+                try:
+                    response = await client.request(method, url, **kwargs)
+                    failed = response.status_code >= 400
+                except Exception:
+                    failed = True
+                elapsed = (time.perf_counter() - start) * 1000
+                _query_count.reset(token)
+
+                if record:
+                    stats[name]["latencies"].append(elapsed)
+                    stats[name]["queries"].append(cell[0])
+                    stats[name]["errors"] += failed
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return stats, time.perf_counter() - started
+
+
+def summarize(stats, elapsed: float) -> dict:
+    results = {}
+    for name, data in sorted(stats.items()):
+        latencies = sorted(data["latencies"])
+        results[name] = {
+            "count": len(latencies),
+            "rps": len(latencies) / elapsed,
+            "p50": percentile(latencies, 0.50),
+            "p95": percentile(latencies, 0.95),
+            "p99": percentile(latencies, 0.99),
+            "queries": sum(data["queries"]) / len(latencies),
+            "errors": data["errors"],
+        }
+    return results
+
+
+def report(results: dict, elapsed: float):
+    total = sum(r["count"] for r in results.values())
+    print(f"\n{total} requests in {elapsed:.1f}s ({total / elapsed:.0f} req/s)\n")
+    print(f"{'endpoint':32} {'count':>6} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'q/req':>6} {'errors':>6}")
+    for name, r in results.items():
+        print(f"{name:32} {r['count']:6} {r['rps']:7.1f} {r['p50']:8.2f} {r['p95']:8.2f} "
+              f"{r['p99']:8.2f} {r['queries']:6.1f} {r['errors']:6}")
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Describe every endpoint that regressed against ``baseline``"""
+    regressions = []
+    for name, r in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if base["p95"] and r["p95"] > base["p95"] * (1 + threshold / 100):
+            regressions.append(f"{name}: p95 {base['p95']:.2f} -> {r['p95']:.2f} ms")
+        # Fractional counts come from mixed code paths; allow half a query of noise
+        if r["queries"] > base["queries"] + 0.5:
+            regressions.append(f"{name}: queries/request {base['queries']:.1f} -> {r['queries']:.1f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///bench_load.db")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--vendors", type=int, default=1000)
+    parser.add_argument("--listings", type=int, default=100000)
+    parser.add_argument("--orders", type=int, default=50000)
+    parser.add_argument("--reviews", type=int, default=20000)
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--baseline", help="JSON from an earlier --output run to compare against")
+    parser.add_argument("--threshold", type=float, default=20.0, help="allowed p95 growth in percent")
+    args = parser.parse_args()
+
+    # Settings (and the engine) are read at import time
+    os.environ["DATABASE_URL"] = args.database_url
+    # Every request comes from one client address; measure the app, not the limiter
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    from sqlalchemy import event
+    from app.main import app
+    from db.session import engine, SessionLocal
+    from models import Base
+    from benchmarks.seed import SeedSizes, seed, counts
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        seed(db, SeedSizes(args.users, args.vendors, args.listings, args.orders, args.reviews), seed=args.seed)
+        print("Rows:", counts(db))
+        workload = Workload(db, random.Random(args.seed))
+    finally:
+        db.close()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_query(conn, cursor, statement, parameters, context, executemany):
+        cell = _query_count.get()
+        if cell is not None:
+            cell[0] += 1
+
+    stats, elapsed = asyncio.run(drive(app, workload, args.requests, args.concurrency, args.warmup))
+    results = summarize(stats, elapsed)
+    report(results, elapsed)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print("\nRegressions:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.threshold:.0f}% p95 or added queries")
+
+
+if __name__ == "__main__":
+    main()
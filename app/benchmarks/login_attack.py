@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Measure the cost of a credential-stuffing attack on POST /auth/login.
+
+Usage:
+    python benchmarks/login_attack.py --database-url sqlite:///bench_login.db --attempts 200
+
+Replays the same attack with the login rate limiter off and on, and prints
+wall time, CPU seconds burned by the API process, SQL statements issued and
+response codes. Two patterns are driven in-process through httpx:
+  * stuffing: a few source IPs cycling through many emails
+  * spray:    many source IPs hammering a handful of real accounts
+
+It also compares mean response time for unknown emails against known
+emails with a wrong password, which should match.
+
+Limiter state is cleared between runs, so the benchmark uses the in-process
+'fake' backend unless told otherwise; against a real Redis (--backend redis)
+it only runs with --allow-shared-redis, and then deletes only keys under
+the limiter's prefix.
+"""
+
+import sys
+import os
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(APP_DIR))
+sys.path.insert(0, APP_DIR)
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from collections import Counter
+
+import httpx
+
+
+def stuffing(rng: random.Random, attempts: int, emails: list):
+    ips = [f"203.0.113.{i}" for i in range(1, 4)]
+    return [(rng.choice(ips), rng.choice(emails)) for _ in range(attempts)]
+
+
+def spray(rng: random.Random, attempts: int, emails: list):
+    targets = emails[:3]
+    return [(f"198.51.{i // 250}.{i % 250 + 1}", rng.choice(targets)) for i in range(attempts)]
+
+
+async def attack(app, attempts, concurrency: int) -> Counter:
+    codes = Counter()
+    queue = list(attempts)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def worker():
+            while queue:
+                ip, email = queue.pop()
+                response = await client.post(
+                    "/auth/login", json={"email": email, "password": "wrong-password"},
+                    headers={"X-Forwarded-For": ip},
+                )
+                codes[response.status_code] += 1
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return codes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///bench_login.db")
+    parser.add_argument("--attempts", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--timing-samples", type=int, default=20)
+    parser.add_argument("--backend", choices=("fake", "memory", "redis"), default="fake")
+    parser.add_argument("--allow-shared-redis", action="store_true",
+                        help="run against RATE_LIMIT_REDIS_URL, clearing its rate limit keys between runs")
+    args = parser.parse_args()
+    if args.backend == "redis" and not args.allow_shared_redis:
+        parser.error("--backend redis clears rate limit keys on a shared server; pass --allow-shared-redis to confirm")
+
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ["RATE_LIMIT_BACKEND"] = args.backend
+    os.environ["RATE_LIMIT_TRUST_FORWARDED"] = "true"  # vary the source IP per request
+    from sqlalchemy import event
+    from app.main import app
+    from config import settings
+    from db.session import engine, SessionLocal
+    from models import Base, User
+    from benchmarks.seed import SeedSizes, seed
+    from services.auth import AuthService
+    from utils import rate_limit
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        seed(db, SeedSizes(users=2000, vendors=200, listings=1000, orders=0, reviews=0))
+        real = [row[0] for row in db.query(User.email).limit(50)]
+    finally:
+        db.close()
+
+    queries = [0]
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_query(conn, cursor, statement, parameters, context, executemany):
+        queries[0] += 1
+
+    rng = random.Random(42)
+    emails = real + [f"nobody{i}@bench.example.com" for i in range(200)]
+
+    print(f"{'pattern':10} {'limiter':8} {'wall s':>8} {'cpu s':>8} {'queries':>8}  responses")
+    for pattern in (stuffing, spray):
+        attempts = pattern(rng, args.attempts, emails)
+        for enabled in (False, True):
+            settings.RATE_LIMIT_ENABLED = enabled
+            rate_limit.backend().clear()
+            queries[0] = 0
+            wall, cpu = time.perf_counter(), time.process_time()
+            codes = asyncio.run(attack(app, attempts, args.concurrency))
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            print(f"{pattern.__name__:10} {'on' if enabled else 'off':8} {wall:8.2f} {cpu:8.2f} "
+                  f"{queries[0]:8}  {dict(sorted(codes.items()))}")
+
+    # Existence leak check: same work for unknown and known accounts
+    db = SessionLocal()
+    try:
+        for label, pool in (("known email, wrong password", real), ("unknown email", emails[len(real):])):
+            samples = []
+            for email in pool[:args.timing_samples]:
+                start = time.perf_counter()
+                AuthService.authenticate_user(db, email, "wrong-password")
+                samples.append((time.perf_counter() - start) * 1000)
+            print(f"{label:28} mean {statistics.mean(samples):7.1f} ms")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
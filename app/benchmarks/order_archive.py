@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Order archival: hot-table size, paged order queries and exports before and
+after moving closed orders out.
+
+Usage:
+    python benchmarks/order_archive.py --database-url postgresql://... --orders 1000000 --retention-days 90
+
+Seeds a year of orders (on Postgres the tables are first partitioned by
+month), times the first and a deep page of /orders/my-sales for the
+busiest vendor and a page of /orders/my-purchases, archives every closed
+order older than --retention-days, then times the same pages again. The
+payouts export must return the same rows before and after.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import time
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def peak_rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///bench_order_archive.db")
+    parser.add_argument("--orders", type=int, default=1000000)
+    parser.add_argument("--retention-days", type=int, default=90)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    # Settings (and the engine) are read at import time
+    os.environ["DATABASE_URL"] = args.database_url
+    from datetime import datetime, timedelta
+    from sqlalchemy import func, text
+    from db.session import engine, SessionLocal
+    from models import Base, Order, OrderArchive
+    from services.archive import ArchiveService
+    from services.export import ExportService
+    from services.order import OrderService
+    from services.partitions import PartitionService, PARTITIONED
+    from services.settlement import SettlementService
+    from benchmarks.seed import SeedSizes, seed
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    seed(db, SeedSizes(users=20000, vendors=1000, listings=max(100000, 2 * args.orders),
+                       orders=args.orders, reviews=0))
+    if PartitionService.enabled(engine):
+        start = time.perf_counter()
+        with engine.begin() as connection:
+            for table in PARTITIONED:
+                PartitionService.partition(connection, table)
+        print(f"partitioned {', '.join(PARTITIONED)} in {time.perf_counter() - start:.1f}s")
+
+    def hot_size() -> str:
+        rows = db.query(func.count(Order.id)).scalar()
+        if not PartitionService.enabled(engine):
+            return f"{rows} rows"
+        size = db.execute(text(
+            "SELECT SUM(pg_total_relation_size(inhrelid)) FROM pg_inherits WHERE inhparent = 'orders'::regclass"
+        )).scalar()
+        partitions = len(PartitionService.months(db.connection(), "orders"))
+        return f"{rows} rows, {size / 2**20:.0f} MB in {partitions} monthly partitions"
+
+    vendor_id, buyer_id = (
+        db.query(column).group_by(column).order_by(func.count(Order.id).desc()).limit(1).scalar()
+        for column in (Order.vendor_id, Order.buyer_id)
+    )
+    deep = datetime.utcnow() - timedelta(days=args.retention_days // 2)
+    pages = {
+        "my-sales first page": lambda: OrderService.page(db, Order.vendor_id == vendor_id),
+        f"my-sales page at -{args.retention_days // 2}d": lambda: OrderService.page(db, Order.vendor_id == vendor_id, deep),
+        "my-purchases first page": lambda: OrderService.page(db, Order.buyer_id == buyer_id),
+    }
+
+    def report(label: str):
+        print(f"{label}: {hot_size()}")
+        for name, page in pages.items():
+            ms = timed(lambda: (page(), db.expunge_all()), args.repeat)
+            print(f"  {name:<28} {ms:8.2f} ms")
+
+    def payouts_export() -> int:
+        stats = {}
+        for _ in ExportService.stream("payouts", "csv", stats=stats):
+            pass
+        return stats["rows"]
+
+    # Seeded statuses ignore age: close what would long since have been
+    # closed, shipped orders by the escrow sweeper and the rest cancelled
+    cutoff = datetime.utcnow() - timedelta(days=args.retention_days)
+    SettlementService.sweep(db)
+    db.query(Order).filter(
+        Order.ordered_at < cutoff, Order.status.in_(("pending", "confirmed"))
+    ).update({"status": "cancelled"}, synchronize_session=False)
+    db.commit()
+
+    report("before archiving")
+    exported = payouts_export()
+    db.commit()
+
+    with open("/proc/self/clear_refs", "w") as f:
+        f.write("5")  # Linux: peak RSS of the archival alone, not of seeding
+    result = ArchiveService.run(db, args.retention_days)
+    print(f"archived {result['orders']} orders in {result['chunks']} chunks and {result['seconds']:.1f}s "
+          f"({result['orders'] / max(result['seconds'], 1e-9):.0f} orders/s), "
+          f"dropped {result['partitions_dropped']} empty partitions; peak RSS {peak_rss_mb():.0f} MB")
+    report("after archiving")
+    print(f"archive: {db.query(func.count(OrderArchive.id)).scalar()} orders; "
+          f"payouts export rows before/after: {exported}/{payouts_export()}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
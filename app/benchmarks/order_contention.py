@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Stress test: many buyers racing for one listing.
+
+Usage:
+    python benchmarks/order_contention.py --database-url sqlite:///bench_contention.db --buyers 50 --rounds 20
+
+Each round releases --buyers threads at once, each with its own session,
+into OrderService.create_order for the same listing. Afterwards it checks
+that exactly one order and one wallet debit exist for the listing, and
+reports outcomes and latency (a long tail would mean buyers queued on
+locks instead of being turned away). Finally every winner cancels, which
+must return each buyer's balance, mark the payments refunded and put the
+listings back on sale.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import threading
+import time
+from collections import Counter
+from decimal import Decimal
+
+from fastapi import HTTPException
+from sqlalchemy import func
+
+
+def race(Session, listing_id: int, buyer_ids, outcomes: Counter, latencies: list):
+    from services.order import OrderService
+    from utils.token import TokenClaims
+
+    barrier = threading.Barrier(len(buyer_ids))
+    lock = threading.Lock()
+
+    def buyer(user_id: int):
+        db = Session()
+        claims = TokenClaims(user_id=user_id, user_type="buyer")
+        barrier.wait()
+        start = time.perf_counter()
+        try:
+            OrderService.create_order(db, claims, listing_id)
+            outcome = "ordered"
+        except HTTPException as e:
+            outcome = str(e.status_code)
+        except Exception as e:
+            outcome = type(e).__name__
+        finally:
+            db.close()
+        with lock:
+            outcomes[outcome] += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    threads = [threading.Thread(target=buyer, args=(user_id,)) for user_id in buyer_ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def cancel_all(Session, listing_ids) -> int:
+    """Cancel each listing's order as its buyer; returns orders not fully undone"""
+    from models import Listing, Order, Payment
+    from services.order import OrderService
+    from utils.token import TokenClaims
+
+    violations = 0
+    for listing_id in listing_ids:
+        db = Session()
+        try:
+            order = db.query(Order).filter(Order.listing_id == listing_id).first()
+            OrderService.update_status(db, TokenClaims(user_id=order.buyer_id, user_type="buyer"), order.id, "cancelled")
+            statuses = {row[0] for row in db.query(Payment.status).filter(Payment.order_id == order.id)}
+            if db.get(Listing, listing_id).status != "active" or statuses != {"refunded"}:
+                violations += 1
+        finally:
+            db.close()
+    return violations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///bench_contention.db")
+    parser.add_argument("--buyers", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    # Settings (and the engine) are read at import time; one connection per buyer
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ["DB_POOL_SIZE"] = str(args.buyers)
+    from db.session import engine, SessionLocal as Session
+    from models import Base, Listing, Order, User, Wallet
+    from benchmarks.seed import SeedSizes, seed
+
+    Base.metadata.create_all(bind=engine)
+    db = Session()
+    seed(db, SeedSizes(users=args.buyers + 100, vendors=50, listings=max(1000, args.rounds), orders=0, reviews=0))
+    buyer_ids = [row[0] for row in db.query(User.id).filter(User.user_type == "buyer").limit(args.buyers)]
+    # Listings nobody has ordered yet
+    listing_ids = [row[0] for row in db.query(Listing.id).filter(
+        Listing.status == "active", ~Listing.id.in_(db.query(Order.listing_id))
+    ).limit(args.rounds)]
+    balance_before = db.query(func.sum(Wallet.balance)).filter(Wallet.user_id.in_(buyer_ids)).scalar()
+    db.close()
+
+    outcomes, latencies, violations = Counter(), [], 0
+    started = time.perf_counter()
+    for listing_id in listing_ids:
+        race(Session, listing_id, buyer_ids, outcomes, latencies)
+        db = Session()
+        if db.query(func.count(Order.id)).filter(Order.listing_id == listing_id).scalar() != 1:
+            violations += 1
+        db.close()
+    elapsed = time.perf_counter() - started
+
+    db = Session()
+    spent = db.query(func.sum(Listing.price)).filter(Listing.id.in_(listing_ids)).scalar() or Decimal(0)
+    balance_after = db.query(func.sum(Wallet.balance)).filter(Wallet.user_id.in_(buyer_ids)).scalar()
+    db.close()
+
+    cancel_violations = cancel_all(Session, listing_ids)
+    db = Session()
+    balance_refunded = db.query(func.sum(Wallet.balance)).filter(Wallet.user_id.in_(buyer_ids)).scalar()
+    db.close()
+
+    latencies.sort()
+    print(f"{len(listing_ids)} rounds x {args.buyers} buyers in {elapsed:.1f}s")
+    print(f"outcomes: {dict(outcomes)}")
+    print(f"listings with other than exactly one order: {violations}")
+    print(f"buyers debited {balance_before - balance_after} for listings worth {spent}")
+    print(f"after cancelling: {balance_before - balance_refunded} still debited, "
+          f"{cancel_violations} orders with the listing not back on sale or payments not refunded")
+    print(f"latency p50 {latencies[len(latencies) // 2]:.1f} ms, p99 {latencies[int(len(latencies) * 0.99)]:.1f} ms, "
+          f"max {latencies[-1]:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Personalized listings: batch build throughput and serving latency.
+
+Usage:
+    python benchmarks/recommendations.py --users 100000 --orders 200000 \
+        --database-url postgresql://.../bench_recommendations
+
+Seeds an empty database (see benchmarks/seed.py), runs the batch build
+over every user, then times ``--lookups`` requests for buyers with cached
+listings against the ranked browse that cold buyers get, both through the
+service the endpoint calls. Also reports how much of each buyer's first
+page falls in categories they bought from, personalized and ranked; seeded
+orders pick listings at random, so that share only shows the bonuses at
+work, not recommendation quality.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import time
+
+import numpy as np
+
+
+def percentiles(samples) -> str:
+    samples = np.array(samples) * 1000
+    return f"p50 {np.percentile(samples, 50):6.2f} ms  p99 {np.percentile(samples, 99):6.2f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///bench_recommendations.db")
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--vendors", type=int, default=5000)
+    parser.add_argument("--listings", type=int, default=500_000)
+    parser.add_argument("--orders", type=int, default=200_000)
+    parser.add_argument("--reviews", type=int, default=50_000)
+    parser.add_argument("--lookups", type=int, default=1000)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url
+    from config import settings
+    from db.session import engine, SessionLocal
+    from models import Base, Listing, User, ListingRecommendations
+    from benchmarks.seed import SeedSizes, seed
+    from services.archive import ArchiveService
+    from services.recommendation import RecommendationService
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    seed(db, SeedSizes(users=args.users, vendors=args.vendors, listings=args.listings,
+                       orders=args.orders, reviews=args.reviews))
+
+    summary = RecommendationService.build(db)
+    print(f"Built listings for {summary['buyers']} buyers ({args.users} users) in {summary['seconds']:.1f}s: "
+          f"{args.users / summary['seconds']:.0f} users/s, {summary['buyers'] / summary['seconds']:.0f} buyers/s")
+
+    rng = np.random.default_rng(1)
+    warm = [row.user_id for row in db.query(ListingRecommendations.user_id)]
+    warm = [db.get(User, int(i)) for i in rng.choice(warm, min(args.lookups, len(warm)), replace=False)]
+    cold = User(id=0)
+
+    def timed(users) -> list:
+        samples = []
+        for user in users:
+            start = time.perf_counter()
+            RecommendationService.recommended(db, user, 0, settings.DEFAULT_PAGE_SIZE)
+            samples.append(time.perf_counter() - start)
+        return samples
+
+    timed(warm[:50])
+    print(f"\ncached (personalized): {percentiles(timed(warm))}")
+    print(f"ranked (cold buyers):  {percentiles(timed([cold] * len(warm)))}")
+
+    orders = ArchiveService.all_orders()
+    shares = {"personalized": [], "ranked": []}
+    ranked = RecommendationService.recommended(db, cold)
+    for user in warm[:200]:
+        bought = {category for (category,) in db.query(Listing.category).join(
+            orders, orders.c.listing_id == Listing.id
+        ).filter(orders.c.buyer_id == user.id, orders.c.status != "cancelled")}
+        if not bought:
+            continue
+        personal = RecommendationService.recommended(db, user)
+        shares["personalized"].append(np.mean([listing.category in bought for listing in personal]))
+        shares["ranked"].append(np.mean([listing.category in bought for listing in ranked]))
+    print(f"\nFirst page in categories the buyer bought from: "
+          + ", ".join(f"{name} {np.mean(values):.0%}" for name, values in shares.items()))
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
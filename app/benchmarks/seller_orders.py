@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Seller order queries through Listing (the old join) vs the vendor_id and
+price snapshots on orders.
+
+Usage:
+    python benchmarks/seller_orders.py --database-url sqlite:///bench_seller_orders.db --orders 1000000
+
+Seeds the database, then times /orders/my-sales and a 30-day revenue
+total for the busiest vendor and a typical one, printing each query plan.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import time
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///bench_seller_orders.db")
+    parser.add_argument("--orders", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    # Settings (and the engine) are read at import time
+    os.environ["DATABASE_URL"] = args.database_url
+    from datetime import datetime, timedelta
+    from sqlalchemy import func, text
+    from db.session import engine, SessionLocal
+    from models import Base, Order, Listing
+    from benchmarks.seed import SeedSizes, seed
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    seed(db, SeedSizes(users=20000, vendors=1000, listings=max(100000, 2 * args.orders),
+                       orders=args.orders, reviews=0))
+
+    counts = db.query(Order.vendor_id, func.count(Order.id)).group_by(Order.vendor_id).order_by(
+        func.count(Order.id).desc()
+    ).all()
+    since = datetime.utcnow() - timedelta(days=30)
+    explain = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+
+    for label, (vendor_id, sales) in (("busiest", counts[0]), ("median", counts[len(counts) // 2])):
+        queries = {
+            "my-sales via listings": db.query(Order).join(Listing, Listing.id == Order.listing_id).filter(
+                Listing.vendor_id == vendor_id
+            ).order_by(Order.ordered_at.desc()),
+            "my-sales on orders": db.query(Order).filter(Order.vendor_id == vendor_id).order_by(Order.ordered_at.desc()),
+            "30-day revenue via listings": db.query(func.sum(Listing.price)).join(
+                Order, Order.listing_id == Listing.id
+            ).filter(Listing.vendor_id == vendor_id, Order.ordered_at >= since),
+            "30-day revenue on orders": db.query(func.sum(Order.price)).filter(
+                Order.vendor_id == vendor_id, Order.ordered_at >= since
+            ),
+        }
+        print(f"{label} vendor {vendor_id} ({sales} orders)")
+        for name, query in queries.items():
+            ms = timed(lambda: (query.all(), db.expunge_all()), args.repeat)
+            sql = str(query.statement.compile(engine, compile_kwargs={"literal_binds": True}))
+            plan = [str(row[-1]) for row in db.execute(text(explain + sql))]
+            print(f"  {name:<28} {ms:8.2f} ms   {' | '.join(plan)}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Compare throughput of the single-process dev server with server.py.
+
+Usage:
+    python benchmarks/server_throughput.py --database-url sqlite:///bench_server.db \
+        --workers 4 --concurrency 64 --duration 10
+
+Starts each setup in turn on a free port, drives GET /health and
+GET /listings with ``--concurrency`` keep-alive clients for ``--duration``
+seconds and prints requests/s with p50/p99 latency. Point --database-url at
+a database prepared with db/init_db.py (and some listings) for a
+meaningful /listings number.
+"""
+
+import sys
+import os
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import socket
+import subprocess
+import time
+
+import httpx
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_healthy(port: int, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError("server did not become healthy in time")
+
+
+async def drive(port: int, path: str, concurrency: int, duration: float):
+    """Return (requests, errors, sorted latencies in ms)"""
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=30) as client:
+        async def loop():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    if response.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        await asyncio.gather(*(loop() for _ in range(concurrency)))
+
+    latencies.sort()
+    return len(latencies), errors, latencies
+
+
+def bench(name: str, command, env, args):
+    port = free_port()
+    server = subprocess.Popen(
+        command + ["--port", str(port)], env=env, cwd=ROOT_DIR,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_healthy(port)
+        for path in ("/health", "/listings"):
+            count, errors, latencies = asyncio.run(drive(port, path, args.concurrency, args.duration))
+            p50 = latencies[len(latencies) // 2]
+            p99 = latencies[int(len(latencies) * 0.99)]
+            print(f"{name:24} {path:10} {count / args.duration:10.0f} {p50:9.1f} {p99:9.1f} {errors:7}")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///bench_server.db")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    # All load comes from one address, which admission control would throttle
+    env = dict(os.environ, DATABASE_URL=args.database_url, RATE_LIMIT_ENABLED="false")
+    print(f"{'setup':24} {'path':10} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    bench("uvicorn single process",
+          [sys.executable, "-m", "uvicorn", "app.main:app", "--log-level", "warning"], env, args)
+    bench(f"server.py {args.workers} workers",
+          [sys.executable, "-m", "app.server", "--workers", str(args.workers)], env, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Similar-listings index: build time, memory, lookup latency and recall.
+
+Usage:
+    python benchmarks/similar_listings.py --rows 100000 --database-url sqlite:///bench_similar.db
+
+Seeds ``--rows`` listings into an empty database (see benchmarks/seed.py),
+builds the index, then times ``--lookups`` random lookups twice: the
+in-memory nearest-neighbour search alone, and SimilarListingService.similar
+end to end (index plus loading the listings) next to the category-browse
+fallback it replaces. Recall@10 is measured against an exact scan of the
+same vectors for several probe counts. Finally 1% of the listings are
+added and 1% paused and the incremental refresh is timed.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import time
+from datetime import datetime
+
+import numpy as np
+
+
+def percentiles(samples) -> str:
+    samples = np.array(samples) * 1000
+    return f"p50 {np.percentile(samples, 50):6.2f} ms  p99 {np.percentile(samples, 99):6.2f} ms"
+
+
+def timed(fn, arguments) -> list:
+    samples = []
+    for argument in arguments:
+        start = time.perf_counter()
+        fn(argument)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///bench_similar.db")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url
+    from config import settings
+    from db.session import engine, SessionLocal
+    from models import Base, Listing
+    from benchmarks.seed import SeedSizes, seed
+    from services.similar import SimilarListingService
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    seed(db, SeedSizes(users=max(10000, args.rows // 50), vendors=1000, listings=args.rows, orders=0, reviews=0))
+
+    started = time.perf_counter()
+    index = SimilarListingService.refresh(db)
+    print(f"Built index over {len(index.ids)} active listings in {time.perf_counter() - started:.1f}s: "
+          f"{len(index.centroids)} clusters, {index.vectors.nbytes / 1e6:.1f} MB of vectors")
+
+    rng = np.random.default_rng(1)
+    rows = rng.choice(len(index.ids), min(args.lookups, len(index.ids)), replace=False)
+    listing_ids = [int(index.ids[row]) for row in rows]
+
+    search = lambda row: SimilarListingService.search(index, index.vectors[row], args.limit, int(index.ids[row]))
+    print(f"\nsearch only (probes={settings.SIMILAR_PROBES}):  {percentiles(timed(search, rows))}")
+    end_to_end = lambda listing_id: SimilarListingService.similar(db, listing_id, args.limit)
+    print(f"similar() end to end:        {percentiles(timed(end_to_end, listing_ids))}")
+    SimilarListingService._index = None
+    print(f"category fallback:           {percentiles(timed(end_to_end, listing_ids))}")
+    SimilarListingService._index = index
+
+    print(f"\n{'probes':>8} {'recall@' + str(args.limit):>10} {'search p50':>12}")
+    for probes in (1, 2, 4, 8, 16, 32):
+        settings.SIMILAR_PROBES = probes
+        hits = 0
+        for row in rows[:200]:
+            exact = np.argsort(-(index.vectors @ index.vectors[row]))
+            exact = [int(i) for i in index.ids[exact[:args.limit + 1]] if i != index.ids[row]][:args.limit]
+            hits += len(set(exact) & set(search(row)))
+        p50 = np.median(timed(search, rows)) * 1000
+        print(f"{probes:8} {hits / (200 * args.limit):10.3f} {p50:9.3f} ms")
+
+    # 1% new listings and 1% paused, then one incremental refresh
+    count = max(1, len(index.ids) // 100)
+    template = db.get(Listing, listing_ids[0])
+    db.add_all([Listing(
+        vendor_id=template.vendor_id, title=f"{template.title} v{i}", description=template.description,
+        price=template.price, item_condition=template.item_condition, category=template.category,
+        created_at=datetime.utcnow()
+    ) for i in range(count)])
+    db.query(Listing).filter(Listing.id.in_([int(i) for i in index.ids[:count]])).update(
+        {"status": "paused", "status_changed_at": datetime.utcnow()}, synchronize_session=False
+    )
+    db.commit()
+    started = time.perf_counter()
+    refreshed = SimilarListingService.update(db, index)
+    print(f"\nIncremental refresh of {count} new and {count} paused listings: "
+          f"{time.perf_counter() - started:.2f}s, {int(refreshed.alive.sum())} live rows")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
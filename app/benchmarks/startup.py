@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Measure API cold-start cost.
+
+Usage:
+    python benchmarks/startup.py --runs 5 --database-url sqlite:///bench_startup.db
+
+For each run, in fresh interpreters:
+  * import time of ``app.main`` (what every worker pays before serving)
+  * time from spawning uvicorn to the first 200 from /health
+"""
+
+import sys
+import os
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import socket
+import statistics
+import subprocess
+import time
+import urllib.request
+
+IMPORT_SNIPPET = (
+    "import sys, time; sys.path.insert(0, {root!r}); "
+    "start = time.perf_counter(); import app.main; "
+    "print(time.perf_counter() - start)"
+)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_import(env) -> float:
+    """Seconds spent importing app.main in a new interpreter"""
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET.format(root=ROOT_DIR)],
+        env=env, cwd=ROOT_DIR, capture_output=True, text=True, check=True,
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def measure_first_response(env, timeout: float = 30.0) -> float:
+    """Seconds from spawning uvicorn until /health answers 200"""
+    port = free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env, cwd=ROOT_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError("server did not become healthy in time")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///bench_startup.db")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    env = dict(os.environ, DATABASE_URL=args.database_url)
+    imports = [measure_import(env) for _ in range(args.runs)]
+    first_responses = [measure_first_response(env) for _ in range(args.runs)]
+
+    print(f"{'metric':28} {'median ms':>10} {'min ms':>10} {'max ms':>10}")
+    for name, samples in (("import app.main", imports), ("spawn -> first /health 200", first_responses)):
+        samples_ms = [s * 1000 for s in samples]
+        print(f"{name:28} {statistics.median(samples_ms):10.1f} {min(samples_ms):10.1f} {max(samples_ms):10.1f}")
+
+
+if __name__ == "__main__":
+    main()
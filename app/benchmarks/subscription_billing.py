@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Monthly subscription billing at scale: throughput, memory, crash recovery
+and idempotency.
+
+Usage:
+    python benchmarks/subscription_billing.py --database-url sqlite:///bench_billing.db --vendors 300000
+
+Seeds --vendors vendors, puts --premium-share of them on the paid plan and
+funds all but --broke-share of those. Billing is then interrupted after
+half the chunks (as if the process died), resumed, and run once more; the
+checks at the end confirm every paying vendor was charged exactly once and
+every unfunded one was downgraded.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import time
+
+
+def reset_peak_rss():
+    # Linux: start measuring the high-water mark from here, not from seeding
+    with open("/proc/self/clear_refs", "w") as f:
+        f.write("5")
+
+
+def peak_rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///bench_billing.db")
+    parser.add_argument("--vendors", type=int, default=300000)
+    parser.add_argument("--premium-share", type=float, default=0.5)
+    parser.add_argument("--broke-share", type=float, default=0.1)
+    parser.add_argument("--chunk", type=int, default=1000)
+    args = parser.parse_args()
+
+    # Settings (and the engine) are read at import time
+    os.environ["DATABASE_URL"] = args.database_url
+    from datetime import date
+    from sqlalchemy import func
+    from db.session import engine, SessionLocal
+    from models import Base, Vendor, VendorPlan, VendorPlanCharge, Wallet
+    from services.billing import BillingService
+    from benchmarks.seed import SeedSizes, seed
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    if seed(db, SeedSizes(users=args.vendors + 1000, vendors=args.vendors, listings=10000, orders=0, reviews=0)):
+        plans = db.query(VendorPlan).order_by(VendorPlan.monthly_fee).all()
+        free, paid_plan = plans[0], plans[-1]
+        premium_every = max(1, round(1 / args.premium_share))
+        broke_every = max(1, round(1 / args.broke_share))
+        db.query(Vendor).update({"plan_id": free.id}, synchronize_session=False)
+        db.query(Vendor).filter(Vendor.id % premium_every == 0).update({"plan_id": paid_plan.id}, synchronize_session=False)
+        db.query(Wallet).filter(Wallet.user_id <= args.vendors).update(
+            {"balance": paid_plan.monthly_fee * 3}, synchronize_session=False
+        )
+        db.query(Wallet).filter(
+            Wallet.user_id <= args.vendors, Wallet.user_id % (premium_every * broke_every) == 0
+        ).update({"balance": 0}, synchronize_session=False)
+        db.commit()
+
+    period = BillingService.period_of(date.today())
+    fee = db.query(func.max(VendorPlan.monthly_fee)).scalar()
+    paying = db.query(func.count(Vendor.id)).join(VendorPlan, VendorPlan.id == Vendor.plan_id).filter(
+        VendorPlan.monthly_fee > 0
+    ).scalar()
+    balance_before = db.query(func.sum(Wallet.balance)).scalar()
+    print(f"{paying} of {args.vendors} vendors on a paid plan ({fee}/month)")
+
+    db.expunge_all()
+    reset_peak_rss()
+    # A run that dies after half its chunks
+    free_plan_id = BillingService.free_plan_id(db)
+    start, last_id, chunks = time.perf_counter(), 0, 0
+    while chunks < paying // args.chunk // 2:
+        last_id, _, _ = BillingService.bill_chunk(db, period, last_id, args.chunk, free_plan_id)
+        chunks += 1
+    billed = db.query(func.count(VendorPlanCharge.id)).scalar()
+    print(f"interrupted after {chunks} chunks and {time.perf_counter() - start:.1f}s: {billed} vendors billed")
+
+    resumed = BillingService.run(db, period, args.chunk)
+    print(f"resumed run: {resumed['paid']} paid, {resumed['failed']} downgraded, "
+          f"{resumed['chunks']} chunks in {resumed['seconds']:.1f}s")
+    again = BillingService.run(db, period, args.chunk)
+    print(f"second run:  {again['paid']} paid, {again['failed']} downgraded in {again['seconds']:.2f}s")
+
+    charges = dict(db.query(VendorPlanCharge.status, func.count(VendorPlanCharge.id)).group_by(VendorPlanCharge.status).all())
+    twice = db.query(VendorPlanCharge.vendor_id).group_by(VendorPlanCharge.vendor_id, VendorPlanCharge.period).having(
+        func.count(VendorPlanCharge.id) > 1
+    ).count()
+    debited = balance_before - db.query(func.sum(Wallet.balance)).scalar()
+    still_paying_broke = db.query(func.count(Vendor.id)).join(VendorPlanCharge, VendorPlanCharge.vendor_id == Vendor.id).filter(
+        VendorPlanCharge.status == "failed", Vendor.plan_id != free_plan_id
+    ).scalar()
+    print(f"charges: {charges}, vendors charged twice: {twice}, "
+          f"debited {debited} (expected {fee * charges.get('paid', 0)}), "
+          f"unpaid vendors still on the paid plan: {still_paying_broke}")
+    print(f"charges cover every paying vendor: {sum(charges.values()) == paying}; peak RSS while billing {peak_rss_mb():.0f} MB")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
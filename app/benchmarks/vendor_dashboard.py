@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Vendor dashboard from rollups vs aggregating the orders table, and a
+check that the incrementally maintained rollups match a full rebuild.
+
+Usage:
+    python benchmarks/vendor_dashboard.py --database-url sqlite:///bench_dashboard.db --orders 500000
+
+Seeds the database (which builds the rollups), times the dashboard for the
+busiest vendor both ways, then drives --operations random order changes
+through the services (purchases, status updates, escrow sweeps) and
+compares every rollup row with a rebuild from scratch.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import random
+import time
+
+
+def timed(fn, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///bench_dashboard.db")
+    parser.add_argument("--orders", type=int, default=500000)
+    parser.add_argument("--operations", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    # Settings (and the engine) are read at import time
+    os.environ["DATABASE_URL"] = args.database_url
+    from datetime import datetime, timedelta
+    from fastapi import HTTPException
+    from sqlalchemy import func
+    from db.session import engine, SessionLocal
+    from models import (Base, Order, Listing, User, Vendor, Wallet,
+                        VendorSalesSummary, VendorDailySales, VendorListingSales)
+    from services.order import OrderService
+    from services.settlement import SettlementService
+    from services.vendor_sales import VendorSalesService, OrderChange
+    from utils.token import TokenClaims
+    from benchmarks.seed import SeedSizes, seed
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    seed(db, SeedSizes(users=20000, vendors=1000, listings=max(100000, 2 * args.orders),
+                       orders=args.orders, reviews=0))
+
+    vendor_id, sales = db.query(Order.vendor_id, func.count(Order.id)).group_by(
+        Order.vendor_id
+    ).order_by(func.count(Order.id).desc()).first()
+
+    def from_orders():
+        # What a client paging /orders/my-sales would have to add up
+        since = datetime.utcnow() - timedelta(days=84)
+        base = db.query(Order).filter(Order.vendor_id == vendor_id)
+        base.with_entities(Order.status, func.count(Order.id), func.sum(Order.price)).group_by(Order.status).all()
+        base.filter(Order.ordered_at >= since).with_entities(
+            func.date(Order.ordered_at), func.count(Order.id), func.sum(Order.price)
+        ).group_by(func.date(Order.ordered_at)).all()
+        base.with_entities(Order.listing_id, func.sum(Order.price)).group_by(Order.listing_id).order_by(
+            func.sum(Order.price).desc()
+        ).limit(10).all()
+
+    rollup_ms = timed(lambda: VendorSalesService.dashboard(db, vendor_id), args.repeat)
+    orders_ms = timed(from_orders, args.repeat)
+    print(f"busiest vendor has {sales} orders: dashboard from rollups {rollup_ms:.2f} ms, "
+          f"aggregated from orders {orders_ms:.2f} ms (median of {args.repeat})")
+
+    # Random lifecycle traffic through the services
+    rng = random.Random(7)
+    buyers = [row[0] for row in db.query(User.id).filter(User.user_type == "buyer").limit(500)]
+    db.query(Wallet).filter(Wallet.user_id.in_(buyers)).update({"balance": 10 ** 7}, synchronize_session=False)
+    db.commit()
+    listings = [row[0] for row in db.query(Listing.id).filter(Listing.status == "active").limit(args.operations)]
+    statuses = ["confirmed", "shipped", "delivered", "cancelled"]
+    started = time.perf_counter()
+    for i in range(args.operations):
+        if i % 3 == 0 and listings:
+            try:
+                OrderService.create_order(db, TokenClaims(user_id=rng.choice(buyers), user_type="buyer"), listings.pop())
+            except HTTPException:
+                pass
+        else:
+            order = db.get(Order, rng.randint(1, args.orders))
+            previous, order.status = order.status, rng.choice(statuses)
+            if order.status == "shipped":
+                order.shipped_at = datetime.utcnow() - timedelta(days=30)
+            VendorSalesService.record(db, [OrderChange(
+                order.vendor_id, order.listing_id, order.price, order.ordered_at,
+                previous, order.status, order.settled_at is not None
+            )])
+            db.commit()
+        if i % 500 == 499:
+            SettlementService.sweep(db)
+    print(f"applied {args.operations} order changes in {time.perf_counter() - started:.1f}s")
+
+    def snapshot():
+        return {
+            model.__tablename__: {
+                tuple(getattr(row, c.name) for c in model.__table__.primary_key):
+                    tuple(float(getattr(row, c.name)) for c in model.__table__.columns if not c.primary_key)
+                for row in db.query(model)
+            }
+            for model in (VendorSalesSummary, VendorDailySales, VendorListingSales)
+        }
+
+    incremental = snapshot()
+    VendorSalesService.rebuild(db)
+    rebuilt = snapshot()
+    for table, rows in rebuilt.items():
+        keys = set(rows) | set(incremental[table])
+        zero = lambda values: values is None or not any(abs(v) > 0.005 for v in values)
+        drift = [
+            key for key in keys
+            if not (zero(rows.get(key)) and zero(incremental[table].get(key)))
+            and (rows.get(key) is None or incremental[table].get(key) is None
+                 or any(abs(a - b) > 0.005 for a, b in zip(rows[key], incremental[table][key])))
+        ]
+        print(f"{table}: {len(rows)} rows, {len(drift)} differ from a rebuild")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -7,15 +7,32 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from sqlalchemy import inspect
 from sqlalchemy.orm import Session
+from alembic import command
+from alembic.config import Config
 from db.session import engine, SessionLocal
-from models import Base, VendorPlan
+from models import Base
 from config import settings
+from services.seed_service import SeedService
+from services.partitions import PartitionService, PARTITIONED
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini")
 
 def create_tables():
     """Create all database tables"""
     print("Creating database tables...")
+    fresh = not inspect(engine).get_table_names()
     Base.metadata.create_all(bind=engine)
+    if fresh:
+        # Postgres partitioning is not expressible in the models (see services/partitions.py)
+        with engine.begin() as connection:
+            for table in PARTITIONED:
+                PartitionService.partition(connection, table)
+        # create_all already built the latest schema, so no migration applies
+        command.stamp(Config(ALEMBIC_INI), "head")
+    else:
+        print("Existing database: run `alembic upgrade head` to apply pending migrations")
     print("✅ Tables created successfully!")
 
 def seed_vendor_plans():
@@ -24,34 +41,9 @@ def seed_vendor_plans():
     
     db = SessionLocal()
     try:
-        # Check if plans already exist
-        existing_plans = db.query(VendorPlan).count()
-        if existing_plans > 0:
-            print("✅ Vendor plans already exist, skipping seed...")
-            return
-        
-        # Create basic plan
-        basic_plan = VendorPlan(
-            name="basic",
-            monthly_fee=0.00,
-            remittance_rate=85.00,  # 85% to seller, 15% platform fee
-            max_listings_per_month=10,
-            visibility_boost=False
-        )
-        
-        # Create premium plan
-        premium_plan = VendorPlan(
-            name="premium",
-            monthly_fee=29.99,
-            remittance_rate=92.00,  # 92% to seller, 8% platform fee
-            max_listings_per_month=100,
-            visibility_boost=True
-        )
-        
-        db.add(basic_plan)
-        db.add(premium_plan)
-        db.commit()
-        print("✅ Vendor plans seeded successfully!")
+        # Same plans the API seeds on startup, so either path works first
+        SeedService.seed_vendor_plans(db)
+        print("✅ Vendor plans ready!")
         
     except Exception as e:
         print(f"❌ Error seeding vendor plans: {e}")
@@ -73,7 +65,7 @@ def init_database():
         print("\nNext steps:")
         print("1. Update your .env file with proper database credentials")
         print("2. Install dependencies: pip install -r requirements.txt")
-        print("3. Run the API: uvicorn main:app --reload")
+        print("3. Run the API: uvicorn app.main:app --reload")
         print("4. Visit http://localhost:8000/docs for API documentation")
         
     except Exception as e:
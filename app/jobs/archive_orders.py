@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Move closed orders past ORDER_RETENTION_DAYS to the archive tables.
+
+Delivered-and-settled and cancelled orders go, with their payments and
+delivery requests, to orders_archive, payments_archive and
+delivery_requests_archive. On Postgres the run also creates the next
+PARTITION_MONTHS_AHEAD monthly partitions and drops old ones left empty,
+so run it at least monthly (daily from cron is fine; it is resumable and
+safe to run alongside itself).
+
+Usage:
+    python jobs/archive_orders.py [--retention-days 365]
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+
+from db.session import SessionLocal
+from services.archive import ArchiveService
+
+
+def archive_orders(retention_days=None):
+    """Archive closed orders and tidy the monthly partitions"""
+    db = SessionLocal()
+    try:
+        summary = ArchiveService.run(db, retention_days)
+        print(f"✅ Archived {summary['orders']} orders in {summary['chunks']} chunks; "
+              f"partitions created {summary['partitions_created']}, dropped {summary['partitions_dropped']} "
+              f"({summary['seconds']:.1f}s)")
+    except Exception as e:
+        print(f"❌ Archiving orders failed: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--retention-days", type=int, help="default: ORDER_RETENTION_DAYS")
+    args = parser.parse_args()
+    archive_orders(args.retention_days)
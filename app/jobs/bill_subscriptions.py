@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Charge paying vendors their plan's monthly fee.
+
+Run from cron at the start of each month (running it more often is
+harmless: each vendor is billed once per period). A run that died part way
+picks up where it stopped when started again, and several copies may run
+at once on Postgres.
+
+Usage:
+    python jobs/bill_subscriptions.py [--period 2026-10]
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+from datetime import datetime
+
+from db.session import SessionLocal
+from services.billing import BillingService
+
+
+def bill_subscriptions(period=None):
+    """Bill every paying vendor for ``period`` (default: this month)"""
+    db = SessionLocal()
+    try:
+        summary = BillingService.run(db, period)
+        print(f"✅ Billed {summary['paid']} vendors, downgraded {summary['failed']} unpaid, "
+              f"in {summary['chunks']} chunks and {summary['seconds']:.1f}s")
+    except Exception as e:
+        print(f"❌ Subscription billing failed: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--period", help="month to bill, as YYYY-MM (default: the current month)")
+    args = parser.parse_args()
+    bill_subscriptions(datetime.strptime(args.period, "%Y-%m").date() if args.period else None)
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Rebuild every buyer's personalized listings.
+
+Scores the active listings for each user with orders or reviews (archived
+orders included) and caches their best RECOMMEND_SIZE for
+RECOMMEND_TTL_HOURS, RECOMMEND_CHUNK users per transaction; expired rows
+are purged at the end. Buyers whose row expires before the next run see
+the ranked browse, so run this at least that often: nightly from cron
+with the default TTL.
+
+Usage:
+    python jobs/build_recommendations.py [--chunk 1000]
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+
+from db.session import SessionLocal
+from services.recommendation import RecommendationService
+
+
+def build_recommendations(chunk=None):
+    """Recompute the personalized listings of every buyer with history"""
+    db = SessionLocal()
+    try:
+        summary = RecommendationService.build(db, chunk)
+        print(f"✅ Personalized listings for {summary['buyers']} buyers in {summary['chunks']} chunks, "
+              f"{summary['expired']} expired rows purged ({summary['seconds']:.1f}s)")
+    except Exception as e:
+        print(f"❌ Recommendation build failed: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunk", type=int, help="users per transaction; default: RECOMMEND_CHUNK")
+    args = parser.parse_args()
+    build_recommendations(args.chunk)
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Move long-archived listings out of the listings table.
+
+Listings a seller archived more than LISTING_COMPACT_DAYS ago, and that no
+order or sales rollup refers to, go to listings_archive; after that they
+can no longer be restored. Sold listings stay in listings for their
+orders, outside the partial browse indexes. The freed space is reused by
+new listings rather than returned to the OS. Resumable and safe to run
+alongside itself; daily from cron is fine.
+
+Usage:
+    python jobs/compact_listings.py [--days 90]
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+
+from db.session import SessionLocal
+from services.archive import ArchiveService
+
+
+def compact_listings(days=None):
+    """Move archived, never-ordered listings to listings_archive"""
+    db = SessionLocal()
+    try:
+        summary = ArchiveService.compact_listings(db, days)
+        print(f"✅ Compacted {summary['listings']} listings in {summary['chunks']} chunks "
+              f"({summary['seconds']:.1f}s)")
+    except Exception as e:
+        print(f"❌ Listing compaction failed: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, help="default: LISTING_COMPACT_DAYS")
+    args = parser.parse_args()
+    compact_listings(args.days)
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Submit pending delivery requests to logistics partners and pull tracking.
+
+API workers do this every DELIVERY_DISPATCH_SECONDS; with that set to 0,
+run this from cron instead.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.delivery import DeliveryService
+
+
+def dispatch_deliveries():
+    """One dispatch and tracking round"""
+    try:
+        totals = DeliveryService.run_once()
+        print(f"✅ Delivery dispatch: {totals}")
+    except Exception as e:
+        print(f"❌ Delivery dispatch failed: {e}")
+        raise
+
+
+if __name__ == "__main__":
+    dispatch_deliveries()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Write a finance export (see GET /admin/exports/{report}) to a file.
+
+Usage:
+    python jobs/export_report.py payouts --format parquet --out payouts.parquet --start 2026-09-01 --end 2026-10-01
+
+Streams from the database like the endpoint does, so memory stays flat
+whatever the date range; prints rows, size and throughput when done.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import resource
+import time
+from datetime import datetime
+
+from services.export import ExportService, REPORTS, FORMATS
+
+
+def peak_rss_mb() -> float:
+    # VmHWM starts afresh at exec; ru_maxrss can carry a parent's peak over
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def export_report(report: str, fmt: str, out: str, start=None, end=None, vendor_id=None, chunk_rows=None) -> dict:
+    """Write one export to ``out`` and return its stats"""
+    stats = {}
+    started = time.perf_counter()
+    try:
+        with open(out, "wb") as f:
+            for chunk in ExportService.stream(report, fmt, start, end, vendor_id, chunk_rows, stats):
+                f.write(chunk)
+    except Exception as e:
+        print(f"❌ Export failed: {e}")
+        raise
+    stats["seconds"] = time.perf_counter() - started
+    stats["peak_rss_mb"] = peak_rss_mb()
+    print(f"✅ Exported {stats['rows']} {report} rows ({stats['bytes'] / 2 ** 20:.1f} MB {fmt}) to {out} "
+          f"in {stats['seconds']:.1f}s: {stats['rows'] / max(stats['seconds'], 1e-9):,.0f} rows/s, "
+          f"peak RSS {stats['peak_rss_mb']:.0f} MB")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("report", choices=sorted(REPORTS))
+    parser.add_argument("--format", choices=sorted(FORMATS), default="csv")
+    parser.add_argument("--out", help="defaults to <report>.<format>")
+    parser.add_argument("--start", type=datetime.fromisoformat)
+    parser.add_argument("--end", type=datetime.fromisoformat, help="exclusive")
+    parser.add_argument("--vendor-id", type=int)
+    parser.add_argument("--chunk-rows", type=int)
+    args = parser.parse_args()
+
+    ExportService.check(args.report, args.format)
+    export_report(args.report, args.format, args.out or f"{args.report}.{args.format}",
+                  args.start, args.end, args.vendor_id, args.chunk_rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Delete order events older than ORDER_EVENT_RETENTION_DAYS.
+
+The log only has to cover clients reconnecting to GET /orders/events;
+run this daily (e.g. from cron) to keep it small.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.session import SessionLocal
+from services.order_events import OrderEventService
+
+
+def prune_order_events():
+    """Drop events past the retention window"""
+    db = SessionLocal()
+    try:
+        deleted = OrderEventService.prune(db)
+        print(f"✅ Deleted {deleted} order events")
+    except Exception as e:
+        print(f"❌ Pruning order events failed: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    prune_order_events()
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Rebuild the vendor sales rollups from the orders table.
+
+The rollups are updated with every order change; run this once after
+migrating, and again if they are ever suspected to have drifted.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+
+from db.session import SessionLocal
+from services.vendor_sales import VendorSalesService
+
+
+def rebuild_vendor_sales():
+    """Recompute every vendor's rollups"""
+    print("Rebuilding vendor sales rollups...")
+    start = time.perf_counter()
+    db = SessionLocal()
+    try:
+        vendors = VendorSalesService.rebuild(db)
+        print(f"✅ Rebuilt rollups for {vendors} vendors in {time.perf_counter() - start:.1f}s")
+    except Exception as e:
+        print(f"❌ Rollup rebuild failed: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    rebuild_vendor_sales()
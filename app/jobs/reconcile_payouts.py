@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Check seller payouts for consistency.
+
+Verifies that plan rates are percentages, that every settled order has a
+stored payout no larger than its price, that the SQL and NumPy forms of
+the payout formula agree on every settled order, and that the vendor
+rollups add up to the stored payouts. Exits non-zero on any mismatch.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+
+from db.session import SessionLocal
+from services.payout import PayoutService
+
+
+def reconcile_payouts() -> bool:
+    """Run every check; True when all pass"""
+    print("Reconciling seller payouts...")
+    start = time.perf_counter()
+    db = SessionLocal()
+    try:
+        checks = PayoutService.reconcile(db)
+    finally:
+        db.close()
+
+    for name, mismatches in checks.items():
+        print(f"{'✅' if mismatches == 0 else '❌'} {name}: {mismatches}")
+    ok = not any(checks.values())
+    print(f"{'✅ Payouts reconcile' if ok else '❌ Payouts do not reconcile'} ({time.perf_counter() - start:.1f}s)")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if reconcile_payouts() else 1)
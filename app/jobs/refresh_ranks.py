@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Recompute every listing's rank score.
+
+Scores are kept current on plan changes and reviews; run this periodically
+(e.g. nightly from cron) to pick up changes made outside the API, or after
+changing RANK_BOOST_HOURS / RANK_RATING_HOURS.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+
+from db.session import SessionLocal
+from services.ranking import RankingService
+
+
+def refresh_ranks():
+    """Refresh all listing scores"""
+    print("Refreshing listing rank scores...")
+    start = time.perf_counter()
+    db = SessionLocal()
+    try:
+        updated = RankingService.refresh_all(db)
+        print(f"✅ Refreshed {updated} listings in {time.perf_counter() - start:.1f}s")
+    except Exception as e:
+        print(f"❌ Rank refresh failed: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    refresh_ranks()
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Auto-confirm overdue orders and release their escrow to sellers.
+
+API workers sweep every ESCROW_SWEEP_SECONDS; with that set to 0, run this
+from cron instead. Several copies may run at once on Postgres.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+
+from db.session import SessionLocal
+from services.settlement import SettlementService
+
+
+def settle_orders():
+    """Settle every order past its auto-confirm window"""
+    start = time.perf_counter()
+    db = SessionLocal()
+    try:
+        backlog = SettlementService.backlog(db)
+        settled = SettlementService.sweep(db)
+        print(f"✅ Settled {settled} of {backlog} overdue orders in {time.perf_counter() - start:.1f}s")
+    except Exception as e:
+        print(f"❌ Escrow sweep failed: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    settle_orders()
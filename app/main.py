@@ -7,35 +7,81 @@ app_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, root_dir)
 sys.path.insert(0, app_dir)
 
-from .routers import auth, user, vendor, listings, orders, wallets, reviews
+import asyncio
+import secrets
+from contextlib import asynccontextmanager
+from typing import Optional
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
-import cloudinary
+from fastapi.responses import PlainTextResponse
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
-from .routers import auth, user, vendor, listings, orders, wallets, reviews
-from db.session import engine, SessionLocal  # Added SessionLocal import
-from models.base import Base
+from .routers import auth, user, vendor, listings, orders, wallets, reviews, deliveries, admin
+from middleware.admission import AdmissionMiddleware
+from db.session import SessionLocal
 from config import settings
-from .services.seed_service import SeedService  # Added SeedService import
+from services.seed_service import SeedService
+from services.session import SessionService
+from services.feed import FeedService
+from services.delivery import DeliveryService
+from services.settlement import SettlementService
+from services.similar import SimilarListingService
+from utils import metrics
 
-# Initialize Cloudinary
-cloudinary.config(
-    cloud_name=settings.CLOUDINARY_CLOUD_NAME,
-    api_key=settings.CLOUDINARY_API_KEY,
-    api_secret=settings.CLOUDINARY_API_SECRET
-)
+# Tables are created by `python db/init_db.py` (and migrated with alembic),
+# not on every boot. Cloudinary is configured on first upload.
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run startup tasks including database seeding"""
+    db = SessionLocal()
+    try:
+        # Seed vendor plans
+        SeedService.seed_vendor_plans(db)
+        print("Database seeding completed")
+    except Exception as e:
+        print(f"Database seeding failed: {e}")
+    finally:
+        db.close()
+
+    # Pull session revocations made by other workers
+    revocation_sync = asyncio.create_task(SessionService.sync_forever())
+    # Relay feed events published by other workers (Postgres NOTIFY)
+    FeedService.start_listener()
+    # Batch delivery requests out to logistics partners
+    dispatcher = None
+    if settings.DELIVERY_DISPATCH_SECONDS > 0:
+        dispatcher = asyncio.create_task(DeliveryService.dispatch_forever())
+    # Release escrow on orders buyers never confirmed
+    sweeper = None
+    if settings.ESCROW_SWEEP_SECONDS > 0:
+        sweeper = asyncio.create_task(SettlementService.sweep_forever())
+    # Build and refresh this worker's similar-listings index
+    similar = None
+    if settings.SIMILAR_REFRESH_SECONDS > 0:
+        similar = asyncio.create_task(SimilarListingService.refresh_forever())
+    yield
+    if similar is not None:
+        similar.cancel()
+    if sweeper is not None:
+        sweeper.cancel()
+    if dispatcher is not None:
+        dispatcher.cancel()
+    FeedService.stop_listener()
+    revocation_sync.cancel()
 
 # Initialize FastAPI
 app = FastAPI(
     title="ClutterHaven",
     description="Create Space for What Matters",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Admission control, inside CORS so rejections still carry CORS headers
+app.add_middleware(AdmissionMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -45,20 +91,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Startup event for database seeding
-@app.on_event("startup")
-async def startup_event():
-    """Run startup tasks including database seeding"""
-    db = SessionLocal()
-    try:
-        # Seed vendor plans
-        SeedService.seed_vendor_plans(db)
-        print("Database seeding completed")
-    except Exception as e:
-        print(f"Database seeding failed: {e}")
-    finally:
-        db.close()
-
 # Include routers
 app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 app.include_router(user.router, prefix="/users", tags=["Users"])
@@ -67,6 +99,8 @@ app.include_router(listings.router, prefix="/listings", tags=["Listings"])
 app.include_router(orders.router, prefix="/orders", tags=["Orders"])
 app.include_router(wallets.router, prefix="/wallets", tags=["Wallets"])
 app.include_router(reviews.router, prefix="/reviews", tags=["Reviews"])
+app.include_router(deliveries.router, prefix="/deliveries", tags=["Deliveries"])
+app.include_router(admin.router, prefix="/admin", tags=["Admin"])
 
 @app.get("/")
 async def root():
@@ -79,6 +113,27 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+def require_metrics_token(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False))
+):
+    """Only scrapers holding METRICS_TOKEN may read metrics"""
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if credentials is None or not secrets.compare_digest(
+        credentials.credentials.encode(), settings.METRICS_TOKEN.encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False,
+         dependencies=[Depends(require_metrics_token)])
+async def get_metrics():
+    """Prometheus metrics for this worker (Authorization: Bearer METRICS_TOKEN)"""
+    return metrics.render()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
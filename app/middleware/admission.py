@@ -0,0 +1,114 @@
+"""
+Admission control for expensive routes.
+
+Every request takes a token from its caller's bucket (the user id from a
+valid bearer token, else the client IP). Routes listed in ROUTE_LIMITS also
+get their own per-caller bucket and a cap on requests in flight in this
+worker. Over the rate the caller gets 429; over the in-flight cap, 503.
+Both carry Retry-After and are counted in admission_rejections_total.
+"""
+
+import json
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from starlette.requests import Request
+
+from config import settings
+from utils import metrics, rate_limit, token
+from utils.rate_limit import Limit
+
+EXEMPT_PATHS = {"/health", "/metrics"}
+
+metrics.describe("admission_rejections_total", "Requests turned away by admission control")
+metrics.describe("admission_in_flight", "Requests currently running on a limited route")
+
+
+@dataclass
+class RouteRule:
+    name: str  # "METHOD /path" or "METHOD /path?param"
+    query_param: Optional[str]
+    limit: Optional[Limit]
+    max_in_flight: int
+    in_flight: int = 0
+
+    @classmethod
+    def parse(cls, name: str, options: dict) -> Tuple[Tuple[str, str], "RouteRule"]:
+        method, _, target = name.partition(" ")
+        path, _, query_param = target.partition("?")
+        per_minute = options.get("per_minute")
+        limit = Limit(per_minute, options.get("burst", max(1, int(per_minute // 6)))) if per_minute else None
+        rule = cls(name, query_param or None, limit, options.get("max_in_flight", 0))
+        return (method.upper(), path), rule
+
+
+def load_rules(config: Dict[str, dict]) -> Dict[Tuple[str, str], List[RouteRule]]:
+    rules: Dict[Tuple[str, str], List[RouteRule]] = {}
+    for name, options in config.items():
+        key, rule = RouteRule.parse(name, options)
+        rules.setdefault(key, []).append(rule)
+    return rules
+
+
+class AdmissionMiddleware:
+    """Pure ASGI so streamed responses pass through untouched"""
+
+    def __init__(self, app, route_limits: Optional[Dict[str, dict]] = None):
+        self.app = app
+        self.rules = load_rules(settings.ROUTE_LIMITS if route_limits is None else route_limits)
+        self.default_limit = Limit(settings.API_RATE_PER_MINUTE, settings.API_RATE_BURST)
+
+    @staticmethod
+    def caller(request: Request) -> str:
+        auth = request.headers.get("authorization", "")
+        if auth.startswith("Bearer "):
+            # Cached after the first request, so this rarely verifies a signature
+            claims = token.verify_access_token(auth[7:])
+            if claims is not None:
+                return f"user:{claims.user_id}"
+        return f"ip:{rate_limit.client_ip(request)}"
+
+    async def reject(self, send, status_code: int, detail: str, wait: float, route: str, reason: str):
+        metrics.inc("admission_rejections_total", route=route, reason=reason)
+        headers = [(b"content-type", b"application/json")]
+        headers += [(key.lower().encode(), value.encode()) for key, value in rate_limit.retry_after_header(wait).items()]
+        await send({"type": "http.response.start", "status": status_code, "headers": headers})
+        await send({"type": "http.response.body", "body": json.dumps({"detail": detail}).encode()})
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.RATE_LIMIT_ENABLED or scope["path"] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        caller = self.caller(request)
+        limiter = rate_limit.backend()
+        rules = [
+            rule for rule in self.rules.get((scope["method"], scope["path"]), ())
+            if rule.query_param is None or request.query_params.get(rule.query_param)
+        ]
+
+        wait = limiter.take(f"api:{caller}", self.default_limit)
+        if wait:
+            await self.reject(send, 429, "Rate limit exceeded", wait, "*", "rate")
+            return
+        for rule in rules:
+            if rule.limit:
+                wait = limiter.take(f"route:{rule.name}:{caller}", rule.limit)
+                if wait:
+                    await self.reject(send, 429, "Rate limit exceeded", wait, rule.name, "rate")
+                    return
+            if rule.max_in_flight and rule.in_flight >= rule.max_in_flight:
+                await self.reject(send, 503, "Server busy, retry shortly", 1, rule.name, "concurrency")
+                return
+
+        # Single event loop per worker, so plain counters are safe here
+        for rule in rules:
+            rule.in_flight += 1
+            metrics.set_gauge("admission_in_flight", rule.in_flight, route=rule.name)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            for rule in rules:
+                rule.in_flight -= 1
+                metrics.set_gauge("admission_in_flight", rule.in_flight, route=rule.name)
@@ -1,9 +1,13 @@
 from .base import Base
 from .user import User, Wallet
-from .vendor import Vendor, VendorPlan
+from .vendor import Vendor, VendorPlan, VendorPlanCharge
 from .listing import Listing
-from .order import Order, Payment, DeliveryRequest
+from .order import Order, Payment, DeliveryRequest, OrderEvent
+from .archive import OrderArchive, PaymentArchive, DeliveryRequestArchive, ListingArchive
 from .reviews import Review
+from .auth_session import AuthSession
+from .vendor_sales import VendorSalesSummary, VendorDailySales, VendorListingSales
+from .recommendation import ListingRecommendations
 
 __all__ = [
     "Base",
@@ -11,9 +15,20 @@ __all__ = [
     "Wallet", 
     "Vendor",
     "VendorPlan",
+    "VendorPlanCharge",
     "Listing",
     "Order",
     "Payment",
     "DeliveryRequest",
-    "Review"
+    "OrderEvent",
+    "OrderArchive",
+    "PaymentArchive",
+    "DeliveryRequestArchive",
+    "ListingArchive",
+    "Review",
+    "AuthSession",
+    "VendorSalesSummary",
+    "VendorDailySales",
+    "VendorListingSales",
+    "ListingRecommendations"
 ]
\ No newline at end of file
@@ -0,0 +1,71 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Index
+from sqlalchemy.types import DECIMAL
+from .base import Base
+
+# Cold copies of closed orders and their payments and delivery requests,
+# moved here past ORDER_RETENTION_DAYS (see services/archive.py). Same
+# columns as the hot tables but no foreign keys: archived rows are never
+# updated, and only read by reports over all of history.
+
+class OrderArchive(Base):
+    __tablename__ = "orders_archive"
+
+    id = Column(Integer, primary_key=True)  # id the order had in orders
+    buyer_id = Column(Integer, nullable=False)
+    listing_id = Column(Integer, nullable=False)
+    vendor_id = Column(Integer, nullable=True)
+    price = Column(DECIMAL(10, 2), nullable=True)
+    status = Column(String)  # 'delivered' or 'cancelled'
+    ordered_at = Column(DateTime)
+    shipped_at = Column(DateTime, nullable=True)
+    delivered_at = Column(DateTime, nullable=True)
+    settled_at = Column(DateTime, nullable=True)
+    payout = Column(DECIMAL(10, 2), nullable=True)
+
+    __table_args__ = (
+        Index("ix_orders_archive_vendor_id_ordered_at", "vendor_id", "ordered_at"),
+        Index("ix_orders_archive_buyer_id_ordered_at", "buyer_id", "ordered_at"),
+        Index("ix_orders_archive_listing_id", "listing_id"),
+        # Payout exports by settlement date
+        Index("ix_orders_archive_settled_at", "settled_at"),
+    )
+
+class PaymentArchive(Base):
+    __tablename__ = "payments_archive"
+
+    id = Column(Integer, primary_key=True)
+    order_id = Column(Integer, nullable=False, index=True)
+    amount = Column(DECIMAL(10, 2), nullable=False)
+    payment_method = Column(String, nullable=False)
+    status = Column(String)
+    created_at = Column(DateTime, index=True)
+
+class DeliveryRequestArchive(Base):
+    __tablename__ = "delivery_requests_archive"
+
+    id = Column(Integer, primary_key=True)
+    order_id = Column(Integer, nullable=False, index=True)
+    dispatch_option = Column(String, nullable=False)
+    logistics_partner = Column(String, nullable=True)
+    delivery_status = Column(String)
+    confirmed_by_buyer = Column(Boolean, default=False)
+    tracking_reference = Column(String, nullable=True)
+    created_at = Column(DateTime, nullable=True)
+    dispatched_at = Column(DateTime, nullable=True)
+
+# Listings archived for LISTING_COMPACT_DAYS that were never ordered, moved
+# out of listings by ArchiveService.compact_listings. Kept for support and
+# the seller's records; nothing reads them on a request path.
+class ListingArchive(Base):
+    __tablename__ = "listings_archive"
+
+    id = Column(Integer, primary_key=True)  # id the listing had in listings
+    vendor_id = Column(Integer, nullable=False, index=True)
+    title = Column(String, nullable=False)
+    description = Column(Text, nullable=True)
+    price = Column(DECIMAL(10, 2), nullable=False)
+    item_condition = Column(String, nullable=False)
+    category = Column(String, nullable=False)
+    image_url = Column(Text, nullable=True)
+    created_at = Column(DateTime)
+    status_changed_at = Column(DateTime)  # when the seller archived it
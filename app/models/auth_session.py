@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from .base import Base
+
+class AuthSession(Base):
+    """One login; the refresh token is rotated in place on every use"""
+    __tablename__ = "auth_sessions"
+
+    id = Column(String(32), primary_key=True)  # "sid" claim of its access tokens
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    refresh_token_hash = Column(String(64), nullable=False)  # sha256 of the current refresh secret
+    previous_token_hash = Column(String(64), nullable=True)  # the secret it replaced; seeing it again means reuse
+    created_at = Column(DateTime, nullable=False)
+    refreshed_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # Workers poll recent revocations into their in-memory list
+        Index("ix_auth_sessions_revoked_at", "revoked_at"),
+    )
+
+    # Relationships
+    user = relationship("User")
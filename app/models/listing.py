@@ -1,13 +1,39 @@
 # app/models/listing.py
-from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, Text, DateTime
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Text, DateTime, Index, text
 from sqlalchemy.types import DECIMAL
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .base import Base
 
+BROWSABLE = "status = 'active'"
+
+
+def _browse_index(name: str, *columns: str) -> Index:
+    """Index over the listings shown in browse results only"""
+    return Index(name, *columns, postgresql_where=text(BROWSABLE), sqlite_where=text(BROWSABLE))
+
 
 class Listing(Base):
     __tablename__ = "listings"
+    __table_args__ = (
+        # Browse indexes: one per (equality filter, sort key) pair the
+        # listing query builder can plan against (see services/listing_query.py).
+        # Partial: only browsable listings are indexed, so paused, sold and
+        # archived ones cost the browse paths nothing.
+        _browse_index("ix_listings_browse_created", "created_at", "id"),
+        _browse_index("ix_listings_browse_price", "price", "id"),
+        _browse_index("ix_listings_browse_rank", "rank_score", "id"),
+        _browse_index("ix_listings_category_browse_created", "category", "created_at", "id"),
+        _browse_index("ix_listings_category_browse_price", "category", "price", "id"),
+        _browse_index("ix_listings_category_browse_rank", "category", "rank_score", "id"),
+        _browse_index("ix_listings_vendor_browse_created", "vendor_id", "created_at", "id"),
+        _browse_index("ix_listings_vendor_browse_price", "vendor_id", "price", "id"),
+        # /listings/my-listings, in every state
+        Index("ix_listings_vendor_id_status", "vendor_id", "status"),
+        # Compaction candidates (ArchiveService.compact_listings) and recent
+        # status changes (SimilarListingService.update)
+        Index("ix_listings_status_changed_at", "status_changed_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     vendor_id = Column(Integer, ForeignKey("vendors.id"), nullable=False)
@@ -17,10 +43,16 @@ class Listing(Base):
     item_condition = Column(String, nullable=False)  # 'new', 'used', etc.
     category = Column(String, nullable=False)
     image_url = Column(Text, nullable=True)
-    is_active = Column(Boolean, default=True)
+    status = Column(String, nullable=False, default="active", server_default="active")  # 'active', 'paused', 'sold', 'archived'
+    status_changed_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
-    is_active = Column(Boolean, default=True) #Allows admin block/suspend a listing which make it invisible on the app
+    rank_score = Column(Float, nullable=False, default=0.0)  # Maintained by RankingService
 
      # Relationships
     vendor = relationship("Vendor", back_populates="listings")
-    orders = relationship("Order", back_populates="listing")
\ No newline at end of file
+    orders = relationship("Order", back_populates="listing")
+
+    @property
+    def is_active(self) -> bool:
+        """Shown in browse results and open for orders"""
+        return self.status == "active"
@@ -1,18 +1,29 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Index, text
 from sqlalchemy.types import DECIMAL
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 from .base import Base
 
 class Order(Base):
+    # On Postgres orders, payments and reviews are partitioned by month on
+    # their timestamp (services/partitions.py): the primary key there is
+    # (id, ordered_at) / (id, created_at) and foreign keys to orders are
+    # not enforced by the database.
     __tablename__ = "orders"
     
     id = Column(Integer, primary_key=True, index=True)
     buyer_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     listing_id = Column(Integer, ForeignKey("listings.id"), nullable=False)
+    # Snapshots of the listing at purchase: seller queries skip the join, and
+    # later price edits do not change what the buyer paid or the seller gets
+    vendor_id = Column(Integer, ForeignKey("vendors.id"), nullable=True)
+    price = Column(DECIMAL(10, 2), nullable=True)
     status = Column(String, default="pending")  # 'pending', 'confirmed', 'shipped', 'delivered'
     ordered_at = Column(DateTime, default=datetime.now(timezone.utc))
+    shipped_at = Column(DateTime, nullable=True)
     delivered_at = Column(DateTime, nullable=True)
+    settled_at = Column(DateTime, nullable=True)  # escrow released to the seller
+    payout = Column(DECIMAL(10, 2), nullable=True)  # credited to the seller at settlement
     
     # Relationships
     buyer = relationship("User", back_populates="orders_as_buyer")
@@ -20,28 +31,73 @@ class Order(Base):
     payments = relationship("Payment", back_populates="order")
     delivery_requests = relationship("DeliveryRequest", back_populates="order")
 
+    __table_args__ = (
+        # /orders/my-sales and other per-seller queries
+        Index("ix_orders_vendor_id_ordered_at", "vendor_id", "ordered_at"),
+        # /orders/my-purchases
+        Index("ix_orders_buyer_id_ordered_at", "buyer_id", "ordered_at"),
+        # Relisting and listing compaction check for orders of a listing
+        Index("ix_orders_listing_id", "listing_id"),
+        # Escrow sweeper: only orders still holding funds
+        Index(
+            "ix_orders_unsettled_status_id", "status", "id",
+            postgresql_where=settled_at.is_(None),
+            sqlite_where=settled_at.is_(None)
+        ),
+    )
+
 class Payment(Base):
     __tablename__ = "payments"
     
     id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False, index=True)
     amount = Column(DECIMAL(10, 2), nullable=False)
     payment_method = Column(String, nullable=False)  # 'card' or 'wallet'
-    status = Column(String, default="pending")  # 'pending', 'completed', 'failed'
+    status = Column(String, default="pending")  # 'pending', 'completed', 'failed', 'refunded'
     created_at = Column(DateTime, default=datetime.now (timezone.utc))
     
     # Relationships
     order = relationship("Order", back_populates="payments")
 
+LIVE_DELIVERY = "delivery_status != 'failed'"
+
+
 class DeliveryRequest(Base):
     __tablename__ = "delivery_requests"
     
     id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False, index=True)
     dispatch_option = Column(String, nullable=False)  # 'pickup' or 'drop-off'
     logistics_partner = Column(String, nullable=True)
-    delivery_status = Column(String, default="pending")  # 'pending', 'in_transit', 'delivered'
+    # 'pending', 'dispatching' (claimed by the dispatcher), 'in_transit', 'delivered', 'failed'
+    delivery_status = Column(String, default="pending")
     confirmed_by_buyer = Column(Boolean, default=False)
+    tracking_reference = Column(String, nullable=True)  # assigned by the partner
+    created_at = Column(DateTime, nullable=True)
+    dispatched_at = Column(DateTime, nullable=True)
     
     # Relationships
-    order = relationship("Order", back_populates="delivery_requests")
\ No newline at end of file
+    order = relationship("Order", back_populates="delivery_requests")
+
+    __table_args__ = (
+        # Dispatcher claims and status sync
+        Index("ix_delivery_requests_status_id", "delivery_status", "id"),
+        # One live request per order; a failed one can be retried with a new request
+        Index("uq_delivery_requests_live_order", "order_id", unique=True,
+              postgresql_where=text(LIVE_DELIVERY), sqlite_where=text(LIVE_DELIVERY)),
+    )
+
+class OrderEvent(Base):
+    """Status change of an order, one row per user notified; ids order the stream"""
+    __tablename__ = "order_events"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
+    status = Column(String, nullable=False)
+    created_at = Column(DateTime, nullable=False, index=True)  # pruned past ORDER_EVENT_RETENTION_DAYS
+
+    __table_args__ = (
+        # Replay after Last-Event-ID
+        Index("ix_order_events_user_id_id", "user_id", "id"),
+    )
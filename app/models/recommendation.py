@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, JSON
+from .base import Base
+
+class ListingRecommendations(Base):
+    """Personalized listing candidates for one buyer, best first.
+
+    Written in batch by jobs/build_recommendations.py and read with a single
+    primary-key lookup; rows past expires_at are ignored and the buyer gets
+    the ranked browse instead.
+    """
+    __tablename__ = "listing_recommendations"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    listing_ids = Column(JSON, nullable=False)
+    computed_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)  # purged by the next build
@@ -1,9 +1,10 @@
-from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 from .base import Base
 
 class Review(Base):
+    # Partitioned by month on created_at on Postgres, like orders
     __tablename__ = "reviews"
     
     id = Column(Integer, primary_key=True, index=True)
@@ -15,4 +16,9 @@ class Review(Base):
     
     # Relationships
     buyer = relationship("User", back_populates="reviews_given")
-    vendor = relationship("Vendor", back_populates="reviews_received")
\ No newline at end of file
+    vendor = relationship("Vendor", back_populates="reviews_received")
+
+    __table_args__ = (
+        # Personalized listings read each buyer's reviews (services/recommendation.py)
+        Index("ix_reviews_buyer_id", "buyer_id"),
+    )
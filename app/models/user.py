@@ -28,7 +28,7 @@ class Wallet(Base):
     __tablename__ = "wallets"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)  # batched debits and credits
     balance = Column(DECIMAL(10, 2), default=0.00)
     updated_at = Column(DateTime, default=datetime.now(timezone.utc))
     
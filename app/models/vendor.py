@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, Date, DateTime, ForeignKey, UniqueConstraint
 from sqlalchemy.types import DECIMAL
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
@@ -33,4 +33,21 @@ class Vendor(Base):
     user = relationship("User", back_populates="vendor_profile")
     plan = relationship("VendorPlan", back_populates="vendors")
     listings = relationship("Listing", back_populates="vendor")
-    reviews_received = relationship("Review", back_populates="vendor")
\ No newline at end of file
+    reviews_received = relationship("Review", back_populates="vendor")
+
+class VendorPlanCharge(Base):
+    """One monthly fee charge per vendor and billing period"""
+    __tablename__ = "vendor_plan_charges"
+
+    id = Column(Integer, primary_key=True)
+    vendor_id = Column(Integer, ForeignKey("vendors.id"), nullable=False)
+    period = Column(Date, nullable=False)  # first day of the billed month
+    plan_id = Column(Integer, ForeignKey("vendor_plans.id"), nullable=False)
+    amount = Column(DECIMAL(10, 2), nullable=False)
+    status = Column(String, nullable=False)  # 'paid', or 'failed' (vendor downgraded)
+    created_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        # Billing a vendor twice for a period is impossible, not just avoided
+        UniqueConstraint("vendor_id", "period", name="uq_vendor_plan_charges_vendor_period"),
+    )
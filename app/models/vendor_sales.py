@@ -0,0 +1,44 @@
+from sqlalchemy import Column, Integer, Date, DateTime, ForeignKey, Index
+from sqlalchemy.types import DECIMAL
+from .base import Base
+
+# Sales rollups kept current by services/vendor_sales.py in the same
+# transaction as each order change; rebuild with jobs/rebuild_vendor_sales.py
+
+class VendorSalesSummary(Base):
+    """Lifetime totals and current order counts per status, one row per vendor"""
+    __tablename__ = "vendor_sales_summary"
+
+    vendor_id = Column(Integer, ForeignKey("vendors.id"), primary_key=True)
+    orders = Column(Integer, nullable=False, default=0)  # excluding cancelled
+    gross = Column(DECIMAL(14, 2), nullable=False, default=0)
+    escrow = Column(DECIMAL(14, 2), nullable=False, default=0)  # gross of orders not yet settled
+    payouts = Column(DECIMAL(14, 2), nullable=False, default=0)
+    pending = Column(Integer, nullable=False, default=0)
+    confirmed = Column(Integer, nullable=False, default=0)
+    shipped = Column(Integer, nullable=False, default=0)
+    delivered = Column(Integer, nullable=False, default=0)
+    cancelled = Column(Integer, nullable=False, default=0)
+
+class VendorDailySales(Base):
+    """Orders and gross by order day, payouts by settlement day"""
+    __tablename__ = "vendor_daily_sales"
+
+    vendor_id = Column(Integer, ForeignKey("vendors.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    orders = Column(Integer, nullable=False, default=0)
+    gross = Column(DECIMAL(14, 2), nullable=False, default=0)
+    payouts = Column(DECIMAL(14, 2), nullable=False, default=0)
+
+class VendorListingSales(Base):
+    __tablename__ = "vendor_listing_sales"
+
+    vendor_id = Column(Integer, ForeignKey("vendors.id"), primary_key=True)
+    listing_id = Column(Integer, ForeignKey("listings.id"), primary_key=True)
+    orders = Column(Integer, nullable=False, default=0)
+    gross = Column(DECIMAL(14, 2), nullable=False, default=0)
+
+    __table_args__ = (
+        # Top listings
+        Index("ix_vendor_listing_sales_vendor_gross", "vendor_id", "gross"),
+    )
@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import datetime
+
+from db.session import get_db
+from services.auth import AuthService
+from services.export import ExportService, FORMATS
+from utils.token import TokenClaims
+
+router = APIRouter()
+security = HTTPBearer()
+
+def get_current_admin(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> TokenClaims:
+    """Get the caller's token claims, admins only"""
+    claims = AuthService.get_token_claims(db, credentials.credentials)
+    if not claims.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return claims
+
+@router.get("/exports/{report}")
+async def export_report(
+    report: str,
+    format: str = "csv",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    vendor_id: Optional[int] = None,
+    claims: TokenClaims = Depends(get_current_admin)
+):
+    """Stream a finance export as CSV or Parquet
+
+    report is payments (one row per payment) or payouts (one row per
+    settled order, with the seller's payout and the platform commission).
+    start/end bound created_at or settled_at respectively, end exclusive.
+    """
+    ExportService.check(report, format)
+    filename = f"{report}-{datetime.utcnow():%Y%m%d%H%M%S}.{format}"
+    return StreamingResponse(
+        ExportService.stream(report, format, start, end, vendor_id),
+        media_type=FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -1,12 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 
-from app.db.session import get_db
-from app.schemas.users import UserCreate, UserLogin, UserResponse
+from db.session import get_db
+from schemas.auth import Token, RefreshRequest
+from schemas.users import UserCreate, UserLogin, UserResponse
 from services.user import UserService
 from services.auth import AuthService
+from services.session import SessionService
+from utils.rate_limit import client_ip
 
 router = APIRouter()
+security = HTTPBearer()
 
 #Register User
 @router.post("/register", response_model=UserResponse)
@@ -16,8 +21,9 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login")
-async def login(login_data: UserLogin, db: Session = Depends(get_db)):
+async def login(login_data: UserLogin, request: Request, db: Session = Depends(get_db)):
     """Login user and return access token"""
+    AuthService.check_login_rate(client_ip(request), login_data.email)
     user = AuthService.authenticate_user(db, login_data.email, login_data.password)
     if not user:
         raise HTTPException(
@@ -26,9 +32,34 @@ async def login(login_data: UserLogin, db: Session = Depends(get_db)):
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token = AuthService.create_access_token(data={"sub": user.id})
-    return {
-        "access_token": access_token,
-        "token_type": "bearer",
-        "user": user
-    }
\ No newline at end of file
+    tokens = SessionService.start(db, user)
+    return {**tokens, "user": user}
+
+
+@router.post("/refresh", response_model=Token)
+async def refresh(refresh_data: RefreshRequest, db: Session = Depends(get_db)):
+    """Exchange a refresh token for a new token pair"""
+    return SessionService.refresh(db, refresh_data.refresh_token)
+
+
+@router.post("/logout")
+async def logout(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+):
+    """Revoke the session the access token belongs to"""
+    claims = AuthService.get_token_claims(db, credentials.credentials)
+    if claims.session_id:
+        SessionService.revoke(db, claims.session_id)
+    return {"message": "Logged out"}
+
+
+@router.post("/logout-all")
+async def logout_all(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+):
+    """Revoke every session of the current user"""
+    claims = AuthService.get_token_claims(db, credentials.credentials)
+    revoked = SessionService.revoke_user(db, claims.user_id)
+    return {"message": f"Revoked {revoked} sessions"}
\ No newline at end of file
@@ -0,0 +1,55 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from db.session import get_db
+from schemas.order import DeliveryRequestCreate, DeliveryRequestResponse
+from services.auth import AuthService
+from services.delivery import DeliveryService
+from utils.token import TokenClaims
+from config import settings
+
+router = APIRouter()
+security = HTTPBearer()
+
+def get_current_claims(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> TokenClaims:
+    """Get the caller's token claims without loading the user"""
+    return AuthService.get_token_claims(db, credentials.credentials)
+
+@router.post("", response_model=DeliveryRequestResponse)
+async def create_delivery_request(
+    request_data: DeliveryRequestCreate,
+    claims: TokenClaims = Depends(get_current_claims),
+    db: Session = Depends(get_db)
+):
+    """Request delivery for one of your orders
+
+    The request is handed to its logistics partner with the next dispatch
+    batch; poll it here for the tracking reference and status.
+    """
+    return DeliveryService.create_request(db, claims, request_data)
+
+@router.get("", response_model=List[DeliveryRequestResponse])
+async def get_delivery_requests(
+    order_id: Optional[int] = None,
+    delivery_status: Optional[str] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    claims: TokenClaims = Depends(get_current_claims),
+    db: Session = Depends(get_db)
+):
+    """Delivery requests on your purchases (buyers) or sales (sellers), newest first"""
+    return DeliveryService.list_requests(db, claims, order_id, delivery_status, skip, limit)
+
+@router.get("/{request_id}", response_model=DeliveryRequestResponse)
+async def get_delivery_request(
+    request_id: int,
+    claims: TokenClaims = Depends(get_current_claims),
+    db: Session = Depends(get_db)
+):
+    """Track a delivery request"""
+    return DeliveryService.get_request(db, claims, request_id)
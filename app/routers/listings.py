@@ -1,12 +1,21 @@
-from fastapi import APIRouter, Depends, File, UploadFile
+import asyncio
+
+from fastapi import APIRouter, Depends, File, UploadFile, Query, HTTPException, status, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from decimal import Decimal
 
 from db.session import get_db
-from schemas.listing import ListingCreate, ListingResponse, ListingUpdate, ImageUploadResponse
+from schemas.listing import ListingCreate, ListingResponse, ListingUpdate, ListingStatusUpdate, ImageUploadResponse
 from services.listing import ListingService
+from services.similar import SimilarListingService
+from services.recommendation import RecommendationService
 from services.auth import AuthService
+from services.feed import buses, LISTING_CHANNEL
+from utils.pubsub import sse_message
+from config import settings
 from models import User
 
 router = APIRouter()
@@ -39,10 +48,103 @@ async def get_listings(
     search: Optional[str] = None,
     skip: int = 0,
     limit: int = 20,
+    price_min: Optional[Decimal] = None,
+    price_max: Optional[Decimal] = None,
+    item_condition: Optional[List[str]] = Query(None),
+    vendor_id: Optional[int] = None,
+    sort: str = "ranked",
     db: Session = Depends(get_db)
 ):
-    """Get listings with optional filtering"""
-    return ListingService.get_listings(db, category, search, skip, limit)
+    """Get listings with optional filtering and sorting
+
+    sort is one of ranked (default: recency with premium and rating boosts),
+    newest, price_asc, price_desc or relevance (relevance needs a search
+    term). search needs a category or vendor_id.
+    """
+    return ListingService.get_listings(
+        db, category, search, skip, limit,
+        price_min=price_min,
+        price_max=price_max,
+        conditions=item_condition,
+        vendor_id=vendor_id,
+        sort=sort
+    )
+
+def _feed_topics(categories: Optional[List[str]], listing_ids: Optional[List[int]]) -> List[str]:
+    topics = [f"category:{c}" for c in categories or []] + [f"listing:{i}" for i in listing_ids or []]
+    if not topics:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Subscribe to at least one category or listing_id"
+        )
+    if len(topics) > settings.FEED_MAX_TOPICS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.FEED_MAX_TOPICS} categories and listings per connection"
+        )
+    return topics
+
+async def _sse_events(topics: List[str]):
+    with buses[LISTING_CHANNEL].subscribe(topics) as subscription:
+        yield "retry: 5000\n\n"
+        while True:
+            event = await subscription.get(settings.FEED_KEEPALIVE_SECONDS)
+            if event is None:
+                yield ": keepalive\n\n"
+                continue
+            yield sse_message(event)
+
+@router.get("/feed")
+async def listing_feed(
+    category: Optional[List[str]] = Query(None),
+    listing_id: Optional[List[int]] = Query(None)
+):
+    """Server-Sent Events stream of changes to the given categories and listings
+
+    Events are listing.created, listing.updated, listing.activated and
+    listing.deactivated (carrying the new status); resync means events were dropped and the client
+    should refetch what it shows.
+    """
+    topics = _feed_topics(category, listing_id)
+    return StreamingResponse(
+        _sse_events(topics),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/feed/ws")
+async def listing_feed_ws(
+    websocket: WebSocket,
+    category: Optional[List[str]] = Query(None),
+    listing_id: Optional[List[int]] = Query(None)
+):
+    """WebSocket variant of /listings/feed; events are sent as JSON messages"""
+    try:
+        topics = _feed_topics(category, listing_id)
+    except HTTPException as e:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=e.detail)
+        return
+
+    await websocket.accept()
+    # Watch for the client closing while we wait on events
+    incoming = asyncio.ensure_future(websocket.receive())
+    try:
+        with buses[LISTING_CHANNEL].subscribe(topics) as subscription:
+            while True:
+                next_event = asyncio.ensure_future(subscription.get(settings.FEED_KEEPALIVE_SECONDS))
+                while not next_event.done():
+                    await asyncio.wait({next_event, incoming}, return_when=asyncio.FIRST_COMPLETED)
+                    if incoming.done():
+                        if incoming.result()["type"] == "websocket.disconnect":
+                            next_event.cancel()
+                            return
+                        # Client messages are ignored
+                        incoming = asyncio.ensure_future(websocket.receive())
+                await websocket.send_json(next_event.result() or {"type": "keepalive"})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        incoming.cancel()
 
 @router.get("/my-listings", response_model=List[ListingResponse])
 async def get_my_listings(
@@ -52,11 +154,34 @@ async def get_my_listings(
     """Get current user's listings"""
     return ListingService.get_user_listings(db, current_user)
 
+@router.get("/recommended", response_model=List[ListingResponse])
+async def get_recommended_listings(
+    skip: int = Query(0, ge=0, le=settings.MAX_LISTING_OFFSET),
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Active listings picked for the current user from their orders and reviews
+
+    Refreshed in batch (jobs/build_recommendations.py); users without
+    history yet get the ranked browse of GET /listings.
+    """
+    return RecommendationService.recommended(db, current_user, skip, limit)
+
 @router.get("/{listing_id}", response_model=ListingResponse)
 async def get_listing(listing_id: int, db: Session = Depends(get_db)):
     """Get listing by ID"""
     return ListingService.get_listing_by_id(db, listing_id)
 
+@router.get("/{listing_id}/similar", response_model=List[ListingResponse])
+async def get_similar_listings(
+    listing_id: int,
+    limit: int = Query(10, ge=1, le=settings.MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    """Active listings most like this one, best match first"""
+    return SimilarListingService.similar(db, listing_id, limit)
+
 @router.put("/{listing_id}", response_model=ListingResponse)
 async def update_listing(
     listing_id: int,
@@ -73,5 +198,28 @@ async def toggle_listing_status(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Toggle listing active status"""
-    return ListingService.toggle_listing_status(db, listing_id, current_user)
\ No newline at end of file
+    """Pause an active listing, or put a paused, sold or archived one back on sale"""
+    return ListingService.toggle_listing_status(db, listing_id, current_user)
+
+@router.put("/{listing_id}/status", response_model=ListingResponse)
+async def update_listing_status(
+    listing_id: int,
+    status_data: ListingStatusUpdate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Move a listing to active, paused or archived (orders mark it sold)
+
+    Only active listings are shown and can be ordered. Archived listings
+    can be restored until compaction removes them (jobs/compact_listings.py).
+    """
+    return ListingService.set_status(db, listing_id, status_data.status, current_user)
+
+@router.delete("/{listing_id}", response_model=ListingResponse)
+async def delete_listing(
+    listing_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Archive a listing (soft delete)"""
+    return ListingService.set_status(db, listing_id, "archived", current_user)
\ No newline at end of file
@@ -1,16 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 
-from app.db.session import get_db
-from schemas.order import OrderCreate, OrderResponse, OrderStatusUpdate
-from services.auth import AuthService
-from models import User, Order, Listing, Wallet, Payment, Vendor, VendorPlan
+from db.session import get_db, SessionLocal
+from schemas.order import OrderCreate, OrderResponse, OrderStatusUpdate, OrderBulkShip, OrderBulkShipResponse
+from services.auth import AuthService, credentials_exception
+from services.order import OrderService
+from services.order_events import OrderEventService
+from utils.token import TokenClaims
+from models import User, Order
+from config import settings
 
 router = APIRouter()
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
@@ -19,129 +25,120 @@ def get_current_user(
     """Get current authenticated user"""
     return AuthService.get_current_user(db, credentials.credentials)
 
+def get_current_claims(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> TokenClaims:
+    """Get the caller's token claims without loading the user"""
+    return AuthService.get_token_claims(db, credentials.credentials)
+
+@router.get("/events")
+async def order_events(
+    request: Request,
+    access_token: Optional[str] = None,
+    last_event_id: Optional[int] = None,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+):
+    """Server-Sent Events stream of status changes on the caller's purchases and sales
+
+    Browsers' EventSource cannot set headers, so the token may also be passed
+    as ?access_token=. Reconnects resume after the Last-Event-ID header (or
+    ?last_event_id=); a resync event means the gap was too large to replay.
+    """
+    token_str = credentials.credentials if credentials else access_token
+    if not token_str:
+        raise credentials_exception()
+    # Not Depends(get_db): that session would stay open for the life of the stream
+    db = SessionLocal()
+    try:
+        claims = AuthService.get_token_claims(db, token_str)
+    finally:
+        db.close()
+
+    header = request.headers.get("last-event-id")
+    if header and header.isdigit():
+        last_event_id = int(header)
+    return StreamingResponse(
+        OrderEventService.stream(claims, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.post("", response_model=OrderResponse)
 async def create_order(
     order_data: OrderCreate,
-    current_user: User = Depends(get_current_user),
+    claims: TokenClaims = Depends(get_current_claims),
     db: Session = Depends(get_db)
 ):
-    """Create a new order"""
-    if current_user.user_type != "buyer":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only buyers can create orders"
-        )
-    
-    listing = db.query(Listing).filter(
-        Listing.id == order_data.listing_id,
-        Listing.is_active == True
-    ).first()
-    
-    if not listing:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Listing not found or inactive"
-        )
-    
-    # Check buyer's wallet balance
-    wallet = db.query(Wallet).filter(Wallet.user_id == current_user.id).first()
-    if wallet.balance < listing.price:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Insufficient wallet balance"
-        )
-    
-    # Create order
-    order = Order(
-        buyer_id=current_user.id,
-        listing_id=listing.id,
-        status="pending",
-        ordered_at=datetime.utcnow()
-    )
-    
-    db.add(order)
-    db.commit()
-    db.refresh(order)
-    
-    # Deduct from buyer's wallet (escrow)
-    wallet.balance -= listing.price
-    wallet.updated_at = datetime.utcnow()
-    
-    # Create payment record
-    payment = Payment(
-        order_id=order.id,
-        amount=listing.price,
-        payment_method="wallet",
-        status="completed",
-        created_at=datetime.utcnow()
-    )
-    
-    db.add(payment)
-    db.commit()
-    
-    return order
+    """Create a new order
+
+    The listing is reserved, the price escrowed from the buyer's wallet and
+    the order recorded atomically; losing a race for the listing gives 409.
+    """
+    return OrderService.create_order(db, claims, order_data.listing_id)
 
 @router.get("/my-purchases", response_model=List[OrderResponse])
 async def get_my_purchases(
-    current_user: User = Depends(get_current_user),
+    before: Optional[datetime] = None,
+    before_id: Optional[int] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    claims: TokenClaims = Depends(get_current_claims),
     db: Session = Depends(get_db)
 ):
-    """Get current user's purchases"""
-    return db.query(Order).filter(Order.buyer_id == current_user.id).all()
+    """Get current user's purchases, newest first
+
+    For the next page pass the last order's ordered_at as before and its
+    id as before_id. Closed orders older than ORDER_RETENTION_DAYS are
+    archived and no longer listed.
+    """
+    return OrderService.page(db, Order.buyer_id == claims.user_id, before, before_id, limit)
 
 @router.get("/my-sales", response_model=List[OrderResponse])
 async def get_my_sales(
-    current_user: User = Depends(get_current_user),
+    before: Optional[datetime] = None,
+    before_id: Optional[int] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    claims: TokenClaims = Depends(get_current_claims),
     db: Session = Depends(get_db)
 ):
-    """Get current user's sales"""
-    if current_user.user_type != "seller":
+    """Get current user's sales, newest first, paged like /my-purchases"""
+    if claims.user_type != "seller":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only sellers can view sales"
         )
     
-    vendor = db.query(Vendor).filter(Vendor.user_id == current_user.id).first()
-    if not vendor:
+    if claims.vendor_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Vendor profile not found"
         )
     
-    return db.query(Order).join(Listing).filter(Listing.vendor_id == vendor.id).all()
+    return OrderService.page(db, Order.vendor_id == claims.vendor_id, before, before_id, limit)
+
+@router.post("/ship", response_model=OrderBulkShipResponse)
+async def ship_orders(
+    data: OrderBulkShip,
+    claims: TokenClaims = Depends(get_current_claims),
+    db: Session = Depends(get_db)
+):
+    """Mark many of the seller's confirmed orders shipped at once"""
+    return OrderService.ship_many(db, claims, data.order_ids)
 
 @router.put("/{order_id}/status", response_model=OrderResponse)
 async def update_order_status(
     order_id: int,
     status_data: OrderStatusUpdate,
-    current_user: User = Depends(get_current_user),
+    claims: TokenClaims = Depends(get_current_claims),
     db: Session = Depends(get_db)
 ):
-    """Update order status"""
-    order = db.query(Order).filter(Order.id == order_id).first()
-    if not order:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Order not found"
-        )
-    
-    # Check authorization
-    listing = db.query(Listing).filter(Listing.id == order.listing_id).first()
-    vendor = db.query(Vendor).filter(Vendor.id == listing.vendor_id).first()
-    
-    if order.buyer_id != current_user.id and vendor.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to update this order"
-        )
-    
-    order.status = status_data.status
-    if status_data.status == "delivered":
-        order.delivered_at = datetime.utcnow()
-    
-    db.commit()
-    db.refresh(order)
-    return order
+    """Update order status
+
+    Only the moves in services/order.py TRANSITIONS are allowed for the
+    caller's side of the order; buyers confirm delivery (and release
+    payment) with /confirm-delivery. 409 if the order changed meanwhile.
+    """
+    return OrderService.update_status(db, claims, order_id, status_data.status)
 
 @router.put("/{order_id}/confirm-delivery")
 async def confirm_delivery(
@@ -149,39 +146,11 @@ async def confirm_delivery(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Confirm delivery and release payment to seller"""
-    order = db.query(Order).filter(
-        Order.id == order_id,
-        Order.buyer_id == current_user.id
-    ).first()
-    
-    if not order:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Order not found"
-        )
-    
-    if order.status != "shipped":
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Order must be shipped before confirmation"
-        )
-    
-    # Update order status
-    order.status = "delivered"
-    order.delivered_at = datetime.utcnow()
-    
-    # Release payment to seller
-    listing = db.query(Listing).filter(Listing.id == order.listing_id).first()
-    vendor = db.query(Vendor).filter(Vendor.id == listing.vendor_id).first()
-    seller_wallet = db.query(Wallet).filter(Wallet.user_id == vendor.user_id).first()
-    
-    # Calculate seller earnings (after platform fee)
-    vendor_plan = db.query(VendorPlan).filter(VendorPlan.id == vendor.plan_id).first()
-    seller_earnings = listing.price * (vendor_plan.remittance_rate / 100)
-    
-    seller_wallet.balance += seller_earnings
-    seller_wallet.updated_at = datetime.utcnow()
-    
-    db.commit()
+    """Confirm delivery and release payment to seller
+
+    Works on shipped orders and on ones the seller already marked
+    delivered, as long as they are not settled yet. Unconfirmed orders are settled automatically once past
+    AUTO_CONFIRM_SHIPPED_DAYS (see services/settlement.py).
+    """
+    OrderService.confirm_delivery(db, current_user.id, order_id)
     return {"message": "Delivery confirmed, payment released to seller"}
\ No newline at end of file
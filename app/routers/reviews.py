@@ -4,10 +4,11 @@ from sqlalchemy.orm import Session
 from typing import List
 from datetime import datetime
 
-from app.db.session import get_db
+from db.session import get_db
 from schemas.reviews import ReviewCreate, ReviewResponse, ReviewUpdate
 from services.auth import AuthService
-from models import User, Review, Order, Listing, Vendor
+from services.ranking import RankingService
+from models import User, Review, Order, OrderArchive
 
 router = APIRouter()
 security = HTTPBearer()
@@ -26,12 +27,15 @@ async def create_review(
     db: Session = Depends(get_db)
 ):
     """Create a new review"""
-    # Verify buyer has purchased from this vendor
-    order_exists = db.query(Order).join(Listing).join(Vendor).filter(
-        Order.buyer_id == current_user.id,
-        Vendor.id == review_data.vendor_id,
-        Order.status == "delivered"
-    ).first()
+    # Verify buyer has purchased from this vendor, archived orders included
+    order_exists = any(
+        db.query(model.id).filter(
+            model.buyer_id == current_user.id,
+            model.vendor_id == review_data.vendor_id,
+            model.status == "delivered"
+        ).first() is not None
+        for model in (Order, OrderArchive)
+    )
     
     if not order_exists:
         raise HTTPException(
@@ -60,6 +64,9 @@ async def create_review(
     )
     
     db.add(review)
+    db.flush()
+    # Vendor rating feeds listing scores
+    RankingService.refresh_vendor(db, review.vendor_id)
     db.commit()
     db.refresh(review)
     return review
@@ -100,6 +107,10 @@ async def update_review(
     for field, value in update_data.items():
         setattr(review, field, value)
     
+    if "rating" in update_data:
+        db.flush()
+        RankingService.refresh_vendor(db, review.vendor_id)
+    
     db.commit()
     db.refresh(review)
     return review
@@ -123,5 +134,7 @@ async def delete_review(
         )
     
     db.delete(review)
+    db.flush()
+    RankingService.refresh_vendor(db, review.vendor_id)
     db.commit()
     return {"message": "Review deleted successfully"}
\ No newline at end of file
@@ -1,11 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from typing import List
 
 from db.session import get_db
-from schemas.vendors import VendorPlanResponse, VendorResponse, VendorVerificationUpdate
+from schemas.vendors import VendorPlanResponse, VendorResponse, VendorVerificationUpdate, VendorPlanUpdate, VendorDashboardResponse
 from services.auth import AuthService
+from services.billing import BillingService
+from services.vendor_sales import VendorSalesService
+from utils.token import TokenClaims
 from models import User, Vendor, VendorPlan
 
 router = APIRouter()
@@ -18,6 +21,13 @@ def get_current_user(
     """Get current authenticated user"""
     return AuthService.get_current_user(db, credentials.credentials)
 
+def get_current_claims(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> TokenClaims:
+    """Get the caller's token claims without loading the user"""
+    return AuthService.get_token_claims(db, credentials.credentials)
+
 @router.get("/plans", response_model=List[VendorPlanResponse])
 async def get_vendor_plans(db: Session = Depends(get_db)):
     """Get all vendor plans"""
@@ -44,6 +54,27 @@ async def get_my_vendor_profile(
     
     return vendor
 
+@router.get("/me/dashboard", response_model=VendorDashboardResponse)
+async def get_my_dashboard(
+    days: int = Query(30, ge=1, le=90),
+    weeks: int = Query(12, ge=1, le=26),
+    top: int = Query(10, ge=1, le=50),
+    claims: TokenClaims = Depends(get_current_claims),
+    db: Session = Depends(get_db)
+):
+    """Sales dashboard: daily and weekly revenue, order counts by status,
+    payouts after the plan's remittance rate and top listings
+
+    Served from rollups kept current by the order lifecycle, so the cost
+    does not grow with sales history.
+    """
+    if claims.user_type != "seller" or claims.vendor_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only sellers can access vendor dashboards"
+        )
+    return VendorSalesService.dashboard(db, claims.vendor_id, days, weeks, top)
+
 @router.put("/verification", response_model=VendorResponse)
 async def update_vendor_verification(
     verification_data: VendorVerificationUpdate,
@@ -68,4 +99,31 @@ async def update_vendor_verification(
     
     db.commit()
     db.refresh(vendor)
-    return vendor
\ No newline at end of file
+    return vendor
+
+@router.put("/plan", response_model=VendorResponse)
+async def update_vendor_plan(
+    plan_data: VendorPlanUpdate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Switch the current vendor to another plan
+
+    Upgrading charges this month's fee (less what was already paid for it)
+    from the vendor's wallet first; 402 if the balance does not cover it.
+    """
+    vendor = db.query(Vendor).filter(Vendor.user_id == current_user.id).first()
+    if not vendor:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Vendor profile not found"
+        )
+    
+    plan = db.query(VendorPlan).filter(VendorPlan.id == plan_data.plan_id).first()
+    if not plan:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Vendor plan not found"
+        )
+    
+    return BillingService.change_plan(db, vendor, plan)
\ No newline at end of file
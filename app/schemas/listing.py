@@ -3,6 +3,10 @@ from typing import Optional
 from decimal import Decimal
 from datetime import datetime
 
+VALID_CONDITIONS = ['new', 'like_new', 'good', 'fair', 'poor']
+LISTING_SORTS = ['ranked', 'newest', 'price_asc', 'price_desc', 'relevance']
+LISTING_STATUSES = ['active', 'paused', 'sold', 'archived']
+
 class ListingCreate(BaseModel):
     title: str
     description: Optional[str]
@@ -24,9 +28,8 @@ class ListingCreate(BaseModel):
     @field_validator('item_condition')
     @classmethod
     def validate_condition(cls, v):
-        valid_conditions = ['new', 'like_new', 'good', 'fair', 'poor']
-        if v not in valid_conditions:
-            raise ValueError(f'item_condition must be one of {valid_conditions}')
+        if v not in VALID_CONDITIONS:
+            raise ValueError(f'item_condition must be one of {VALID_CONDITIONS}')
         return v
 
 class ListingUpdate(BaseModel):
@@ -44,6 +47,16 @@ class ListingUpdate(BaseModel):
             raise ValueError('Price must be greater than 0')
         return v
 
+class ListingStatusUpdate(BaseModel):
+    status: str
+
+    @field_validator('status')
+    @classmethod
+    def validate_status(cls, v):
+        if v not in LISTING_STATUSES:
+            raise ValueError(f'status must be one of {LISTING_STATUSES}')
+        return v
+
 class ListingResponse(BaseModel):
     id: int
     vendor_id: int
@@ -53,6 +66,7 @@ class ListingResponse(BaseModel):
     item_condition: str
     category: str
     image_url: Optional[str]
+    status: str
     is_active: bool
     created_at: datetime
     
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, field_validator
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from decimal import Decimal
 
@@ -12,6 +12,8 @@ class OrderResponse(BaseModel):
     id: int
     buyer_id: int
     listing_id: int
+    vendor_id: Optional[int] = None
+    price: Optional[Decimal] = None  # what the buyer paid
     status: str
     ordered_at: datetime
     delivered_at: Optional[datetime]
@@ -31,6 +33,24 @@ class OrderStatusUpdate(BaseModel):
         return v
 
 
+MAX_BULK_ORDERS = 500
+
+class OrderBulkShip(BaseModel):
+    order_ids: List[int]
+
+    @field_validator('order_ids')
+    @classmethod
+    def validate_order_ids(cls, v):
+        v = sorted(set(v))
+        if not 1 <= len(v) <= MAX_BULK_ORDERS:
+            raise ValueError(f'order_ids must list between 1 and {MAX_BULK_ORDERS} orders')
+        return v
+
+class OrderBulkShipResponse(BaseModel):
+    shipped: List[int]
+    skipped: List[int]  # not the seller's, or not confirmed
+
+
 # PAYMENT SCHEMAS 
 class PaymentResponse(BaseModel):
     id: int
@@ -64,6 +84,9 @@ class DeliveryRequestResponse(BaseModel):
     logistics_partner: Optional[str]
     delivery_status: str
     confirmed_by_buyer: bool
+    tracking_reference: Optional[str] = None
+    created_at: Optional[datetime] = None
+    dispatched_at: Optional[datetime] = None
     
     class Config:
         from_attributes = True
\ No newline at end of file
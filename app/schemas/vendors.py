@@ -1,5 +1,6 @@
 from pydantic import BaseModel
-from datetime import datetime
+from typing import Dict, List
+from datetime import date, datetime
 from decimal import Decimal
 
 #Vendor Plan
@@ -32,4 +33,35 @@ class VendorVerificationUpdate(BaseModel):
     location_verified: bool
 
 class VendorPlanUpdate(BaseModel):
-    plan_id: int
\ No newline at end of file
+    plan_id: int
+
+#Vendor Dashboard
+class DailySales(BaseModel):
+    day: date
+    orders: int
+    gross: Decimal
+    payouts: Decimal
+
+class WeeklySales(BaseModel):
+    week_start: date
+    orders: int
+    gross: Decimal
+    payouts: Decimal
+
+class ListingSales(BaseModel):
+    listing_id: int
+    title: str
+    orders: int
+    gross: Decimal
+
+class VendorDashboardResponse(BaseModel):
+    vendor_id: int
+    remittance_rate: Decimal
+    orders: int
+    gross: Decimal
+    payouts: Decimal
+    pending_payouts: Decimal  # escrow the seller will receive once orders settle
+    status_counts: Dict[str, int]
+    daily: List[DailySales]
+    weekly: List[WeeklySales]
+    top_listings: List[ListingSales]
\ No newline at end of file
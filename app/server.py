@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Production server for ClutterHaven.
+
+Usage (from the repository root):
+    python -m app.server [--workers N] [--host HOST] [--port PORT]
+
+The app is imported once in the master process, then one uvicorn worker per
+CPU (or WEB_CONCURRENCY) is forked and they all share the listening socket.
+Each worker gets an equal share of DB_MAX_CONNECTIONS for its pool.
+
+Signals handled by the master:
+    SIGTERM, SIGINT  workers stop accepting and drain in-flight requests for
+                     up to GRACEFUL_TIMEOUT seconds, then the master exits
+    SIGHUP           graceful reload, deploying new code: the master checks
+                     the app still imports, then re-executes itself (same
+                     pid, same listening socket), forks fresh workers and
+                     only then drains the old ones
+Workers that die unexpectedly are restarted; ones that die within
+WORKER_MIN_UPTIME seconds of starting are restarted with exponential backoff
+(up to WORKER_MAX_BACKOFF seconds), so a worker crashing on boot does not
+turn into a fork loop.
+
+Use `uvicorn app.main:app --reload` for development.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import signal
+import socket
+import subprocess
+import time
+from typing import Dict, List, Optional, Tuple
+
+import uvicorn
+
+from config import settings
+
+# Passed to the re-executed master on SIGHUP
+LISTEN_FD_ENV = "CLUTTERHAVEN_LISTEN_FD"
+OLD_WORKERS_ENV = "CLUTTERHAVEN_OLD_WORKERS"
+WORKER_MIN_UPTIME = 5.0  # seconds; exiting sooner counts as a failed boot
+WORKER_MAX_BACKOFF = 30.0
+
+
+def worker_count(requested: int = 0) -> int:
+    """Workers to run: the explicit request, WEB_CONCURRENCY, or one per CPU"""
+    return requested or settings.WEB_CONCURRENCY or os.cpu_count() or 1
+
+
+def pool_sizes(workers: int) -> Tuple[int, int]:
+    """Split DB_MAX_CONNECTIONS between workers as (pool_size, max_overflow)"""
+    per_worker = max(2, settings.DB_MAX_CONNECTIONS // workers)
+    pool_size = max(1, per_worker * 2 // 3)  # steady-state connections
+    return pool_size, per_worker - pool_size
+
+
+class Arbiter:
+    """Fork, supervise and gracefully replace uvicorn workers"""
+
+    def __init__(self, config: uvicorn.Config, sock: socket.socket, workers: int, retiring: Optional[List[int]] = None):
+        self.config = config
+        self.sock = sock
+        self.workers = workers
+        self.children: Dict[int, float] = {}  # pid -> start time
+        self.retiring = set(retiring or ())  # workers of the previous code, draining
+        self.restarts: List[float] = []  # when replacements for crashed workers are due
+        self.failures = 0  # consecutive workers that died during boot
+        self.stopping = False
+        self.reloading = False
+
+    def spawn(self) -> int:
+        pid = os.fork()
+        if pid:
+            self.children[pid] = time.monotonic()
+            return pid
+
+        # Worker: restore default handlers so uvicorn installs its own
+        for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+            signal.signal(sig, signal.SIG_DFL)
+        from db.session import engine
+        # Connections opened by the master must not be shared across forks
+        engine.dispose(close=False)
+        try:
+            uvicorn.Server(self.config).run(sockets=[self.sock])
+        finally:
+            os._exit(0)
+
+    def _handle_stop(self, signum, frame):
+        self.stopping = True
+
+    def _handle_reload(self, signum, frame):
+        self.reloading = True
+
+    def _reap(self):
+        """Collect exited workers and schedule replacements for the ones we did not stop"""
+        while self.children or self.retiring:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            self.retiring.discard(pid)
+            started = self.children.pop(pid, None)
+            if started is None or self.stopping:
+                continue
+            now = time.monotonic()
+            if now - started < WORKER_MIN_UPTIME:
+                self.failures += 1
+                delay = min(WORKER_MAX_BACKOFF, 2.0 ** (self.failures - 1))
+            else:
+                self.failures = 0
+                delay = 0.0
+            print(f"Worker {pid} exited unexpectedly, restarting in {delay:.0f}s")
+            self.restarts.append(now + delay)
+
+    def _restart_due(self):
+        now = time.monotonic()
+        due = [at for at in self.restarts if at <= now]
+        self.restarts = [at for at in self.restarts if at > now]
+        for _ in due:
+            self.spawn()
+
+    def reload(self):
+        """Re-execute the master on the new code, handing over the socket and the old workers.
+
+        The app is imported in a throwaway interpreter first; if that fails
+        the current workers keep serving the old code.
+        """
+        check = subprocess.run([sys.executable, "-c", "import app.main"], capture_output=True, text=True)
+        if check.returncode != 0:
+            print(f"Reload aborted, the app does not import:\n{check.stderr}")
+            return
+        print(f"Reloading: re-executing master, {len(self.children)} workers will drain")
+        os.set_inheritable(self.sock.fileno(), True)
+        env = dict(os.environ)
+        env[LISTEN_FD_ENV] = str(self.sock.fileno())
+        env[OLD_WORKERS_ENV] = ",".join(str(pid) for pid in list(self.children) + list(self.retiring))
+        os.execve(sys.executable, [sys.executable, "-m", "app.server"] + sys.argv[1:], env)
+
+    def retire(self):
+        """Drain the previous code's workers once this master's workers are up"""
+        for pid in self.retiring:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def stop(self):
+        """Let every worker drain, killing the ones that overrun GRACEFUL_TIMEOUT"""
+        for pid in list(self.children) + list(self.retiring):
+            os.kill(pid, signal.SIGTERM)
+        deadline = time.monotonic() + settings.GRACEFUL_TIMEOUT + 5
+        while (self.children or self.retiring) and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.1)
+        for pid in list(self.children) + list(self.retiring):
+            os.kill(pid, signal.SIGKILL)
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGHUP, self._handle_reload)
+
+        for _ in range(self.workers):
+            self.spawn()
+        print(f"Master {os.getpid()} serving on {self.config.host}:{self.config.port} with {self.workers} workers")
+        self.retire()
+
+        while not self.stopping:
+            if self.reloading:
+                self.reloading = False
+                self.reload()
+            self._reap()
+            self._restart_due()
+            time.sleep(0.2)
+
+        self.stop()
+        self.sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the production API server")
+    parser.add_argument("--host", default=settings.API_HOST)
+    parser.add_argument("--port", type=int, default=settings.API_PORT)
+    parser.add_argument("--workers", type=int, default=0)
+    args = parser.parse_args()
+
+    workers = worker_count(args.workers)
+    # The engine reads these when db.session is first imported below
+    settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW = pool_sizes(workers)
+
+    uvicorn_options = dict(
+        host=args.host,
+        port=args.port,
+        loop="auto",  # uvloop when installed
+        http="httptools",
+        timeout_keep_alive=settings.KEEP_ALIVE_TIMEOUT,
+        timeout_graceful_shutdown=settings.GRACEFUL_TIMEOUT,
+    )
+
+    if not hasattr(os, "fork"):
+        # Windows: uvicorn's own multi-process mode, without preloading
+        uvicorn.run("app.main:app", workers=workers, **uvicorn_options)
+        return
+
+    # Preload once in the master; workers inherit the imported app
+    from app.main import app
+
+    config = uvicorn.Config(app, **uvicorn_options)
+    if LISTEN_FD_ENV in os.environ:
+        # Re-executed by SIGHUP: keep the listening socket and drain the old workers
+        sock = socket.socket(fileno=int(os.environ.pop(LISTEN_FD_ENV)))
+        retiring = [int(pid) for pid in os.environ.pop(OLD_WORKERS_ENV, "").split(",") if pid]
+    else:
+        sock, retiring = config.bind_socket(), []
+    Arbiter(config, sock, workers, retiring).run()
+
+
+if __name__ == "__main__":
+    main()
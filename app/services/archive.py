@@ -0,0 +1,201 @@
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import and_, exists, insert, or_, select, union_all
+from sqlalchemy.orm import Session
+
+from config import settings
+from models import (
+    Order, Payment, DeliveryRequest, OrderEvent, Listing, VendorListingSales,
+    OrderArchive, PaymentArchive, DeliveryRequestArchive, ListingArchive
+)
+from services.partitions import PartitionService
+from utils import metrics
+
+metrics.describe("archive_run_seconds", "Duration of the last order archival run")
+metrics.describe("archive_orders_total", "Closed orders moved to the archive tables")
+metrics.describe("listing_compaction_seconds", "Duration of the last listing compaction run")
+metrics.describe("listings_compacted_total", "Archived listings moved to listings_archive")
+
+# Hot table -> archive table, parents first
+_ARCHIVES = (
+    (Order, OrderArchive),
+    (Payment, PaymentArchive),
+    (DeliveryRequest, DeliveryRequestArchive),
+)
+
+
+class ArchiveService:
+    """Cold storage for closed orders.
+
+    Orders delivered and settled, or cancelled, before ORDER_RETENTION_DAYS
+    ago move with their payments and delivery requests to the *_archive
+    tables, ARCHIVE_CHUNK orders per transaction; their order events are
+    dropped. The hot tables keep only recent and open orders, so old
+    monthly partitions empty out and are dropped whole. Reports over all
+    of history (rollup rebuilds, payout reconciliation, exports) read
+    ``all_orders()`` instead of Order.
+
+    Listings the seller archived LISTING_COMPACT_DAYS ago move to
+    listings_archive the same way, unless an order or sales rollup still
+    points at them.
+    """
+
+    @staticmethod
+    def all_orders():
+        """Hot and archived orders as one subquery with Order's columns"""
+        columns = [column.name for column in OrderArchive.__table__.columns]
+        return union_all(
+            select(*[Order.__table__.c[name] for name in columns]),
+            select(*[OrderArchive.__table__.c[name] for name in columns])
+        ).subquery("all_orders")
+
+    @staticmethod
+    def closed_before(cutoff: datetime):
+        return and_(
+            Order.ordered_at < cutoff,
+            or_(
+                Order.status == "cancelled",
+                and_(Order.status == "delivered", Order.settled_at.isnot(None))
+            )
+        )
+
+    @staticmethod
+    def archive_chunk(db: Session, cutoff: datetime, after_id: int, limit: int) -> Tuple[Optional[int], int]:
+        """Move up to ``limit`` closed orders older than ``cutoff`` with ids above ``after_id``.
+
+        Returns (last order id looked at, orders moved); the id is None once
+        none are left. Keyset order keeps each chunk from rescanning the
+        old orders that are still open.
+        """
+        try:
+            # SKIP LOCKED (Postgres): orders another transaction holds are left for the next run
+            rows = db.execute(
+                select(Order.id, Order.ordered_at).where(Order.id > after_id, ArchiveService.closed_before(cutoff))
+                .order_by(Order.id).limit(limit).with_for_update(skip_locked=True)
+            ).all()
+            if not rows:
+                db.rollback()
+                return None, 0
+            ids = [row.id for row in rows]
+            first = min(row.ordered_at for row in rows)
+            # Bounds on the partition keys, so Postgres only visits the months involved
+            # (payments are never older than their order)
+            scope = {
+                Order: [Order.id.in_(ids), Order.ordered_at.between(first, max(row.ordered_at for row in rows))],
+                Payment: [Payment.order_id.in_(ids), Payment.created_at >= first],
+                DeliveryRequest: [DeliveryRequest.order_id.in_(ids)],
+            }
+
+            for hot, cold in _ARCHIVES:
+                columns = [column.name for column in cold.__table__.columns]
+                db.execute(insert(cold).from_select(
+                    columns, select(*[hot.__table__.c[name] for name in columns]).where(*scope[hot])
+                ))
+            db.query(OrderEvent).filter(OrderEvent.order_id.in_(ids)).delete(synchronize_session=False)
+            # Children first: nothing enforces the references on partitioned tables
+            for hot, _ in reversed(_ARCHIVES):
+                db.query(hot).filter(*scope[hot]).delete(synchronize_session=False)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        metrics.inc("archive_orders_total", len(ids))
+        return ids[-1], len(ids)
+
+    @staticmethod
+    def run(db: Session, retention_days: Optional[int] = None, chunk: Optional[int] = None) -> Dict[str, float]:
+        """Archive every closed order past the retention window, then tidy partitions.
+
+        Next months' partitions are created and old ones left empty are
+        dropped (Postgres only).
+        """
+        retention_days = settings.ORDER_RETENTION_DAYS if retention_days is None else retention_days
+        chunk = chunk or settings.ARCHIVE_CHUNK
+        cutoff = datetime.utcnow() - timedelta(days=retention_days)
+        started = time.perf_counter()
+
+        summary = {"orders": 0, "chunks": 0}
+        last_id = 0
+        while True:
+            last_id, moved = ArchiveService.archive_chunk(db, cutoff, last_id, chunk)
+            if last_id is None:
+                break
+            summary["orders"] += moved
+            summary["chunks"] += 1
+
+        try:
+            bind = db.connection()
+            summary["partitions_created"] = len(PartitionService.ensure(bind))
+            summary["partitions_dropped"] = len(PartitionService.drop_empty(bind, cutoff.date()))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        summary["seconds"] = time.perf_counter() - started
+        metrics.set_gauge("archive_run_seconds", summary["seconds"])
+        return summary
+
+    @staticmethod
+    def compactable(cutoff: datetime):
+        """Archived before ``cutoff`` and referenced by no order, hot or archived"""
+        return and_(
+            Listing.status == "archived",
+            Listing.status_changed_at < cutoff,
+            ~exists().where(Order.listing_id == Listing.id),
+            ~exists().where(OrderArchive.listing_id == Listing.id),
+            ~exists().where(
+                VendorListingSales.vendor_id == Listing.vendor_id,
+                VendorListingSales.listing_id == Listing.id
+            ),
+        )
+
+    @staticmethod
+    def compact_listings_chunk(db: Session, cutoff: datetime, after_id: int, limit: int) -> Tuple[Optional[int], int]:
+        """Move up to ``limit`` compactable listings with ids above ``after_id``.
+
+        Returns (last listing id looked at, listings moved), like archive_chunk.
+        """
+        try:
+            # Locked rows cannot be restored or re-listed while they move
+            ids = db.execute(
+                select(Listing.id).where(Listing.id > after_id, ArchiveService.compactable(cutoff))
+                .order_by(Listing.id).limit(limit).with_for_update(skip_locked=True, of=Listing)
+            ).scalars().all()
+            if not ids:
+                db.rollback()
+                return None, 0
+            columns = [column.name for column in ListingArchive.__table__.columns]
+            db.execute(insert(ListingArchive).from_select(
+                columns, select(*[Listing.__table__.c[name] for name in columns]).where(Listing.id.in_(ids))
+            ))
+            db.query(Listing).filter(Listing.id.in_(ids)).delete(synchronize_session=False)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        metrics.inc("listings_compacted_total", len(ids))
+        return ids[-1], len(ids)
+
+    @staticmethod
+    def compact_listings(db: Session, days: Optional[int] = None, chunk: Optional[int] = None) -> Dict[str, float]:
+        """Move every listing archived more than ``days`` ago out of listings"""
+        days = settings.LISTING_COMPACT_DAYS if days is None else days
+        chunk = chunk or settings.ARCHIVE_CHUNK
+        cutoff = datetime.utcnow() - timedelta(days=days)
+        started = time.perf_counter()
+
+        summary = {"listings": 0, "chunks": 0}
+        last_id = 0
+        while True:
+            last_id, moved = ArchiveService.compact_listings_chunk(db, cutoff, last_id, chunk)
+            if last_id is None:
+                break
+            summary["listings"] += moved
+            summary["chunks"] += 1
+
+        summary["seconds"] = time.perf_counter() - started
+        metrics.set_gauge("listing_compaction_seconds", summary["seconds"])
+        return summary
@@ -1,16 +1,30 @@
-from datetime import datetime, timedelta, timezone
 from typing import Optional
-import jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
 from models import User
 from config import settings
+from utils import rate_limit, token
+from utils.token import TokenClaims
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+LOGIN_IP_LIMIT = rate_limit.Limit(settings.LOGIN_IP_PER_MINUTE, settings.LOGIN_IP_BURST)
+LOGIN_EMAIL_LIMIT = rate_limit.Limit(settings.LOGIN_EMAIL_PER_MINUTE, settings.LOGIN_EMAIL_BURST)
+
+# Verified against for unknown emails; hashed once at import (before the
+# server forks), so no login pays for computing it
+_DUMMY_HASH = pwd_context.hash("not-a-real-password")
+
+def credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
 class AuthService:
     @staticmethod
     def hash_password(password: str) -> str:
@@ -25,45 +39,49 @@ class AuthService:
     @staticmethod
     def create_access_token(data: dict) -> str:
         """Create a JWT access token"""
-        to_encode = data.copy()
-        # Use timezone-aware datetime
-        expire = datetime.now(timezone.utc) + timedelta(hours=settings.ACCESS_TOKEN_EXPIRE_HOURS)
-        to_encode.update({"exp": expire})
-        
-        # Ensure sub is stored as string for consistency
-        if "sub" in to_encode and isinstance(to_encode["sub"], int):
-            to_encode["sub"] = str(to_encode["sub"])
-            
-        return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+        return token.create_access_token(data)
+
+    @staticmethod
+    def create_user_token(user: User, session_id: Optional[str] = None) -> str:
+        """Access token carrying the claims routers authorize on"""
+        vendor = user.vendor_profile if user.user_type == "seller" else None
+        return token.create_access_token({
+            "sub": user.id,
+            "user_type": user.user_type,
+            "is_admin": bool(user.is_admin),
+            "vid": vendor.id if vendor else None,
+            "sid": session_id,
+        })
     
     @staticmethod
-    def verify_token(token: str) -> Optional[dict]:
+    def verify_token(token_str: str) -> Optional[dict]:
         """Verify and decode a JWT token"""
-        try:
-            payload = jwt.decode(
-                token, 
-                settings.SECRET_KEY, 
-                algorithms=[settings.ALGORITHM],
-                # Add leeway for clock skew
-                leeway=timedelta(seconds=10)
-            )
-            return payload
-        except jwt.ExpiredSignatureError:
-            # Token has expired
-            return None
-        except jwt.InvalidTokenError:
-            # Invalid token (includes PyJWTError)
-            return None
-        except Exception:
-            # Any other error
-            return None
+        return token.decode_token(token_str)
     
+    @staticmethod
+    def check_login_rate(ip: str, email: str):
+        """Reject login floods by caller IP, then by target email, before any DB or bcrypt work"""
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        limiter = rate_limit.backend()
+        wait = limiter.take(f"login:ip:{ip}", LOGIN_IP_LIMIT)
+        if not wait:
+            wait = limiter.take(f"login:email:{email.lower()}", LOGIN_EMAIL_LIMIT)
+        if wait:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many login attempts, try again later",
+                headers=rate_limit.retry_after_header(wait),
+            )
+
     @staticmethod
     def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
         """Authenticate a user with email and password"""
         try:
             user = db.query(User).filter(User.email == email).first()
             if not user:
+                # Pay the same bcrypt cost so timing does not reveal which emails exist
+                pwd_context.verify(password, _DUMMY_HASH)
                 return None
             if not AuthService.verify_password(password, user.password_hash):
                 return None
@@ -72,37 +90,44 @@ class AuthService:
             return None
     
     @staticmethod
-    def get_current_user(db: Session, token: str) -> User:
-        """Get current user from JWT token"""
-        credentials_exception = HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-        
+    def _claims(token_str: str) -> TokenClaims:
         # Strip 'Bearer ' prefix if present
-        if token.startswith("Bearer "):
-            token = token[7:]
-        
-        payload = AuthService.verify_token(token)
-        if payload is None:
-            raise credentials_exception
-        
-        # Get user_id from token - handle both string and int
-        user_id_raw = payload.get("sub")
-        if user_id_raw is None:
-            raise credentials_exception
-        
-        try:
-            # Convert to int if it's a string
-            user_id = int(user_id_raw) if isinstance(user_id_raw, str) else user_id_raw
-        except (ValueError, TypeError):
-            raise credentials_exception
-        
-        try:
-            user = db.query(User).filter(User.id == user_id).first()
-            if user is None:
-                raise credentials_exception
-            return user
-        except Exception:
-            raise credentials_exception
\ No newline at end of file
+        if token_str.startswith("Bearer "):
+            token_str = token_str[7:]
+
+        claims = token.verify_access_token(token_str)
+        if claims is None:
+            raise credentials_exception()
+        return claims
+
+    @staticmethod
+    def get_token_claims(db: Session, token_str: str) -> TokenClaims:
+        """Caller identity from the token alone, without loading the user.
+
+        Tokens issued before claims were embedded fall back to one lookup.
+        """
+        claims = AuthService._claims(token_str)
+        if claims.complete:
+            return claims
+
+        user = db.query(User).filter(User.id == claims.user_id).first()
+        if user is None:
+            raise credentials_exception()
+        vendor = user.vendor_profile if user.user_type == "seller" else None
+        return TokenClaims(
+            user_id=user.id,
+            user_type=user.user_type,
+            is_admin=bool(user.is_admin),
+            vendor_id=vendor.id if vendor else None,
+            session_id=claims.session_id,
+            exp=claims.exp,
+        )
+
+    @staticmethod
+    def get_current_user(db: Session, token_str: str) -> User:
+        """Get current user from JWT token"""
+        claims = AuthService._claims(token_str)
+        user = db.query(User).filter(User.id == claims.user_id).first()
+        if user is None:
+            raise credentials_exception()
+        return user
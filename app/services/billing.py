@@ -0,0 +1,194 @@
+import time
+from datetime import date, datetime
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.orm import Session
+
+from config import settings
+from models import Vendor, VendorPlan, VendorPlanCharge, Wallet
+from services.ranking import RankingService
+from utils import metrics
+
+metrics.describe("billing_run_seconds", "Duration of the last subscription billing run")
+metrics.describe("billing_charges_total", "Monthly plan fees debited from vendor wallets")
+metrics.describe("billing_downgrades_total", "Vendors moved to the free plan for an unpaid fee")
+
+_wallets = Wallet.__table__
+
+_debit = update(_wallets).where(
+    _wallets.c.user_id == bindparam("b_user_id"),
+    _wallets.c.balance >= bindparam("b_amount")
+).values(balance=_wallets.c.balance - bindparam("b_amount"), updated_at=bindparam("b_now"))
+
+
+def _insert(db: Session):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Billing needs INSERT ... ON CONFLICT, not available on {dialect}")
+    return insert(VendorPlanCharge)
+
+
+class BillingService:
+    """Monthly plan fees, debited from vendor wallets.
+
+    Vendors are billed in keyset-ordered chunks, each in its own
+    transaction. A chunk's charges, wallet debits and downgrades commit
+    together, and (vendor_id, period) is unique, so a run that crashed can
+    simply be started again: vendors already billed for the period are
+    skipped. Vendors whose wallet cannot cover the fee are moved to the
+    free plan.
+    """
+
+    @staticmethod
+    def period_of(day: date) -> date:
+        """The billing period (first day of the month) containing ``day``"""
+        return day.replace(day=1)
+
+    @staticmethod
+    def free_plan_id(db: Session) -> int:
+        plan_id = db.query(VendorPlan.id).filter(VendorPlan.monthly_fee == 0).order_by(VendorPlan.id).limit(1).scalar()
+        if plan_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="No free vendor plan to downgrade unpaid vendors to"
+            )
+        return plan_id
+
+    @staticmethod
+    def bill_chunk(db: Session, period: date, after_id: int, limit: int, free_plan_id: int) -> Tuple[Optional[int], int, int]:
+        """Bill up to ``limit`` unbilled paying vendors with ids above ``after_id``.
+
+        Returns (last vendor id looked at, paid, failed); the id is None
+        once no vendors are left.
+        """
+        now = datetime.utcnow()
+        billed = select(VendorPlanCharge.id).where(
+            VendorPlanCharge.vendor_id == Vendor.id,
+            VendorPlanCharge.period == period
+        ).exists()
+        try:
+            # SKIP LOCKED (Postgres): concurrent runs take disjoint vendors
+            rows = db.query(Vendor.id, Vendor.user_id, Vendor.plan_id, VendorPlan.monthly_fee).join(
+                VendorPlan, VendorPlan.id == Vendor.plan_id
+            ).filter(
+                VendorPlan.monthly_fee > 0,
+                Vendor.id > after_id,
+                ~billed
+            ).order_by(Vendor.id).limit(limit).with_for_update(of=Vendor, skip_locked=True).all()
+            if not rows:
+                db.rollback()
+                return None, 0, 0
+
+            # Locked in id order so concurrent debits cannot deadlock
+            balances = dict(db.query(Wallet.user_id, Wallet.balance).filter(
+                Wallet.user_id.in_([row.user_id for row in rows])
+            ).order_by(Wallet.user_id).with_for_update().all())
+            charges = [
+                {
+                    "vendor_id": row.id, "period": period, "plan_id": row.plan_id, "amount": row.monthly_fee,
+                    "status": "paid" if balances.get(row.user_id, 0) >= row.monthly_fee else "failed",
+                    "created_at": now,
+                }
+                for row in rows
+            ]
+            # A vendor another run billed meanwhile conflicts and is left alone
+            stmt = _insert(db).on_conflict_do_nothing(index_elements=["vendor_id", "period"])
+            charged = set(db.scalars(stmt.returning(VendorPlanCharge.vendor_id), charges).all())
+
+            paid = [row for row, charge in zip(rows, charges) if row.id in charged and charge["status"] == "paid"]
+            failed = [row.id for row, charge in zip(rows, charges) if row.id in charged and charge["status"] == "failed"]
+            if paid:
+                db.execute(_debit, [
+                    {"b_user_id": row.user_id, "b_amount": row.monthly_fee, "b_now": now}
+                    for row in paid
+                ])
+            if failed:
+                db.query(Vendor).filter(Vendor.id.in_(failed)).update(
+                    {"plan_id": free_plan_id}, synchronize_session=False
+                )
+                # Their listings lose the paid plan's visibility boost
+                for vendor_id in failed:
+                    RankingService.refresh_vendor(db, vendor_id)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        metrics.inc("billing_charges_total", len(paid))
+        metrics.inc("billing_downgrades_total", len(failed))
+        return rows[-1].id, len(paid), len(failed)
+
+    @staticmethod
+    def change_plan(db: Session, vendor: Vendor, plan: VendorPlan) -> Vendor:
+        """Move a vendor to ``plan``, charging the current period first when it costs more.
+
+        The fee is due in full for the month the vendor upgrades in, less
+        whatever they already paid for it, and is recorded on the same
+        (vendor_id, period) row the monthly run writes, which then skips
+        them. The plan only changes once the wallet debit succeeds; moving
+        to a cheaper plan takes effect at once without a refund.
+        """
+        now = datetime.utcnow()
+        period = BillingService.period_of(now.date())
+        try:
+            # Serializes with the monthly run, which locks vendors too
+            db.query(Vendor.id).filter(Vendor.id == vendor.id).with_for_update().one()
+            paid = db.query(VendorPlanCharge.amount).filter(
+                VendorPlanCharge.vendor_id == vendor.id,
+                VendorPlanCharge.period == period,
+                VendorPlanCharge.status == "paid"
+            ).scalar() or 0
+            due = plan.monthly_fee - paid
+            if due > 0:
+                debited = db.execute(_debit, {"b_user_id": vendor.user_id, "b_amount": due, "b_now": now}).rowcount
+                if not debited:
+                    raise HTTPException(
+                        status_code=status.HTTP_402_PAYMENT_REQUIRED,
+                        detail="Wallet balance does not cover this month's plan fee"
+                    )
+                stmt = _insert(db).values(
+                    vendor_id=vendor.id, period=period, plan_id=plan.id, amount=paid + due,
+                    status="paid", created_at=now
+                )
+                db.execute(stmt.on_conflict_do_update(
+                    index_elements=["vendor_id", "period"],
+                    set_={"plan_id": stmt.excluded.plan_id, "amount": stmt.excluded.amount, "status": "paid"}
+                ))
+                metrics.inc("billing_charges_total")
+
+            db.query(Vendor).filter(Vendor.id == vendor.id).update({"plan_id": plan.id}, synchronize_session=False)
+            # Listing scores carry the plan's visibility boost
+            RankingService.refresh_vendor(db, vendor.id)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        db.refresh(vendor)
+        return vendor
+
+    @staticmethod
+    def run(db: Session, period: Optional[date] = None, chunk: Optional[int] = None) -> Dict[str, float]:
+        """Bill every paying vendor for ``period`` (default: this month), BILLING_CHUNK per transaction"""
+        period = BillingService.period_of(period or datetime.utcnow().date())
+        chunk = chunk or settings.BILLING_CHUNK
+        started = time.perf_counter()
+        free_plan_id = BillingService.free_plan_id(db)
+
+        summary = {"paid": 0, "failed": 0, "chunks": 0}
+        last_id = 0
+        while True:
+            last_id, paid, failed = BillingService.bill_chunk(db, period, last_id, chunk, free_plan_id)
+            if last_id is None:
+                break
+            summary["paid"] += paid
+            summary["failed"] += failed
+            summary["chunks"] += 1
+
+        summary["seconds"] = time.perf_counter() - started
+        metrics.set_gauge("billing_run_seconds", summary["seconds"])
+        return summary
@@ -0,0 +1,323 @@
+import asyncio
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import bindparam, func, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, aliased
+
+from config import settings
+from db.session import SessionLocal
+from models import DeliveryRequest, Order, Listing, Vendor, User
+from schemas.order import DeliveryRequestCreate
+from utils import logistics, metrics
+from utils.token import TokenClaims
+
+metrics.describe("delivery_requests_dispatched_total", "Delivery requests handed to partners, by outcome")
+metrics.describe("delivery_batches_total", "Batch calls made to logistics partners")
+metrics.describe("delivery_status_updates_total", "Delivery statuses changed from partner tracking")
+metrics.describe("delivery_pending", "Delivery requests waiting for dispatch")
+
+_table = DeliveryRequest.__table__
+
+# Partner outcomes for rows the dispatcher holds; guarded on status so a
+# claim that timed out and was retried elsewhere is not overwritten
+_accept = update(_table).where(
+    _table.c.id == bindparam("b_id"),
+    _table.c.delivery_status == "dispatching"
+).values(delivery_status="in_transit", tracking_reference=bindparam("b_reference"))
+
+_track = update(_table).where(
+    _table.c.id == bindparam("b_id"),
+    _table.c.delivery_status == "in_transit"
+).values(delivery_status=bindparam("b_status"))
+
+
+def _chunks(items: list, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class DeliveryService:
+    """Delivery requests and their batched hand-off to logistics partners.
+
+    Creating a request only records it. The dispatcher claims pending
+    requests, groups them by partner and submits each group in batches of
+    DELIVERY_BATCH_SIZE; tracking is polled the same way. Buyers still
+    confirm delivery on the order, which releases the seller's payment.
+    """
+
+    @staticmethod
+    def _scoped(db: Session, claims: TokenClaims):
+        """Delivery requests on the caller's purchases or sales"""
+        query = db.query(DeliveryRequest).join(Order, Order.id == DeliveryRequest.order_id)
+        if claims.user_type == "seller":
+            return query.filter(Order.vendor_id == claims.vendor_id)
+        return query.filter(Order.buyer_id == claims.user_id)
+
+    @staticmethod
+    def create_request(db: Session, claims: TokenClaims, data: DeliveryRequestCreate) -> DeliveryRequest:
+        """Request delivery for an order the caller bought or sold"""
+        order = db.query(Order).filter(Order.id == data.order_id).first()
+        if order is None or (order.buyer_id != claims.user_id and order.vendor_id != claims.vendor_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Order not found"
+            )
+        if order.status in ("cancelled", "delivered"):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Cannot request delivery for a {order.status} order"
+            )
+
+        partner = data.logistics_partner or settings.LOGISTICS_DEFAULT_PARTNER
+        if not logistics.supports(partner):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unsupported logistics partner: {partner}"
+            )
+
+        existing = db.query(DeliveryRequest.id).filter(
+            DeliveryRequest.order_id == order.id,
+            DeliveryRequest.delivery_status != "failed"
+        ).first()
+        if existing:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Delivery already requested for this order"
+            )
+
+        request = DeliveryRequest(
+            order_id=order.id,
+            dispatch_option=data.dispatch_option,
+            logistics_partner=partner,
+            delivery_status="pending",
+            confirmed_by_buyer=False,
+            created_at=datetime.utcnow()
+        )
+        db.add(request)
+        try:
+            db.commit()
+        except IntegrityError:
+            # A concurrent request for the same order won (uq_delivery_requests_live_order)
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Delivery already requested for this order"
+            )
+        db.refresh(request)
+        return request
+
+    @staticmethod
+    def get_request(db: Session, claims: TokenClaims, request_id: int) -> DeliveryRequest:
+        request = DeliveryService._scoped(db, claims).filter(DeliveryRequest.id == request_id).first()
+        if not request:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Delivery request not found"
+            )
+        return request
+
+    @staticmethod
+    def list_requests(
+        db: Session,
+        claims: TokenClaims,
+        order_id: Optional[int] = None,
+        delivery_status: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 20
+    ) -> List[DeliveryRequest]:
+        query = DeliveryService._scoped(db, claims)
+        if order_id is not None:
+            query = query.filter(DeliveryRequest.order_id == order_id)
+        if delivery_status:
+            query = query.filter(DeliveryRequest.delivery_status == delivery_status)
+        return query.order_by(DeliveryRequest.id.desc()).offset(skip).limit(limit).all()
+
+    @staticmethod
+    def _claim(db: Session, limit: int) -> List[int]:
+        """Mark up to ``limit`` pending requests as ours and commit.
+
+        Claims abandoned by a crashed dispatcher go back to pending after
+        DELIVERY_CLAIM_TIMEOUT_MINUTES; partners dedupe on request_id.
+        """
+        now = datetime.utcnow()
+        db.query(DeliveryRequest).filter(
+            DeliveryRequest.delivery_status == "dispatching",
+            DeliveryRequest.dispatched_at < now - timedelta(minutes=settings.DELIVERY_CLAIM_TIMEOUT_MINUTES)
+        ).update({"delivery_status": "pending"}, synchronize_session=False)
+
+        # SKIP LOCKED (Postgres) lets several dispatchers claim disjoint rows
+        ids = [row[0] for row in db.query(DeliveryRequest.id).filter(
+            DeliveryRequest.delivery_status == "pending"
+        ).order_by(DeliveryRequest.id).limit(limit).with_for_update(skip_locked=True)]
+        if ids:
+            claimed = db.query(DeliveryRequest).filter(
+                DeliveryRequest.id.in_(ids),
+                DeliveryRequest.delivery_status == "pending"
+            ).update({"delivery_status": "dispatching", "dispatched_at": now}, synchronize_session=False)
+            if claimed != len(ids):
+                # Lost some rows to another dispatcher (no row locks on SQLite)
+                ids = [row[0] for row in db.query(DeliveryRequest.id).filter(
+                    DeliveryRequest.id.in_(ids),
+                    DeliveryRequest.dispatched_at == now
+                )]
+        db.commit()
+        return ids
+
+    @staticmethod
+    def _shipments(db: Session, ids: List[int]) -> Dict[str, List[dict]]:
+        """Partner -> payloads for the claimed requests, in one query"""
+        buyer = aliased(User)
+        seller = aliased(User)
+        rows = db.query(
+            DeliveryRequest.id, DeliveryRequest.order_id, DeliveryRequest.dispatch_option,
+            DeliveryRequest.logistics_partner, Listing.title,
+            buyer.full_name, buyer.phone, seller.full_name, seller.phone
+        ).join(Order, Order.id == DeliveryRequest.order_id) \
+         .join(Listing, Listing.id == Order.listing_id) \
+         .join(Vendor, Vendor.id == Order.vendor_id) \
+         .join(buyer, buyer.id == Order.buyer_id) \
+         .join(seller, seller.id == Vendor.user_id) \
+         .filter(DeliveryRequest.id.in_(ids)).all()
+
+        groups = defaultdict(list)
+        for request_id, order_id, option, partner, title, buyer_name, buyer_phone, seller_name, seller_phone in rows:
+            groups[partner or settings.LOGISTICS_DEFAULT_PARTNER].append({
+                "request_id": request_id,
+                "order_id": order_id,
+                "dispatch_option": option,
+                "item": title,
+                "sender": {"name": seller_name, "phone": seller_phone},
+                "recipient": {"name": buyer_name, "phone": buyer_phone},
+            })
+        return groups
+
+    @staticmethod
+    def _submit(db: Session, partner: str, batch: List[dict]) -> Dict[str, int]:
+        """One partner call for ``batch``; results written with two statements"""
+        ids = [shipment["request_id"] for shipment in batch]
+        metrics.inc("delivery_batches_total", partner=partner)
+        try:
+            references = logistics.client(partner).submit(batch)
+        except Exception as e:
+            print(f"Delivery batch for {partner} failed, will retry: {e}")
+            db.query(DeliveryRequest).filter(
+                DeliveryRequest.id.in_(ids),
+                DeliveryRequest.delivery_status == "dispatching"
+            ).update({"delivery_status": "pending", "dispatched_at": None}, synchronize_session=False)
+            db.commit()
+            metrics.inc("delivery_requests_dispatched_total", len(ids), partner=partner, outcome="error")
+            return {"error": len(ids)}
+
+        accepted = [{"b_id": i, "b_reference": references[i]} for i in ids if references.get(i)]
+        rejected = [i for i in ids if not references.get(i)]
+        if accepted:
+            db.execute(_accept, accepted)
+        if rejected:
+            db.query(DeliveryRequest).filter(
+                DeliveryRequest.id.in_(rejected),
+                DeliveryRequest.delivery_status == "dispatching"
+            ).update({"delivery_status": "failed"}, synchronize_session=False)
+        db.commit()
+        metrics.inc("delivery_requests_dispatched_total", len(accepted), partner=partner, outcome="accepted")
+        metrics.inc("delivery_requests_dispatched_total", len(rejected), partner=partner, outcome="rejected")
+        return {"accepted": len(accepted), "rejected": len(rejected)}
+
+    @staticmethod
+    def dispatch_pending(db: Session, batch_size: Optional[int] = None) -> Dict[str, int]:
+        """Submit every pending request, DELIVERY_CLAIM_LIMIT at a time"""
+        batch_size = batch_size or settings.DELIVERY_BATCH_SIZE
+        totals = defaultdict(int)
+        while True:
+            ids = DeliveryService._claim(db, settings.DELIVERY_CLAIM_LIMIT)
+            if not ids:
+                break
+            for partner, shipments in DeliveryService._shipments(db, ids).items():
+                for batch in _chunks(shipments, batch_size):
+                    for outcome, count in DeliveryService._submit(db, partner, batch).items():
+                        totals[outcome] += count
+            if len(ids) < settings.DELIVERY_CLAIM_LIMIT or totals["error"]:
+                # Failed batches wait for the next round rather than being retried straight away
+                break
+
+        metrics.set_gauge("delivery_pending", db.query(func.count(DeliveryRequest.id)).filter(
+            DeliveryRequest.delivery_status == "pending"
+        ).scalar())
+        return dict(totals)
+
+    @staticmethod
+    def sync_statuses(db: Session, batch_size: Optional[int] = None) -> int:
+        """Poll partners for in-transit requests and apply changes in bulk"""
+        batch_size = batch_size or settings.DELIVERY_BATCH_SIZE
+        updated, after_id = 0, 0
+        while True:
+            rows = db.query(
+                DeliveryRequest.id, DeliveryRequest.logistics_partner, DeliveryRequest.tracking_reference
+            ).filter(
+                DeliveryRequest.delivery_status == "in_transit",
+                DeliveryRequest.id > after_id
+            ).order_by(DeliveryRequest.id).limit(settings.DELIVERY_CLAIM_LIMIT).all()
+            if not rows:
+                break
+            after_id = rows[-1][0]
+
+            groups = defaultdict(list)
+            for request_id, partner, reference in rows:
+                groups[partner or settings.LOGISTICS_DEFAULT_PARTNER].append((request_id, reference))
+            for partner, requests in groups.items():
+                for batch in _chunks(requests, batch_size):
+                    metrics.inc("delivery_batches_total", partner=partner)
+                    try:
+                        statuses = logistics.client(partner).track([reference for _, reference in batch])
+                    except Exception as e:
+                        print(f"Delivery tracking for {partner} failed: {e}")
+                        continue
+                    changes = [
+                        {"b_id": request_id, "b_status": statuses[reference]}
+                        for request_id, reference in batch
+                        if statuses.get(reference, "in_transit") != "in_transit"
+                    ]
+                    if changes:
+                        db.execute(_track, changes)
+                        db.commit()
+                        updated += len(changes)
+                        for change in changes:
+                            metrics.inc("delivery_status_updates_total", status=change["b_status"])
+            if len(rows) < settings.DELIVERY_CLAIM_LIMIT:
+                break
+        return updated
+
+    @staticmethod
+    def mark_confirmed(db: Session, order_id: int):
+        """Flag the order's delivery as confirmed by the buyer; the caller commits"""
+        db.query(DeliveryRequest).filter(
+            DeliveryRequest.order_id == order_id,
+            DeliveryRequest.delivery_status != "failed"
+        ).update({"confirmed_by_buyer": True}, synchronize_session=False)
+
+    @staticmethod
+    def run_once() -> Dict[str, int]:
+        db = SessionLocal()
+        try:
+            started = time.perf_counter()
+            totals = DeliveryService.dispatch_pending(db)
+            totals["status_updates"] = DeliveryService.sync_statuses(db)
+            totals["seconds"] = round(time.perf_counter() - started, 3)
+            return totals
+        finally:
+            db.close()
+
+    @staticmethod
+    async def dispatch_forever():
+        """Background task dispatching and tracking every DELIVERY_DISPATCH_SECONDS"""
+        while True:
+            try:
+                await run_in_threadpool(DeliveryService.run_once)
+            except Exception as e:
+                print(f"Delivery dispatch failed: {e}")
+            await asyncio.sleep(settings.DELIVERY_DISPATCH_SECONDS)
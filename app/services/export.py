@@ -0,0 +1,213 @@
+import csv
+import io
+from datetime import datetime
+from decimal import Decimal
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import select, union_all
+
+from config import settings
+from db.session import SessionLocal
+from models import Payment, Order, Vendor, PaymentArchive, OrderArchive
+
+FORMATS = {"csv": "text/csv", "parquet": "application/vnd.apache.parquet"}
+
+
+class Report(NamedTuple):
+    columns: List[Tuple[str, str]]  # (name, kind); kind is int, str, datetime, money or rate
+    query: Callable  # (start, end, vendor_id) -> select
+    row: Callable = tuple  # database row -> output tuple
+
+
+def _between(column, start: Optional[datetime], end: Optional[datetime]) -> list:
+    criteria = []
+    if start:
+        criteria.append(column >= start)
+    if end:
+        criteria.append(column < end)
+    return criteria
+
+
+def _payments(start, end, vendor_id):
+    def part(payment, order):
+        query = select(
+            payment.id.label("payment_id"), payment.order_id, payment.created_at, order.buyer_id, order.vendor_id,
+            payment.payment_method, payment.status, payment.amount
+        ).join(order, order.id == payment.order_id) \
+         .where(*_between(payment.created_at, start, end))
+        if vendor_id is not None:
+            query = query.where(order.vendor_id == vendor_id)
+        return query
+
+    # Archived orders (services/archive.py) are part of the record too
+    query = union_all(part(Payment, Order), part(PaymentArchive, OrderArchive))
+    return query.order_by(query.selected_columns.payment_id)
+
+
+def _payouts(start, end, vendor_id):
+    def part(order):
+        query = select(
+            order.id.label("order_id"), order.settled_at, order.vendor_id, Vendor.user_id,
+            order.price, order.payout
+        ).join(Vendor, Vendor.id == order.vendor_id) \
+         .where(order.settled_at.isnot(None), *_between(order.settled_at, start, end))
+        if vendor_id is not None:
+            query = query.where(order.vendor_id == vendor_id)
+        return query
+
+    query = union_all(part(Order), part(OrderArchive))
+    return query.order_by(query.selected_columns.order_id)
+
+
+RATE = Decimal("0.0001")
+
+
+def _payout_row(row) -> tuple:
+    # Derived from what was actually credited at settlement, not the vendor's
+    # current plan, which may have changed since; the platform kept the rest
+    rate = (row.payout * 100 / row.price).quantize(RATE) if row.price else None
+    return (row.order_id, row.settled_at, row.vendor_id, row.user_id, row.price, rate, row.payout,
+            row.price - row.payout)
+
+
+REPORTS: Dict[str, Report] = {
+    "payments": Report(
+        [("payment_id", "int"), ("order_id", "int"), ("created_at", "datetime"), ("buyer_id", "int"),
+         ("vendor_id", "int"), ("payment_method", "str"), ("status", "str"), ("amount", "money")],
+        _payments,
+    ),
+    "payouts": Report(
+        [("order_id", "int"), ("settled_at", "datetime"), ("vendor_id", "int"), ("seller_user_id", "int"),
+         ("gross", "money"), ("effective_rate", "rate"), ("payout", "money"), ("commission", "money")],
+        _payouts,
+        _payout_row,
+    ),
+}
+
+
+def _csv_chunks(report: Report, batches: Iterator[list]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([name for name, _ in report.columns])
+    for batch in batches:
+        writer.writerows(batch)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+class _Drain:
+    """Write-only file handing out what was written since the last drain"""
+
+    closed = False
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data, self.chunks = b"".join(self.chunks), []
+        return data
+
+
+def _parquet_chunks(report: Report, batches: Iterator[list]) -> Iterator[bytes]:
+    """One row group per batch, sent as soon as it is encoded"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    types = {
+        "int": pa.int64(), "str": pa.string(), "datetime": pa.timestamp("us"),
+        "money": pa.decimal128(14, 2), "rate": pa.decimal128(7, 4),
+    }
+    schema = pa.schema([(name, types[kind]) for name, kind in report.columns])
+    sink = _Drain()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    for batch in batches:
+        columns = list(zip(*batch))
+        writer.write_table(pa.Table.from_arrays(
+            [pa.array(values, type=field.type) for values, field in zip(columns, schema)], schema=schema
+        ))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+class ExportService:
+    """Finance exports streamed straight from the database.
+
+    Rows come from a server-side cursor (yield_per) EXPORT_CHUNK_ROWS at a
+    time and each chunk is encoded and handed on before the next is
+    fetched, so memory stays flat however many rows there are.
+    """
+
+    @staticmethod
+    def check(report: str, fmt: str):
+        """Reject bad arguments before any response has started"""
+        if report not in REPORTS:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Unknown report; choose from {sorted(REPORTS)}"
+            )
+        if fmt not in FORMATS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"format must be one of {sorted(FORMATS)}"
+            )
+        if fmt == "parquet":
+            try:
+                import pyarrow.parquet  # noqa: F401
+            except ImportError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Parquet exports need pyarrow installed"
+                )
+
+    @staticmethod
+    def stream(
+        report: str,
+        fmt: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        vendor_id: Optional[int] = None,
+        chunk_rows: Optional[int] = None,
+        stats: Optional[dict] = None
+    ) -> Iterator[bytes]:
+        """Encoded export, chunk by chunk; ``stats`` gets running row and byte counts"""
+        spec = REPORTS[report]
+        chunk_rows = chunk_rows or settings.EXPORT_CHUNK_ROWS
+        stats = {} if stats is None else stats
+        stats.update(rows=0, bytes=0)
+
+        def batches(db):
+            # Its own session: it has to outlive the request handler
+            result = db.execute(spec.query(start, end, vendor_id).execution_options(yield_per=chunk_rows))
+            for partition in result.partitions():
+                stats["rows"] += len(partition)
+                yield [spec.row(row) for row in partition]
+
+        db = SessionLocal()
+        try:
+            encode = _parquet_chunks if fmt == "parquet" else _csv_chunks
+            for chunk in encode(spec, batches(db)):
+                stats["bytes"] += len(chunk)
+                if chunk:
+                    yield chunk
+        finally:
+            db.close()
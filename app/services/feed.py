@@ -0,0 +1,121 @@
+import json
+import select
+import threading
+import time
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import event, func, select as sql_select
+from sqlalchemy.orm import Session
+
+from config import settings
+from models import Listing
+from utils.pubsub import Bus
+
+LISTING_CHANNEL = "listing_feed"
+ORDER_CHANNEL = "order_events"
+
+# One bus per channel; routers subscribe to these
+buses = {
+    LISTING_CHANNEL: Bus(settings.FEED_QUEUE_SIZE),
+    ORDER_CHANNEL: Bus(settings.FEED_QUEUE_SIZE),
+}
+
+
+class FeedService:
+    """Publish change events once the surrounding transaction commits.
+
+    On Postgres events go out with NOTIFY, which the database delivers on
+    commit (and drops on rollback) to the listener in every worker, so
+    subscribers see changes made by any process. Elsewhere they are handed
+    to this process's bus from an after-commit hook.
+    """
+
+    _listener: Optional["_NotifyListener"] = None
+
+    @staticmethod
+    def publish(db: Session, channel: str, topics: Iterable[str], payload: dict):
+        topics = list(topics)
+        if db.get_bind().dialect.name == "postgresql":
+            message = json.dumps({"topics": topics, "event": payload}, default=str)
+            db.execute(sql_select(func.pg_notify(channel, message)))
+        else:
+            db.info.setdefault("feed_pending", []).append((channel, topics, payload))
+
+    @staticmethod
+    def publish_listing(db: Session, listing: Listing, kind: str, previous_category: Optional[str] = None):
+        """Announce a listing change to its own and its category's subscribers"""
+        topics = {f"listing:{listing.id}", f"category:{listing.category}"}
+        if previous_category and previous_category != listing.category:
+            topics.add(f"category:{previous_category}")
+        FeedService.publish(db, LISTING_CHANNEL, topics, {
+            "type": kind,
+            "listing_id": listing.id,
+            "vendor_id": listing.vendor_id,
+            "category": listing.category,
+            "title": listing.title,
+            "price": str(listing.price),
+            "status": listing.status,
+            "is_active": listing.is_active,
+            "at": datetime.utcnow().isoformat(),
+        })
+
+    @staticmethod
+    def start_listener():
+        """Forward NOTIFY traffic into local buses (Postgres only)"""
+        from db.session import engine
+        if engine.dialect.name != "postgresql" or FeedService._listener is not None:
+            return
+        FeedService._listener = _NotifyListener(engine.url.set(drivername="postgresql"), list(buses))
+        FeedService._listener.start()
+
+    @staticmethod
+    def stop_listener():
+        if FeedService._listener is not None:
+            FeedService._listener.stopped.set()
+            FeedService._listener = None
+
+
+@event.listens_for(Session, "after_commit")
+def _flush_pending(session: Session):
+    for channel, topics, payload in session.info.pop("feed_pending", ()):
+        buses[channel].publish(topics, payload)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_pending(session: Session):
+    session.info.pop("feed_pending", None)
+
+
+class _NotifyListener(threading.Thread):
+    """Dedicated LISTEN connection, reconnecting after errors"""
+
+    def __init__(self, url, channels):
+        super().__init__(name="feed-listener", daemon=True)
+        self.dsn = url.render_as_string(hide_password=False)
+        self.channels = channels
+        self.stopped = threading.Event()
+
+    def run(self):
+        import psycopg2
+        import psycopg2.extensions
+
+        while not self.stopped.is_set():
+            try:
+                conn = psycopg2.connect(self.dsn)
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cursor:
+                    for channel in self.channels:
+                        cursor.execute(f"LISTEN {channel}")
+                while not self.stopped.is_set():
+                    if select.select([conn], [], [], 1.0) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        message = json.loads(notify.payload)
+                        buses[notify.channel].publish(message["topics"], message["event"])
+                conn.close()
+            except Exception as e:
+                print(f"Feed listener error, reconnecting: {e}")
+                time.sleep(1)
@@ -1,11 +1,40 @@
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
-from typing import List, Optional
-import cloudinary.uploader
+from typing import Dict, List, Optional
+from functools import lru_cache
 from datetime import datetime
+from decimal import Decimal
 
-from models import Listing, Vendor, VendorPlan, User
+from models import Listing, Vendor, VendorPlan, User, Order, OrderArchive
 from schemas.listing import ListingCreate, ListingUpdate
+from services.listing_query import ListingQueryBuilder
+from services.ranking import RankingService
+from services.feed import FeedService
+from config import settings
+
+# Status changes a seller may make. A listing goes (back) on sale only if
+# every order for it was cancelled; archived ones can be restored until
+# compaction moves them to listings_archive (services/archive.py).
+STATUS_TRANSITIONS: Dict[str, tuple] = {
+    "active": ("paused", "archived"),
+    "paused": ("active", "archived"),
+    "sold": ("active", "archived"),
+    "archived": ("active", "paused"),
+}
+
+
+@lru_cache(maxsize=None)
+def _cloudinary_uploader():
+    """Import and configure Cloudinary on first upload instead of at boot"""
+    import cloudinary
+    import cloudinary.uploader
+
+    cloudinary.config(
+        cloud_name=settings.CLOUDINARY_CLOUD_NAME,
+        api_key=settings.CLOUDINARY_API_KEY,
+        api_secret=settings.CLOUDINARY_API_SECRET
+    )
+    return cloudinary.uploader
 
 #Create Listing
 class ListingService:
@@ -46,11 +75,14 @@ class ListingService:
             item_condition=listing_data.item_condition,
             category=listing_data.category,
             image_url=listing_data.image_url,
-            is_active=True,
+            status="active",
             created_at=datetime.utcnow()
         )
+        RankingService.score_listing(db, listing, vendor)
         
         db.add(listing)
+        db.flush()
+        FeedService.publish_listing(db, listing, "listing.created")
         db.commit()
         db.refresh(listing)
         return listing
@@ -63,18 +95,26 @@ class ListingService:
         category: Optional[str] = None,
         search: Optional[str] = None,
         skip: int = 0,
-        limit: int = 20
+        limit: int = 20,
+        price_min: Optional[Decimal] = None,
+        price_max: Optional[Decimal] = None,
+        conditions: Optional[List[str]] = None,
+        vendor_id: Optional[int] = None,
+        sort: str = "ranked"
     ) -> List[Listing]:
-        """Get listings with optional filtering"""
-        query = db.query(Listing).filter(Listing.is_active == True)
-        
-        if category:
-            query = query.filter(Listing.category == category)
-        
-        if search:
-            query = query.filter(Listing.title.contains(search))
-        
-        return query.offset(skip).limit(limit).all()
+        """Get listings with optional filtering and sorting"""
+        builder = ListingQueryBuilder(
+            category=category,
+            search=search,
+            price_min=price_min,
+            price_max=price_max,
+            conditions=conditions,
+            vendor_id=vendor_id,
+            sort=sort,
+            skip=skip,
+            limit=limit
+        )
+        return builder.build(db).all()
     
 
     #Get Listing by ID
@@ -83,7 +123,7 @@ class ListingService:
         """Get listing by ID"""
         listing = db.query(Listing).filter(
             Listing.id == listing_id,
-            Listing.is_active == True
+            Listing.status == "active"
         ).first()
         
         if not listing:
@@ -124,6 +164,20 @@ class ListingService:
         user: User
     ) -> Listing:
         """Update a listing"""
+        listing = ListingService._seller_listing(db, listing_id, user)
+        previous_category = listing.category
+        update_data = listing_data.dict(exclude_unset=True)
+        for field, value in update_data.items():
+            setattr(listing, field, value)
+        
+        FeedService.publish_listing(db, listing, "listing.updated", previous_category)
+        db.commit()
+        db.refresh(listing)
+        return listing
+    
+    @staticmethod
+    def _seller_listing(db: Session, listing_id: int, user: User) -> Listing:
+        """One of the caller's own listings, in any status"""
         vendor = db.query(Vendor).filter(Vendor.user_id == user.id).first()
         if not vendor:
             raise HTTPException(
@@ -141,38 +195,65 @@ class ListingService:
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Listing not found"
             )
-        
-        update_data = listing_data.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(listing, field, value)
-        
-        db.commit()
-        db.refresh(listing)
         return listing
     
-    #Change listing status to active/inactive
+    #Change listing status
+    @staticmethod
+    def set_status(db: Session, listing_id: int, new_status: str, user: User) -> Listing:
+        """Move one of the seller's listings along STATUS_TRANSITIONS"""
+        listing = ListingService._seller_listing(db, listing_id, user)
+        return ListingService._move(db, listing, new_status)
+    
     @staticmethod
     def toggle_listing_status(db: Session, listing_id: int, user: User) -> Listing:
-        """Toggle listing active status"""
-        vendor = db.query(Vendor).filter(Vendor.user_id == user.id).first()
-        if not vendor:
+        """Pause an active listing, or put any other one back on sale"""
+        listing = ListingService._seller_listing(db, listing_id, user)
+        return ListingService._move(db, listing, "paused" if listing.is_active else "active")
+    
+    @staticmethod
+    def _move(db: Session, listing: Listing, new_status: str) -> Listing:
+        """Apply one status change and announce it.
+
+        The UPDATE is conditional on the status that was read, so a buyer
+        reserving the listing meanwhile makes it match nothing (409).
+        """
+        previous_status = listing.status
+        if new_status == previous_status:
+            return listing
+        if new_status not in STATUS_TRANSITIONS.get(previous_status, ()):
             raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Vendor profile not found"
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Cannot move a listing from {previous_status} to {new_status}"
             )
         
-        listing = db.query(Listing).filter(
-            Listing.id == listing_id,
-            Listing.vendor_id == vendor.id
-        ).first()
+        # Archived listings may have been sold before, so check every relisting
+        if new_status == "active" and any(
+            db.query(model.id).filter(
+                model.listing_id == listing.id,
+                model.status != "cancelled"
+            ).first() is not None
+            for model in (Order, OrderArchive)
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Listing has been sold"
+            )
         
-        if not listing:
+        changed = db.query(Listing).filter(
+            Listing.id == listing.id,
+            Listing.status == previous_status
+        ).update({"status": new_status, "status_changed_at": datetime.utcnow()}, synchronize_session=False)
+        if not changed:
+            db.rollback()
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Listing not found"
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Listing changed meanwhile; reload and retry"
             )
         
-        listing.is_active = not listing.is_active
+        db.refresh(listing)
+        FeedService.publish_listing(
+            db, listing, "listing.activated" if listing.is_active else "listing.deactivated"
+        )
         db.commit()
         db.refresh(listing)
         return listing
@@ -182,7 +263,7 @@ class ListingService:
     def upload_image(file) -> dict:
         """Upload image to Cloudinary"""
         try:
-            result = cloudinary.uploader.upload(file.file)
+            result = _cloudinary_uploader().upload(file.file)
             return {
                 "image_url": result["secure_url"],
                 "public_id": result["public_id"]
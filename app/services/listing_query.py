@@ -0,0 +1,152 @@
+from decimal import Decimal
+from typing import List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import case, func, text
+from sqlalchemy.orm import Query, Session
+
+from models import Listing
+from models.listing import BROWSABLE
+from schemas.listing import VALID_CONDITIONS, LISTING_SORTS
+from config import settings
+
+
+# Sort key -> (column, descending)
+SORT_COLUMNS = {
+    "ranked": (Listing.rank_score, True),
+    "newest": (Listing.created_at, True),
+    "price_asc": (Listing.price, False),
+    "price_desc": (Listing.price, True),
+    "relevance": (Listing.created_at, True),  # tie-break inside a relevance bucket
+}
+
+
+class ListingQueryBuilder:
+    """Build browse queries that walk one of the listing indexes.
+
+    Every accepted combination of filters has an index whose leading columns
+    are equality predicates and whose next column is the sort key, so the
+    database can stop after ``skip + limit`` rows. Combinations that cannot be
+    served that way are rejected with a 400 instead of silently scanning the
+    whole table.
+    """
+
+    def __init__(
+        self,
+        category: Optional[str] = None,
+        search: Optional[str] = None,
+        price_min: Optional[Decimal] = None,
+        price_max: Optional[Decimal] = None,
+        conditions: Optional[List[str]] = None,
+        vendor_id: Optional[int] = None,
+        sort: str = "ranked",
+        skip: int = 0,
+        limit: int = settings.DEFAULT_PAGE_SIZE,
+    ):
+        self.category = category
+        self.search = search
+        self.price_min = price_min
+        self.price_max = price_max
+        self.conditions = conditions or []
+        self.vendor_id = vendor_id
+        self.sort = sort
+        self.skip = skip
+        self.limit = min(limit, settings.MAX_PAGE_SIZE)
+        self._validate()
+
+    @staticmethod
+    def _reject(detail: str):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+    def _validate(self):
+        """Reject malformed input and combinations that would force a full scan"""
+        if self.sort not in LISTING_SORTS:
+            self._reject(f"sort must be one of {LISTING_SORTS}")
+
+        invalid = [c for c in self.conditions if c not in VALID_CONDITIONS]
+        if invalid:
+            self._reject(f"item_condition must be one of {VALID_CONDITIONS}")
+
+        if self.price_min is not None and self.price_min < 0:
+            self._reject("price_min must not be negative")
+        if (
+            self.price_min is not None
+            and self.price_max is not None
+            and self.price_min > self.price_max
+        ):
+            self._reject("price_min must not exceed price_max")
+
+        if self.limit < 1:
+            self._reject("limit must be at least 1")
+        if self.skip < 0:
+            self._reject("skip must not be negative")
+        if self.skip > settings.MAX_LISTING_OFFSET:
+            # Offsets are read and discarded row by row
+            self._reject(
+                f"skip must not exceed {settings.MAX_LISTING_OFFSET}; narrow the filters instead"
+            )
+
+        if self.sort == "relevance" and not self.search:
+            self._reject("relevance sort requires a search term")
+        # A substring match can't use an index: under any sort a rare term
+        # reads rows until a page fills, and relevance ranks every match.
+        # Keep that bounded to a single category or vendor.
+        if self.search and not self.category and self.vendor_id is None:
+            self._reject("search requires a category or vendor_id filter")
+
+    @property
+    def plan(self) -> str:
+        """Name of the index the query is shaped for"""
+        if self.sort in ("price_asc", "price_desc"):
+            sort_column = "price"
+        elif self.sort == "ranked" and self.vendor_id is None:
+            sort_column = "rank"
+        else:
+            # One vendor shares one bonus, so its rank order is creation order
+            sort_column = "created"
+        if self.vendor_id is not None:
+            return f"ix_listings_vendor_browse_{sort_column}"
+        if self.category:
+            return f"ix_listings_category_browse_{sort_column}"
+        return f"ix_listings_browse_{sort_column}"
+
+    def build(self, db: Session) -> Query:
+        """Return the filtered, ordered and paginated query"""
+        # The partial browse indexes' own WHERE, as literal SQL: with a bound
+        # parameter SQLite still uses them but re-checks every row in the table
+        query = db.query(Listing).filter(text(BROWSABLE))
+
+        # Equality predicates first: these are the index prefixes
+        if self.vendor_id is not None:
+            query = query.filter(Listing.vendor_id == self.vendor_id)
+        if self.category:
+            query = query.filter(Listing.category == self.category)
+
+        if self.price_min is not None:
+            query = query.filter(Listing.price >= self.price_min)
+        if self.price_max is not None:
+            query = query.filter(Listing.price <= self.price_max)
+        if self.conditions:
+            query = query.filter(Listing.item_condition.in_(self.conditions))
+        if self.search:
+            query = query.filter(Listing.title.contains(self.search, autoescape=True))
+
+        order_by = []
+        if self.sort == "relevance":
+            title = func.lower(Listing.title)
+            term = self.search.lower()
+            order_by.append(case(
+                (title == term, 0),
+                (title.startswith(term, autoescape=True), 1),
+                else_=2,
+            ))
+
+        column, descending = SORT_COLUMNS[self.sort]
+        if self.sort == "ranked" and self.vendor_id is not None:
+            # One vendor shares one bonus, so rank order is creation order
+            column = Listing.created_at
+        order_by.append(column.desc() if descending else column.asc())
+        # Stable pagination for rows sharing the same sort value
+        order_by.append(Listing.id.desc() if descending else Listing.id.asc())
+
+        return query.order_by(*order_by).offset(self.skip).limit(self.limit)
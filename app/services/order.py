@@ -0,0 +1,316 @@
+from sqlalchemy import func, or_, update
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from models import Order, Listing, Wallet, Payment, Vendor
+from services.delivery import DeliveryService
+from services.feed import FeedService
+from services.order_events import OrderEventService
+from services.settlement import SettlementService
+from services.vendor_sales import VendorSalesService, OrderChange
+from utils.token import TokenClaims
+
+# Status changes each party may make through PUT /orders/{id}/status.
+# Cancelling refunds the buyer and puts the listing back on sale.
+# Delivery that pays the seller only happens through confirm_delivery or
+# the escrow sweeper (services/settlement.py).
+TRANSITIONS: Dict[str, Dict[str, tuple]] = {
+    "seller": {
+        "pending": ("confirmed", "cancelled"),
+        "confirmed": ("shipped", "cancelled"),
+        "shipped": ("delivered",),  # starts the shorter AUTO_CONFIRM_DELIVERED_DAYS window
+    },
+    "buyer": {
+        "pending": ("cancelled",),
+    },
+}
+
+
+class OrderService:
+    @staticmethod
+    def _reserve_listing(db: Session, listing_id: int) -> Listing:
+        """Take the listing off the market for this transaction, or fail fast.
+
+        On Postgres a buyer who finds the row locked by another checkout is
+        turned away at once (SKIP LOCKED) instead of queueing behind it; the
+        conditional UPDATE is what guarantees a single winner everywhere.
+        """
+        locked = db.query(Listing).filter(
+            Listing.id == listing_id,
+            Listing.status == "active"
+        ).with_for_update(skip_locked=True).first()
+
+        reserved = locked is not None and db.query(Listing).filter(
+            Listing.id == listing_id,
+            Listing.status == "active"
+        ).update({"status": "sold", "status_changed_at": datetime.utcnow()}, synchronize_session=False)
+
+        if not reserved:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Listing not found or no longer available"
+            )
+        db.refresh(locked)
+        return locked
+
+    @staticmethod
+    def _debit_wallet(db: Session, user_id: int, amount):
+        """Escrow ``amount`` only if the balance covers it, in one statement"""
+        debited = db.query(Wallet).filter(
+            Wallet.user_id == user_id,
+            Wallet.balance >= amount
+        ).update(
+            {"balance": Wallet.balance - amount, "updated_at": datetime.utcnow()},
+            synchronize_session=False
+        )
+        if not debited:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Insufficient wallet balance"
+            )
+
+    @staticmethod
+    def _refund(db: Session, order: Order, now: datetime):
+        """Return a cancelled order's escrow to the buyer and put its listing back on sale.
+
+        Runs in the transaction whose conditional UPDATE cancelled the
+        order, so only one caller ever gets here for a given order.
+        """
+        credited = db.query(Wallet).filter(Wallet.user_id == order.buyer_id).update(
+            {"balance": Wallet.balance + order.price, "updated_at": now},
+            synchronize_session=False
+        )
+        if not credited:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Buyer has no wallet to refund"
+            )
+        db.query(Payment).filter(
+            Payment.order_id == order.id,
+            Payment.status == "completed"
+        ).update({"status": "refunded"}, synchronize_session=False)
+
+        # Unless the seller archived it meanwhile
+        relisted = db.query(Listing).filter(
+            Listing.id == order.listing_id,
+            Listing.status == "sold"
+        ).update({"status": "active", "status_changed_at": now}, synchronize_session=False)
+        if relisted:
+            listing = db.get(Listing, order.listing_id)
+            db.refresh(listing)
+            FeedService.publish_listing(db, listing, "listing.activated")
+
+    @staticmethod
+    def create_order(db: Session, claims: TokenClaims, listing_id: int) -> Order:
+        """Reserve the listing, escrow the price and record the order in one transaction"""
+        if claims.user_type != "buyer":
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Only buyers can create orders"
+            )
+
+        try:
+            listing = OrderService._reserve_listing(db, listing_id)
+            OrderService._debit_wallet(db, claims.user_id, listing.price)
+
+            now = datetime.utcnow()
+            order = Order(
+                buyer_id=claims.user_id,
+                listing_id=listing.id,
+                vendor_id=listing.vendor_id,
+                price=listing.price,
+                status="pending",
+                ordered_at=now
+            )
+            db.add(order)
+            db.flush()
+            VendorSalesService.record(db, [
+                OrderChange(listing.vendor_id, listing.id, listing.price, now, None, order.status)
+            ])
+
+            db.add(Payment(
+                order_id=order.id,
+                amount=listing.price,
+                payment_method="wallet",
+                status="completed",
+                created_at=now
+            ))
+            seller_user_id = db.query(Vendor.user_id).filter(Vendor.id == listing.vendor_id).scalar()
+            OrderEventService.record(db, order, seller_user_id)
+            FeedService.publish_listing(db, listing, "listing.sold")
+            db.commit()
+        except Exception:
+            # Releases the reservation along with everything else
+            db.rollback()
+            raise
+
+        db.refresh(order)
+        return order
+
+    @staticmethod
+    def confirm_delivery(db: Session, buyer_id: int, order_id: int):
+        """Release a shipped (or seller-marked delivered) order's escrow to the seller"""
+        now = datetime.utcnow()
+        row = db.query(Order.status, Order.settled_at).filter(
+            Order.id == order_id,
+            Order.buyer_id == buyer_id
+        ).first()
+        if row is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Order not found"
+            )
+        previous, settled_at = row
+        if previous not in ("shipped", "delivered") or settled_at is not None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Order must be shipped, and not yet settled, before confirmation"
+            )
+        # Conditional, so a concurrent escrow sweep cannot pay the seller twice
+        confirmed = db.query(Order).filter(
+            Order.id == order_id,
+            Order.status == previous,
+            Order.settled_at.is_(None)
+        ).update(
+            {"status": "delivered", "delivered_at": func.coalesce(Order.delivered_at, now), "settled_at": now},
+            synchronize_session=False
+        )
+        if not confirmed:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Order status changed meanwhile; reload and retry"
+            )
+
+        try:
+            SettlementService.release(db, {order_id: previous}, now)
+            DeliveryService.mark_confirmed(db, order_id)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+    @staticmethod
+    def page(
+        db: Session,
+        owner,
+        before: Optional[datetime] = None,
+        before_id: Optional[int] = None,
+        limit: int = 20
+    ) -> List[Order]:
+        """Orders matching ``owner``, newest first, older than the (before, before_id) cursor.
+
+        Pass the last order's ordered_at and id to get the next page. The
+        ordered_at bound lets Postgres skip newer monthly partitions, and
+        each page is a short walk of a (buyer_id|vendor_id, ordered_at) index.
+        """
+        query = db.query(Order).filter(owner)
+        if before is not None:
+            query = query.filter(Order.ordered_at <= before)
+            query = query.filter(
+                Order.ordered_at < before if before_id is None
+                else or_(Order.ordered_at < before, Order.id < before_id)
+            )
+        return query.order_by(Order.ordered_at.desc(), Order.id.desc()).limit(limit).all()
+
+    @staticmethod
+    def update_status(db: Session, claims: TokenClaims, order_id: int, new_status: str) -> Order:
+        """Move an order along TRANSITIONS for the caller's side of it.
+
+        One read and one UPDATE conditional on the status that was read: a
+        concurrent change makes it match nothing, answered with 409.
+        """
+        row = db.query(Order, Vendor.user_id).join(Vendor, Vendor.id == Order.vendor_id).filter(
+            Order.id == order_id
+        ).first()
+        if row is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Order not found"
+            )
+        order, seller_user_id = row
+        if order.buyer_id == claims.user_id:
+            actor = "buyer"
+        elif claims.vendor_id is not None and order.vendor_id == claims.vendor_id:
+            actor = "seller"
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not authorized to update this order"
+            )
+        previous_status = order.status
+        if new_status == previous_status:
+            return order
+        if new_status not in TRANSITIONS[actor].get(previous_status, ()):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"The {actor} cannot move a {previous_status} order to {new_status}"
+            )
+
+        now = datetime.utcnow()
+        values = {"status": new_status}
+        if new_status == "shipped":
+            values["shipped_at"] = now
+        if new_status == "delivered":
+            values["delivered_at"] = now
+        try:
+            updated = db.query(Order).filter(
+                Order.id == order.id,
+                Order.status == previous_status
+            ).update(values, synchronize_session=False)
+            if not updated:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Order status changed meanwhile; reload and retry"
+                )
+            if new_status == "cancelled":
+                OrderService._refund(db, order, now)
+            VendorSalesService.record(db, [OrderChange(
+                order.vendor_id, order.listing_id, order.price, order.ordered_at,
+                previous_status, new_status, order.settled_at is not None
+            )])
+            OrderEventService.record_many(db, [(order.id, order.buyer_id, seller_user_id, new_status)])
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        db.refresh(order)
+        return order
+
+    @staticmethod
+    def ship_many(db: Session, claims: TokenClaims, order_ids: List[int]) -> Dict[str, List[int]]:
+        """Mark the caller's confirmed orders among ``order_ids`` shipped in one UPDATE.
+
+        Orders that are not the seller's, or not confirmed, are skipped.
+        """
+        if claims.vendor_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Only sellers can ship orders"
+            )
+        now = datetime.utcnow()
+        try:
+            rows = db.execute(
+                update(Order)
+                .where(
+                    Order.id.in_(order_ids),
+                    Order.vendor_id == claims.vendor_id,
+                    Order.status == "confirmed"
+                )
+                .values(status="shipped", shipped_at=now)
+                .returning(Order.id, Order.buyer_id, Order.listing_id, Order.price, Order.ordered_at)
+                .execution_options(synchronize_session=False)
+            ).all()
+            VendorSalesService.record(db, [
+                OrderChange(claims.vendor_id, row.listing_id, row.price, row.ordered_at, "confirmed", "shipped")
+                for row in rows
+            ])
+            OrderEventService.record_many(db, [(row.id, row.buyer_id, claims.user_id, "shipped") for row in rows])
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        shipped = sorted(row.id for row in rows)
+        return {"shipped": shipped, "skipped": sorted(set(order_ids) - set(shipped))}
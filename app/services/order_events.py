@@ -0,0 +1,123 @@
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from config import settings
+from db.session import SessionLocal
+from models import Order, OrderEvent
+from services.feed import FeedService, buses, ORDER_CHANNEL
+from utils import token
+from utils.pubsub import RESYNC, sse_message
+from utils.token import TokenClaims
+
+
+class OrderEventService:
+    """Order status changes for the buyer and seller involved.
+
+    Each change is logged to order_events (its id doubles as the SSE event
+    id) and pushed on the order feed once the transaction commits, so a
+    client that reconnects with Last-Event-ID gets what it missed from the
+    log and everything after that live.
+    """
+
+    @staticmethod
+    def _payload(event: OrderEvent, role: str) -> dict:
+        return {
+            "type": "order.status",
+            "id": event.id,
+            "order_id": event.order_id,
+            "status": event.status,
+            "role": role,
+            "at": event.created_at.isoformat(),
+        }
+
+    @staticmethod
+    def record(db: Session, order: Order, seller_user_id: int):
+        """Log ``order``'s current status for its buyer and seller; the caller commits"""
+        OrderEventService.record_many(db, [(order.id, order.buyer_id, seller_user_id, order.status)])
+
+    @staticmethod
+    def record_many(db: Session, changes: List[Tuple[int, int, int, str]]):
+        """Like record, for (order_id, buyer_id, seller_user_id, status) rows in one flush"""
+        now = datetime.utcnow()
+        events = []
+        for order_id, buyer_id, seller_user_id, order_status in changes:
+            for user_id, role in ((buyer_id, "buyer"), (seller_user_id, "seller")):
+                event = OrderEvent(user_id=user_id, order_id=order_id, status=order_status, created_at=now)
+                events.append((event, role))
+        db.add_all(event for event, _ in events)
+        db.flush()
+        for event, role in events:
+            payload = OrderEventService._payload(event, role)
+            FeedService.publish(db, ORDER_CHANNEL, [f"user:{event.user_id}"], payload)
+
+    @staticmethod
+    def replay(db: Session, user_id: int, after_id: int, limit: int) -> List[dict]:
+        """Events logged for ``user_id`` after ``after_id``, oldest first (up to limit + 1)"""
+        rows = db.query(OrderEvent, Order.buyer_id).join(Order, Order.id == OrderEvent.order_id).filter(
+            OrderEvent.user_id == user_id,
+            OrderEvent.id > after_id
+        ).order_by(OrderEvent.id).limit(limit + 1).all()
+        return [
+            OrderEventService._payload(event, "buyer" if buyer_id == user_id else "seller")
+            for event, buyer_id in rows
+        ]
+
+    @staticmethod
+    def latest_id(db: Session, user_id: int) -> int:
+        return db.query(func.max(OrderEvent.id)).filter(OrderEvent.user_id == user_id).scalar() or 0
+
+    @staticmethod
+    def prune(db: Session, retention_days: Optional[int] = None) -> int:
+        """Delete events older than the retention window"""
+        days = settings.ORDER_EVENT_RETENTION_DAYS if retention_days is None else retention_days
+        deleted = db.query(OrderEvent).filter(
+            OrderEvent.created_at < datetime.utcnow() - timedelta(days=days)
+        ).delete(synchronize_session=False)
+        db.commit()
+        return deleted
+
+    @staticmethod
+    async def stream(claims: TokenClaims, last_event_id: Optional[int]):
+        """SSE messages for the caller: missed events first, then live ones.
+
+        Ends when the access token expires or its session is revoked; the
+        client reconnects with a fresh token and its Last-Event-ID.
+        """
+        user_id = claims.user_id
+
+        def load_backlog():
+            db = SessionLocal()
+            try:
+                events = OrderEventService.replay(db, user_id, last_event_id, settings.ORDER_EVENT_REPLAY_LIMIT)
+                if len(events) > settings.ORDER_EVENT_REPLAY_LIMIT:
+                    return None, OrderEventService.latest_id(db, user_id)
+                return events, None
+            finally:
+                db.close()
+
+        # Subscribe before reading the log so nothing committed in between is lost
+        with buses[ORDER_CHANNEL].subscribe([f"user:{user_id}"]) as subscription:
+            yield "retry: 5000\n\n"
+            replayed = set()
+            if last_event_id is not None:
+                events, resync_id = await run_in_threadpool(load_backlog)
+                if events is None:
+                    # Too far behind: move the client's Last-Event-ID forward and have it refetch
+                    yield sse_message(RESYNC, resync_id)
+                else:
+                    for event in events:
+                        replayed.add(event["id"])
+                        yield sse_message(event, event["id"])
+
+            while token.still_valid(claims):
+                event = await subscription.get(settings.FEED_KEEPALIVE_SECONDS)
+                if event is None:
+                    yield ": keepalive\n\n"
+                elif event is RESYNC:
+                    yield sse_message(event)
+                elif event["id"] not in replayed:
+                    yield sse_message(event, event["id"])
@@ -0,0 +1,224 @@
+import re
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+
+from config import settings
+
+# Postgres tables range-partitioned by month: table -> partition key
+PARTITIONED: Dict[str, str] = {
+    "orders": "ordered_at",
+    "payments": "created_at",
+    "reviews": "created_at",
+}
+
+# Rows without a timestamp (the app always sets one) go to the default partition
+MISSING_KEY = "1970-01-01"
+
+
+def _month(day) -> date:
+    return date(day.year, day.month, 1)
+
+
+def _next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+class PartitionService:
+    """Monthly range partitions for the tables that grow without bound.
+
+    On Postgres each table in PARTITIONED has one partition per month,
+    named <table>_YYYY_MM, plus <table>_default for anything outside them.
+    Queries bounded on the key only touch the months they cover, and old
+    months are dropped whole once archival has emptied them instead of
+    being deleted row by row. Postgres needs the key in every unique
+    constraint of a partitioned table, so primary keys are (id, key) and
+    no foreign key can point at these tables; ids still come from the
+    table's own sequence. Other dialects keep plain tables and every
+    method here is a no-op there.
+    """
+
+    @staticmethod
+    def enabled(bind) -> bool:
+        return bind.dialect.name == "postgresql"
+
+    @staticmethod
+    def partition_name(table: str, month: date) -> str:
+        return f"{table}_{month:%Y_%m}"
+
+    @staticmethod
+    def is_partitioned(bind, table: str) -> bool:
+        return bind.execute(
+            text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table)"),
+            {"table": table}
+        ).first() is not None
+
+    @staticmethod
+    def months(bind, table: str) -> List[date]:
+        """Months that have their own partition, oldest first"""
+        names = bind.execute(text("""
+            SELECT child.relname FROM pg_inherits
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = to_regclass(:table)
+        """), {"table": table}).scalars()
+        pattern = re.compile(rf"^{table}_(\d{{4}})_(\d{{2}})$")
+        return sorted(date(int(m[1]), int(m[2]), 1) for m in map(pattern.match, names) if m)
+
+    @staticmethod
+    def create_month(bind, table: str, month: date) -> bool:
+        """Add the partition for ``month`` if missing; False if it existed.
+
+        Rows the default partition already holds for that month are moved
+        into the new partition (Postgres refuses to create it otherwise).
+        """
+        name = PartitionService.partition_name(table, month)
+        if bind.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None:
+            return False
+        key = PARTITIONED[table]
+        bounds = f"FROM ('{month}') TO ('{_next_month(month)}')"
+        default = f"{table}_default"
+        stray = bind.execute(text(
+            f"SELECT 1 FROM {default} WHERE {key} >= :low AND {key} < :high LIMIT 1"
+        ), {"low": month, "high": _next_month(month)}).first()
+        if stray is None:
+            bind.execute(text(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES {bounds}"))
+            return True
+
+        bind.execute(text(f"ALTER TABLE {table} DETACH PARTITION {default}"))
+        bind.execute(text(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES {bounds}"))
+        moved = f"{key} >= :low AND {key} < :high"
+        bind.execute(text(f"INSERT INTO {table} SELECT * FROM {default} WHERE {moved}"),
+                     {"low": month, "high": _next_month(month)})
+        bind.execute(text(f"DELETE FROM {default} WHERE {moved}"), {"low": month, "high": _next_month(month)})
+        bind.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT"))
+        return True
+
+    @staticmethod
+    def ensure(bind, months_ahead: Optional[int] = None, today: Optional[date] = None) -> List[str]:
+        """Create this month's and the next PARTITION_MONTHS_AHEAD months' partitions"""
+        if not PartitionService.enabled(bind):
+            return []
+        months_ahead = settings.PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+        created = []
+        for table in PARTITIONED:
+            if not PartitionService.is_partitioned(bind, table):
+                continue
+            month = _month(today or datetime.utcnow())
+            for _ in range(months_ahead + 1):
+                if PartitionService.create_month(bind, table, month):
+                    created.append(PartitionService.partition_name(table, month))
+                month = _next_month(month)
+        return created
+
+    @staticmethod
+    def drop_empty(bind, before: date) -> List[str]:
+        """Drop partitions of months ending on or before ``before`` that hold no rows"""
+        if not PartitionService.enabled(bind):
+            return []
+        dropped = []
+        for table in PARTITIONED:
+            for month in PartitionService.months(bind, table):
+                if _next_month(month) > before:
+                    break
+                name = PartitionService.partition_name(table, month)
+                if bind.execute(text(f"SELECT 1 FROM {name} LIMIT 1")).first() is None:
+                    bind.execute(text(f"DROP TABLE {name}"))
+                    dropped.append(name)
+        return dropped
+
+    @staticmethod
+    def _rebuild(bind, table: str, partitioned: bool, months_ahead: int) -> List[str]:
+        """Recreate ``table`` with or without partitioning, copying every row.
+
+        Indexes and outgoing foreign keys are recreated as they were;
+        foreign keys from other tables to this one are dropped and their
+        names returned.
+        """
+        key = PARTITIONED[table]
+        old = f"{table}_old"
+        params = {"table": table}
+        indexes = bind.execute(text("""
+            SELECT pg_indexes.indexname, pg_indexes.indexdef FROM pg_indexes
+            WHERE pg_indexes.schemaname = current_schema() AND pg_indexes.tablename = :table
+            AND NOT EXISTS (SELECT 1 FROM pg_constraint WHERE pg_constraint.conname = pg_indexes.indexname
+                            AND pg_constraint.conrelid = to_regclass(:table) AND pg_constraint.contype = 'p')
+        """), params).all()
+        foreign_keys = bind.execute(text(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = to_regclass(:table) AND contype = 'f'"
+        ), params).all()
+        primary_key = bind.execute(text(
+            "SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(:table) AND contype = 'p'"
+        ), params).scalar()
+        referencing = bind.execute(text(
+            "SELECT conname, conrelid::regclass::text FROM pg_constraint "
+            "WHERE confrelid = to_regclass(:table) AND contype = 'f'"
+        ), params).all()
+        columns = bind.execute(text(
+            "SELECT column_name FROM information_schema.columns "
+            "WHERE table_schema = current_schema() AND table_name = :table ORDER BY ordinal_position"
+        ), params).scalars().all()
+        sequence = bind.execute(text("SELECT pg_get_serial_sequence(:table, 'id')"), params).scalar()
+
+        for name, child in referencing:
+            bind.execute(text(f"ALTER TABLE {child} DROP CONSTRAINT {name}"))
+        # Index names are schema-wide: free them for the new table
+        if primary_key:
+            bind.execute(text(f"ALTER TABLE {table} DROP CONSTRAINT {primary_key}"))
+        for name, _ in indexes:
+            bind.execute(text(f"DROP INDEX {name}"))
+        bind.execute(text(f"ALTER TABLE {table} RENAME TO {old}"))
+
+        if partitioned:
+            bind.execute(text(
+                f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS) PARTITION BY RANGE ({key})"
+            ))
+            bind.execute(text(f"ALTER TABLE {table} ALTER COLUMN {key} SET NOT NULL"))
+            low, high = bind.execute(text(f"SELECT MIN({key}), MAX({key}) FROM {old}")).one()
+            month = _month(low or datetime.utcnow())
+            last = _month(max(high or datetime.utcnow(), datetime.utcnow()))
+            for _ in range(months_ahead):
+                last = _next_month(last)
+            bind.execute(text(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT"))
+            while month <= last:
+                PartitionService.create_month(bind, table, month)
+                month = _next_month(month)
+        else:
+            bind.execute(text(f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS)"))
+            bind.execute(text(f"ALTER TABLE {table} ALTER COLUMN {key} DROP NOT NULL"))
+
+        source = [f"COALESCE({column}, '{MISSING_KEY}')" if column == key else column for column in columns]
+        bind.execute(text(f"INSERT INTO {table} ({', '.join(columns)}) SELECT {', '.join(source)} FROM {old}"))
+        if sequence:
+            bind.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id"))
+        bind.execute(text(f"DROP TABLE {old}"))
+
+        bind.execute(text(
+            f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY ({'id, ' + key if partitioned else 'id'})"
+        ))
+        for _, definition in indexes:
+            bind.execute(text(definition))
+        for name, definition in foreign_keys:
+            bind.execute(text(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}"))
+        return [name for name, _ in referencing]
+
+    @staticmethod
+    def partition(bind, table: str, months_ahead: Optional[int] = None) -> List[str]:
+        """Turn a plain table in PARTITIONED into a partitioned one.
+
+        Copies the whole table under an exclusive lock: run it in a
+        maintenance window. Returns the foreign keys to it that were
+        dropped; does nothing if the table is already partitioned.
+        """
+        if not PartitionService.enabled(bind) or PartitionService.is_partitioned(bind, table):
+            return []
+        months_ahead = settings.PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+        return PartitionService._rebuild(bind, table, True, months_ahead)
+
+    @staticmethod
+    def unpartition(bind, table: str) -> List[str]:
+        """Turn a partitioned table back into a plain one (the reverse of partition)"""
+        if not PartitionService.enabled(bind) or not PartitionService.is_partitioned(bind, table):
+            return []
+        return PartitionService._rebuild(bind, table, False, 0)
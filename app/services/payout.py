@@ -0,0 +1,110 @@
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict
+
+import numpy as np
+from sqlalchemy import BigInteger, cast, func, literal, select
+from sqlalchemy.orm import Session
+
+from models import Order, Vendor, VendorPlan, VendorSalesSummary
+from services.archive import ArchiveService
+
+CENTS = Decimal("0.01")
+
+
+class PayoutService:
+    """The one definition of what a seller is paid for an order.
+
+    VendorPlan.remittance_rate is a percentage (92.00 means the seller keeps
+    92%). Payouts are worked out in integer cents and basis points,
+
+        payout_cents = (price_cents * rate_bps + 5000) // 10000
+
+    i.e. rounded half up to the cent, and the platform's commission is the
+    rest of the price. The SQL expression (used when settling) and the
+    NumPy version (batches, reconciliation) compute exactly this.
+    """
+
+    @staticmethod
+    def to_cents(amount: Decimal) -> int:
+        return int((Decimal(amount) * 100).to_integral_value(ROUND_HALF_UP))
+
+    @staticmethod
+    def rate_bps(remittance_rate: Decimal) -> int:
+        """Percentage with two decimals -> basis points"""
+        return int((Decimal(remittance_rate) * 100).to_integral_value(ROUND_HALF_UP))
+
+    @staticmethod
+    def payout_cents(price_cents, rate_bps):
+        """Vectorised over NumPy arrays (or plain ints)"""
+        price_cents = np.asarray(price_cents, dtype=np.int64)
+        rate_bps = np.asarray(rate_bps, dtype=np.int64)
+        return (price_cents * rate_bps + 5000) // 10000
+
+    @staticmethod
+    def payout(amount: Decimal, remittance_rate: Decimal) -> Decimal:
+        """Payout for a single amount, as money"""
+        cents = PayoutService.payout_cents(PayoutService.to_cents(amount), PayoutService.rate_bps(remittance_rate))
+        return Decimal(int(cents)) * CENTS
+
+    @staticmethod
+    def sql_payout_cents(price, remittance_rate):
+        """The same formula as a SQL expression over money and percentage columns"""
+        # 64-bit: cents times basis points overflows a Postgres INTEGER above ~$2,100
+        price_cents = cast(func.round(price * 100), BigInteger)
+        rate_bps = cast(func.round(remittance_rate * 100), BigInteger)
+        # Integer floor division in SQL too (plain / is true division in SQLAlchemy 2.0)
+        return (price_cents * rate_bps + 5000) // 10000
+
+    @staticmethod
+    def order_payout():
+        """Correlated subquery: an order's payout on its purchase price under its vendor's current plan"""
+        return select(
+            PayoutService.sql_payout_cents(Order.price, VendorPlan.remittance_rate) * literal(CENTS)
+        ).select_from(Vendor) \
+         .join(VendorPlan, VendorPlan.id == Vendor.plan_id) \
+         .where(Vendor.id == Order.vendor_id) \
+         .correlate(Order) \
+         .scalar_subquery()
+
+    @staticmethod
+    def reconcile(db: Session, chunk_rows: int = 50000) -> Dict[str, int]:
+        """Consistency checks over plans, settled orders (archived ones too) and the sales rollups; all zero when healthy"""
+        orders = ArchiveService.all_orders().c
+        checks = {
+            # A fraction (0.92) where a percentage (92.00) belongs
+            "plans_rate_not_percentage": db.query(func.count(VendorPlan.id)).filter(
+                (VendorPlan.remittance_rate <= 1) | (VendorPlan.remittance_rate > 100)
+            ).scalar(),
+            "settled_orders_without_payout": db.query(func.count(orders.id)).filter(
+                orders.settled_at.isnot(None), orders.payout.is_(None)
+            ).scalar(),
+            # In cents: SQLite keeps a SQL-computed payout as a float (19.99 -> 19.990000000000002)
+            "payouts_above_gross": db.query(func.count(orders.id)).filter(
+                func.round(orders.payout * 100) > func.round(orders.price * 100)
+            ).scalar(),
+            "sql_numpy_disagreements": 0,
+            "vendors_rollup_mismatch": 0,
+        }
+
+        # The SQL and NumPy forms must agree on every settled order's inputs
+        rows = db.execute(select(
+            cast(func.round(orders.price * 100), BigInteger),
+            cast(func.round(VendorPlan.remittance_rate * 100), BigInteger),
+            PayoutService.sql_payout_cents(orders.price, VendorPlan.remittance_rate)
+        ).join(Vendor, Vendor.id == orders.vendor_id)
+         .join(VendorPlan, VendorPlan.id == Vendor.plan_id)
+         .where(orders.settled_at.isnot(None))
+         .execution_options(yield_per=chunk_rows))
+        for partition in rows.partitions():
+            batch = np.array(partition, dtype=np.int64)
+            expected = PayoutService.payout_cents(batch[:, 0], batch[:, 1])
+            checks["sql_numpy_disagreements"] += int((expected != batch[:, 2]).sum())
+
+        paid = dict(db.query(orders.vendor_id, func.sum(orders.payout)).filter(
+            orders.settled_at.isnot(None)
+        ).group_by(orders.vendor_id).all())
+        for vendor_id, payouts in db.query(VendorSalesSummary.vendor_id, VendorSalesSummary.payouts):
+            if abs(Decimal(payouts or 0) - Decimal(paid.pop(vendor_id, 0) or 0)) >= CENTS:
+                checks["vendors_rollup_mismatch"] += 1
+        checks["vendors_rollup_mismatch"] += sum(1 for amount in paid.values() if amount)
+        return checks
@@ -0,0 +1,99 @@
+from datetime import datetime, timezone
+from typing import Dict
+
+from sqlalchemy import extract, func, update
+from sqlalchemy.orm import Session
+
+from models import Listing, Review, Vendor, VendorPlan
+from config import settings
+
+
+class RankingService:
+    """Maintain the denormalized ``Listing.rank_score`` column.
+
+    A listing's score is its creation time in hours plus a vendor bonus, also
+    in hours: premium plans rank as if their listings were
+    ``RANK_BOOST_HOURS`` newer, and each star of average rating above or
+    below 3 moves them ``RANK_RATING_HOURS``. Because the recency part only
+    grows with newer listings, scores never need to decay; they only change
+    when the vendor's plan or rating changes.
+    """
+
+    @staticmethod
+    def created_hours(created_at: datetime) -> float:
+        """Hours since the epoch for a naive UTC timestamp"""
+        return created_at.replace(tzinfo=timezone.utc).timestamp() / 3600
+
+    @staticmethod
+    def bonus_hours(visibility_boost: bool, average_rating) -> float:
+        """Vendor bonus for a plan's boost flag and the vendor's average rating"""
+        bonus = settings.RANK_BOOST_HOURS if visibility_boost else 0.0
+        if average_rating is not None:
+            bonus += settings.RANK_RATING_HOURS * (float(average_rating) - 3)
+        return bonus
+
+    @staticmethod
+    def vendor_bonus(db: Session, vendor: Vendor) -> float:
+        """Bonus hours for a single vendor"""
+        average_rating = db.query(func.avg(Review.rating)).filter(
+            Review.vendor_id == vendor.id
+        ).scalar()
+        visibility_boost = db.query(VendorPlan.visibility_boost).filter(
+            VendorPlan.id == vendor.plan_id
+        ).scalar()
+        return RankingService.bonus_hours(bool(visibility_boost), average_rating)
+
+    @staticmethod
+    def score_listing(db: Session, listing: Listing, vendor: Vendor) -> None:
+        """Set the score of a new listing before it is inserted"""
+        listing.rank_score = (
+            RankingService.created_hours(listing.created_at)
+            + RankingService.vendor_bonus(db, vendor)
+        )
+
+    @staticmethod
+    def _apply(db: Session, bonuses: Dict[int, float]) -> int:
+        """Rewrite the scores of every listing owned by the given vendors"""
+        updated = 0
+        for vendor_id, bonus in bonuses.items():
+            result = db.execute(
+                update(Listing)
+                .where(Listing.vendor_id == vendor_id)
+                .values(rank_score=extract("epoch", Listing.created_at) / 3600.0 + bonus)
+                .execution_options(synchronize_session=False)
+            )
+            updated += result.rowcount
+        return updated
+
+    @staticmethod
+    def refresh_vendor(db: Session, vendor_id: int) -> int:
+        """Recompute scores after a vendor's plan or rating changed (caller commits)"""
+        vendor = db.query(Vendor).filter(Vendor.id == vendor_id).first()
+        if not vendor:
+            return 0
+        return RankingService._apply(db, {vendor.id: RankingService.vendor_bonus(db, vendor)})
+
+    @staticmethod
+    def refresh_all(db: Session, batch_size: int = 500) -> int:
+        """Recompute every score, committing after each batch of vendors"""
+        ratings = (
+            db.query(Review.vendor_id, func.avg(Review.rating).label("average_rating"))
+            .group_by(Review.vendor_id)
+            .subquery()
+        )
+        rows = (
+            db.query(Vendor.id, VendorPlan.visibility_boost, ratings.c.average_rating)
+            .join(VendorPlan, Vendor.plan_id == VendorPlan.id)
+            .outerjoin(ratings, ratings.c.vendor_id == Vendor.id)
+            .all()
+        )
+
+        updated = 0
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            updated += RankingService._apply(db, {
+                vendor_id: RankingService.bonus_hours(boost, rating)
+                for vendor_id, boost, rating in batch
+            })
+            db.commit()
+        return updated
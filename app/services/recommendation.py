@@ -0,0 +1,252 @@
+import heapq
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+
+from config import settings
+from models import Listing, Review, User, Vendor, ListingRecommendations
+from services.archive import ArchiveService
+from services.listing_query import ListingQueryBuilder
+from utils import metrics
+
+metrics.describe("recommendation_build_seconds", "Duration of the last personalized listings build")
+metrics.describe("recommendation_buyers_total", "Buyers given personalized listings")
+metrics.describe("recommendation_requests_total", "Personalized listing requests, by source (cache or ranked)")
+
+# Candidates come from the overall ranking plus a buyer's strongest categories and vendors
+TOP_CATEGORIES = 3
+TOP_VENDORS = 5
+VENDOR_POOL = 20  # newest listings taken per preferred vendor
+VENDOR_POOLS_KEPT = 10000  # vendor pools cached during a build before starting over
+
+
+class Pool(NamedTuple):
+    """Candidate listings as parallel arrays"""
+    ids: np.ndarray
+    vendor_ids: np.ndarray
+    categories: np.ndarray
+    rank_scores: np.ndarray
+
+
+# Bonus hours per category and per vendor for one buyer
+Profile = Tuple[Dict[str, float], Dict[int, float]]
+
+
+class _Pools:
+    """Candidates per (category, vendor_id) filter, read once per build.
+
+    Most buyers share a few categories but spread over many vendors, so
+    vendor pools are small and dropped once VENDOR_POOLS_KEPT pile up.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.pools = {}
+        self.vendors = 0
+
+    def __call__(self, category: Optional[str], vendor_id: Optional[int]) -> Pool:
+        key = (category, vendor_id)
+        if key not in self.pools:
+            if vendor_id is not None:
+                if self.vendors >= VENDOR_POOLS_KEPT:
+                    self.pools = {k: pool for k, pool in self.pools.items() if k[1] is None}
+                    self.vendors = 0
+                self.vendors += 1
+            size = settings.RECOMMEND_SIZE if vendor_id is None else VENDOR_POOL
+            self.pools[key] = RecommendationService.pool(self.db, category, vendor_id, size)
+        return self.pools[key]
+
+
+class RecommendationService:
+    """Personalized listings from each buyer's orders and reviews.
+
+    A listing's personal score is its rank_score (services/ranking.py) plus
+    bonus hours: RECOMMEND_CATEGORY_HOURS times the share of the buyer's
+    purchases in its category, RECOMMEND_VENDOR_HOURS times the share from
+    its vendor, and RECOMMEND_RATING_HOURS per star the buyer's reviews of
+    the vendor average above or below 3. Purchases count half as much every
+    RECOMMEND_HALF_LIFE_DAYS; cancelled orders do not count.
+
+    Candidates are the top of the overall ranking, of the buyer's strongest
+    categories and of their preferred vendors, all read from the browse
+    indexes. ``build`` scores every buyer with history in batch and caches
+    their best RECOMMEND_SIZE for RECOMMEND_TTL_HOURS; ``recommended``
+    serves that with one lookup. Buyers without a fresh row (new ones, or
+    no orders or reviews) get the ranked browse, premium boost included.
+    """
+
+    @staticmethod
+    def profiles(db: Session, low: int, high: int, now: datetime) -> Dict[int, Profile]:
+        """Category and vendor bonuses of buyers with ids in [low, high] that have any history"""
+        orders = ArchiveService.all_orders().c
+        purchases = defaultdict(lambda: (defaultdict(float), defaultdict(float)))
+        for buyer_id, vendor_id, category, ordered_at in db.query(
+            orders.buyer_id, func.coalesce(orders.vendor_id, Listing.vendor_id), Listing.category, orders.ordered_at
+        ).join(Listing, Listing.id == orders.listing_id).filter(
+            orders.buyer_id.between(low, high),
+            orders.status != "cancelled"
+        ):
+            days = max((now - ordered_at).total_seconds(), 0) / 86400 if ordered_at else 0
+            weight = 0.5 ** (days / settings.RECOMMEND_HALF_LIFE_DAYS)
+            categories, vendors = purchases[buyer_id]
+            categories[category] += weight
+            vendors[vendor_id] += weight
+
+        profiles = {}
+        for buyer_id, (categories, vendors) in purchases.items():
+            total = sum(categories.values())
+            profiles[buyer_id] = (
+                {c: settings.RECOMMEND_CATEGORY_HOURS * w / total for c, w in categories.items()},
+                {v: settings.RECOMMEND_VENDOR_HOURS * w / total for v, w in vendors.items()},
+            )
+
+        for buyer_id, vendor_id, rating in db.query(
+            Review.buyer_id, Review.vendor_id, func.avg(Review.rating)
+        ).filter(
+            Review.buyer_id.between(low, high)
+        ).group_by(Review.buyer_id, Review.vendor_id):
+            vendors = profiles.setdefault(buyer_id, ({}, {}))[1]
+            vendors[vendor_id] = vendors.get(vendor_id, 0.0) + settings.RECOMMEND_RATING_HOURS * (float(rating) - 3)
+        return profiles
+
+    @staticmethod
+    def pool(db: Session, category: Optional[str] = None, vendor_id: Optional[int] = None, size: int = 0) -> Pool:
+        """Top ``size`` (default RECOMMEND_SIZE) active listings of the ranked browse, optionally narrowed"""
+        query = ListingQueryBuilder(category=category, vendor_id=vendor_id).build(db).limit(size or settings.RECOMMEND_SIZE)
+        rows = query.with_entities(Listing.id, Listing.vendor_id, Listing.category, Listing.rank_score).all()
+        return Pool(
+            np.array([row.id for row in rows], dtype=np.int64),
+            np.array([row.vendor_id for row in rows], dtype=np.int64),
+            np.array([row.category for row in rows], dtype=object),
+            np.array([row.rank_score for row in rows], dtype=np.float64),
+        )
+
+    @staticmethod
+    def rank(profile: Profile, pools, own_vendors=()) -> List[int]:
+        """Best RECOMMEND_SIZE listing ids for one buyer.
+
+        ``pools`` returns the Pool for a (category, vendor_id) filter;
+        listings of the buyer's own vendor profiles are left out.
+        """
+        categories, vendors = profile
+        chosen = [pools(None, None)]
+        chosen += [pools(category, None) for category in heapq.nlargest(TOP_CATEGORIES, categories, key=categories.get)]
+        chosen += [
+            pools(None, vendor_id) for vendor_id in heapq.nlargest(TOP_VENDORS, vendors, key=vendors.get)
+            if vendors[vendor_id] > 0
+        ]
+
+        ids, first = np.unique(np.concatenate([pool.ids for pool in chosen]), return_index=True)
+        vendor_ids = np.concatenate([pool.vendor_ids for pool in chosen])[first]
+        listing_categories = np.concatenate([pool.categories for pool in chosen])[first]
+        scores = np.concatenate([pool.rank_scores for pool in chosen])[first]
+        for category, bonus in categories.items():
+            scores[listing_categories == category] += bonus
+        for vendor_id, bonus in vendors.items():
+            scores[vendor_ids == vendor_id] += bonus
+
+        keep = ~np.isin(vendor_ids, list(own_vendors))
+        ids, scores = ids[keep], scores[keep]
+        # Best score first, newest id breaking ties as the ranked browse does
+        return ids[np.lexsort((-ids, -scores))[:settings.RECOMMEND_SIZE]].tolist()
+
+    @staticmethod
+    def build_chunk(db: Session, after_id: int, limit: int, pools) -> Tuple[Optional[int], int]:
+        """Rewrite the cached listings of up to ``limit`` users with ids above ``after_id``.
+
+        Returns (last user id looked at, buyers given listings); the id is
+        None once no users are left. Users in the range without history
+        lose any row they had and fall back to the ranked browse.
+        """
+        user_ids = db.query(User.id).filter(User.id > after_id).order_by(User.id).limit(limit).all()
+        if not user_ids:
+            db.rollback()
+            return None, 0
+        low, high = user_ids[0].id, user_ids[-1].id
+        now = datetime.utcnow()
+        try:
+            profiles = RecommendationService.profiles(db, low, high, now)
+            own_vendors = defaultdict(set)
+            for vendor_id, user_id in db.query(Vendor.id, Vendor.user_id).filter(Vendor.user_id.between(low, high)):
+                own_vendors[user_id].add(vendor_id)
+
+            expires_at = now + timedelta(hours=settings.RECOMMEND_TTL_HOURS)
+            rows = []
+            for user_id, profile in sorted(profiles.items()):
+                listing_ids = RecommendationService.rank(profile, pools, own_vendors.get(user_id, ()))
+                if listing_ids:
+                    rows.append({"user_id": user_id, "listing_ids": listing_ids,
+                                 "computed_at": now, "expires_at": expires_at})
+
+            db.query(ListingRecommendations).filter(
+                ListingRecommendations.user_id.between(low, high)
+            ).delete(synchronize_session=False)
+            if rows:
+                db.execute(insert(ListingRecommendations), rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        metrics.inc("recommendation_buyers_total", len(rows))
+        return high, len(rows)
+
+    @staticmethod
+    def build(db: Session, chunk: Optional[int] = None) -> Dict[str, float]:
+        """Score every buyer with history, RECOMMEND_CHUNK users per transaction, then purge expired rows"""
+        chunk = chunk or settings.RECOMMEND_CHUNK
+        started = time.perf_counter()
+
+        pools = _Pools(db)
+        summary = {"buyers": 0, "chunks": 0}
+        last_id = 0
+        while True:
+            last_id, buyers = RecommendationService.build_chunk(db, last_id, chunk, pools)
+            if last_id is None:
+                break
+            summary["buyers"] += buyers
+            summary["chunks"] += 1
+
+        try:
+            summary["expired"] = db.query(ListingRecommendations).filter(
+                ListingRecommendations.expires_at <= datetime.utcnow()
+            ).delete(synchronize_session=False)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        summary["seconds"] = time.perf_counter() - started
+        metrics.set_gauge("recommendation_build_seconds", summary["seconds"])
+        return summary
+
+    @staticmethod
+    def recommended(db: Session, user: User, skip: int = 0, limit: int = settings.DEFAULT_PAGE_SIZE) -> List[Listing]:
+        """A page of the buyer's cached listings, or of the ranked browse if none are fresh"""
+        listing_ids = db.query(ListingRecommendations.listing_ids).filter(
+            ListingRecommendations.user_id == user.id,
+            ListingRecommendations.expires_at > datetime.utcnow()
+        ).scalar()
+        if listing_ids is None:
+            metrics.inc("recommendation_requests_total", source="ranked")
+            return ListingQueryBuilder(skip=skip, limit=limit).build(db).all()
+
+        metrics.inc("recommendation_requests_total", source="cache")
+        # Pages count from the start of the list, skipping candidates sold
+        # or paused since the build; a little more than the page is loaded
+        # at a time so one query is usually enough
+        listings = []
+        start, wanted = 0, skip + limit
+        while len(listings) < wanted and start < len(listing_ids):
+            batch = listing_ids[start:start + (wanted - len(listings)) * 5 // 4 + 1]
+            found = {listing.id: listing for listing in db.query(Listing).filter(
+                Listing.id.in_(batch),
+                Listing.status == "active"
+            )}
+            listings += [found[i] for i in batch if i in found]
+            start += len(batch)
+        return listings[skip:wanted]
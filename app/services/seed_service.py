@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Session
-from app.models.vendor import VendorPlan  # Adjust import path as needed
+from models import VendorPlan
 from decimal import Decimal
 
 class SeedService:
@@ -7,9 +7,8 @@ class SeedService:
     def seed_vendor_plans(db: Session):
         """Seed default vendor plans if they don't exist"""
         
-        # Check if plans already exist
-        existing_plans = db.query(VendorPlan).count()
-        if existing_plans > 0:
+        # Check if plans already exist (first row only, no count scan)
+        if db.query(VendorPlan.id).first() is not None:
             print("Vendor plans already exist, skipping seed...")
             return
         
@@ -18,7 +17,7 @@ class SeedService:
             {
                 "name": "Basic",
                 "monthly_fee": Decimal("0.00"),  # Free sign-ups
-                "remittance_rate": Decimal("0.92"),  # 8% commission = 92% remittance
+                "remittance_rate": Decimal("92.00"),  # 8% commission = 92% remittance (a percentage)
                 "max_listings_per_month": 10,  # Limited listings
                 "visibility_boost": False,
                 "description": "Free sign-ups for all sellers, no subscription fee required"
@@ -26,7 +25,7 @@ class SeedService:
             {
                 "name": "Premium",
                 "monthly_fee": Decimal("29.99"),  # Monthly subscription
-                "remittance_rate": Decimal("0.95"),  # 5% commission = 95% remittance
+                "remittance_rate": Decimal("95.00"),  # 5% commission = 95% remittance (a percentage)
                 "max_listings_per_month": -1,  # -1 for unlimited (or use a large number)
                 "visibility_boost": True,
                 "description": "Monthly subscriptions with unlimited listings and increased visibility"
@@ -0,0 +1,149 @@
+import asyncio
+import hashlib
+import secrets
+import time
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from config import settings
+from db.session import SessionLocal
+from models import AuthSession, User
+from services.auth import AuthService
+from utils import token
+
+
+class SessionService:
+    """Login sessions: short-lived access tokens plus a rotating refresh token.
+
+    A refresh token is ``<session id>.<secret>`` and only hashes of the
+    current and the previous secret are stored. Each refresh swaps in a new
+    secret, so the previous one coming back means the token leaked and the
+    whole session is revoked. Any other wrong secret is just refused: the
+    session id is readable, so guessing it must not log the user out.
+    """
+
+    @staticmethod
+    def _hash(secret: str) -> str:
+        return hashlib.sha256(secret.encode()).hexdigest()
+
+    @staticmethod
+    def _tokens(user: User, session_id: str, secret: str) -> dict:
+        return {
+            "access_token": AuthService.create_user_token(user, session_id),
+            "refresh_token": f"{session_id}.{secret}",
+            "token_type": "bearer",
+            "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        }
+
+    @staticmethod
+    def start(db: Session, user: User) -> dict:
+        """Open a session for ``user`` and issue its first token pair"""
+        now = datetime.utcnow()
+        secret = secrets.token_urlsafe(32)
+        session = AuthSession(
+            id=secrets.token_hex(16),
+            user_id=user.id,
+            refresh_token_hash=SessionService._hash(secret),
+            created_at=now,
+            refreshed_at=now,
+            expires_at=now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+        )
+        db.add(session)
+        db.commit()
+        return SessionService._tokens(user, session.id, secret)
+
+    @staticmethod
+    def refresh(db: Session, refresh_token: str) -> dict:
+        """Rotate the refresh token and issue a new access token"""
+        session_id, _, secret = refresh_token.partition(".")
+        session = db.query(AuthSession).filter(AuthSession.id == session_id).first()
+        now = datetime.utcnow()
+        if not session or session.revoked_at is not None or session.expires_at < now:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Refresh token expired or revoked"
+            )
+
+        new_secret = secrets.token_urlsafe(32)
+        presented = SessionService._hash(secret)
+        # Conditional on the presented secret so two uses of one token cannot both win
+        rotated = db.query(AuthSession).filter(
+            AuthSession.id == session_id,
+            AuthSession.refresh_token_hash == presented,
+            AuthSession.revoked_at.is_(None)
+        ).update(
+            {"refresh_token_hash": SessionService._hash(new_secret), "previous_token_hash": presented,
+             "refreshed_at": now},
+            synchronize_session=False
+        )
+        if not rotated:
+            previous = db.query(AuthSession.previous_token_hash).filter(AuthSession.id == session_id).scalar()
+            if previous and secrets.compare_digest(previous, presented):
+                # A secret that was already rotated away is being replayed
+                SessionService.revoke(db, session_id)
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Refresh token reuse detected; session revoked"
+                )
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid refresh token"
+            )
+        db.commit()
+        return SessionService._tokens(session.user, session_id, new_secret)
+
+    @staticmethod
+    def _revoke(db: Session, query) -> int:
+        now = datetime.utcnow()
+        session_ids = [row[0] for row in query.filter(AuthSession.revoked_at.is_(None)).with_entities(AuthSession.id)]
+        if session_ids:
+            db.query(AuthSession).filter(AuthSession.id.in_(session_ids)).update(
+                {"revoked_at": now}, synchronize_session=False
+            )
+        db.commit()
+        # Refuse this worker's copies at once; others pick them up on their next sync
+        until = time.time() + token.access_token_ttl()
+        for session_id in session_ids:
+            token.revocations.add(session_id, until)
+        return len(session_ids)
+
+    @staticmethod
+    def revoke(db: Session, session_id: str) -> int:
+        """End one session; its access tokens stop working immediately"""
+        return SessionService._revoke(db, db.query(AuthSession).filter(AuthSession.id == session_id))
+
+    @staticmethod
+    def revoke_user(db: Session, user_id: int) -> int:
+        """End every session of a user"""
+        return SessionService._revoke(db, db.query(AuthSession).filter(AuthSession.user_id == user_id))
+
+    @staticmethod
+    def sync_revocations(db: Session) -> int:
+        """Load sessions revoked by any worker recently enough to still hold live access tokens"""
+        ttl = token.access_token_ttl()
+        cutoff = datetime.utcnow() - timedelta(seconds=ttl)
+        rows = db.query(AuthSession.id, AuthSession.revoked_at).filter(AuthSession.revoked_at >= cutoff).all()
+        for session_id, revoked_at in rows:
+            token.revocations.add(session_id, revoked_at.replace(tzinfo=timezone.utc).timestamp() + ttl)
+        return len(rows)
+
+    @staticmethod
+    async def sync_forever():
+        """Background task keeping this worker's revocation list current"""
+        def sync():
+            db = SessionLocal()
+            try:
+                SessionService.sync_revocations(db)
+            finally:
+                db.close()
+
+        while True:
+            try:
+                await run_in_threadpool(sync)
+            except Exception as e:
+                print(f"Revocation sync failed: {e}")
+            await asyncio.sleep(settings.REVOCATION_SYNC_SECONDS)
@@ -0,0 +1,166 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import and_, bindparam, func, or_, update
+from sqlalchemy.orm import Session
+
+from config import settings
+from db.session import SessionLocal
+from models import Order, Vendor, Wallet
+from services.order_events import OrderEventService
+from services.payout import PayoutService
+from services.vendor_sales import VendorSalesService
+from utils import metrics
+
+metrics.describe("escrow_backlog", "Orders past the auto-confirm window still holding escrow, at the last sweep")
+metrics.describe("escrow_sweep_seconds", "Duration of the last escrow sweep")
+metrics.describe("escrow_sweeps_total", "Escrow sweeps run")
+metrics.describe("escrow_orders_settled_total", "Orders whose escrow was released to the seller")
+
+_wallets = Wallet.__table__
+
+_credit = update(_wallets).where(
+    _wallets.c.user_id == bindparam("b_user_id")
+).values(balance=_wallets.c.balance + bindparam("b_amount"), updated_at=bindparam("b_now"))
+
+
+class SettlementService:
+    """Releasing escrowed order payments to sellers.
+
+    An order is settled once: the buyer confirming delivery and the sweeper
+    both claim it with ``settled_at IS NULL`` in the WHERE clause, so only
+    one of them pays the seller.
+    """
+
+    @staticmethod
+    def release(db: Session, previous: Dict[int, str], settled_at: datetime) -> int:
+        """Credit sellers for orders the caller just marked settled at ``settled_at``.
+
+        ``previous`` maps each order id to its status before settlement. The
+        payouts are computed in SQL and stored on the orders, then one read
+        and one batched wallet UPDATE pay them however many orders there
+        are; the caller commits.
+        """
+        if not previous:
+            return 0
+        settled = and_(Order.id.in_(list(previous)), Order.settled_at == settled_at)
+        db.query(Order).filter(settled).update(
+            {"payout": PayoutService.order_payout()}, synchronize_session=False
+        )
+        rows = db.query(
+            Order.id, Order.buyer_id, Order.status, Vendor.id, Vendor.user_id, Order.price, Order.payout
+        ).join(Vendor, Vendor.id == Order.vendor_id).filter(settled).all()
+        if not rows:
+            return 0
+
+        credits = defaultdict(Decimal)
+        settlements = []
+        for order_id, _, _, vendor_id, seller_user_id, price, payout in rows:
+            credits[seller_user_id] += payout
+            settlements.append((vendor_id, price, payout, previous[order_id]))
+        db.execute(_credit, [
+            {"b_user_id": user_id, "b_amount": amount, "b_now": settled_at}
+            for user_id, amount in sorted(credits.items())
+        ])
+        VendorSalesService.record_settlements(db, settlements, settled_at)
+        OrderEventService.record_many(db, [
+            (order_id, buyer_id, seller_user_id, order_status)
+            for order_id, buyer_id, order_status, _, seller_user_id, _, _ in rows
+        ])
+        return len(rows)
+
+    @staticmethod
+    def _due(now: datetime):
+        """Unsettled orders past their auto-confirm window"""
+        shipped_before = now - timedelta(days=settings.AUTO_CONFIRM_SHIPPED_DAYS)
+        delivered_before = now - timedelta(days=settings.AUTO_CONFIRM_DELIVERED_DAYS)
+        return and_(
+            Order.settled_at.is_(None),
+            or_(
+                and_(Order.status == "shipped",
+                     func.coalesce(Order.shipped_at, Order.ordered_at) < shipped_before),
+                and_(Order.status == "delivered",
+                     func.coalesce(Order.delivered_at, Order.ordered_at) < delivered_before),
+            )
+        )
+
+    @staticmethod
+    def backlog(db: Session, now: Optional[datetime] = None) -> int:
+        return db.query(func.count(Order.id)).filter(SettlementService._due(now or datetime.utcnow())).scalar()
+
+    @staticmethod
+    def settle_chunk(db: Session, limit: int) -> Tuple[int, int]:
+        """Auto-confirm and pay out up to ``limit`` due orders in one transaction.
+
+        Returns (claimed, settled); they differ only when buyers confirmed
+        some of the claimed orders first.
+        """
+        now = datetime.utcnow()
+        try:
+            # SKIP LOCKED (Postgres): concurrent sweepers take disjoint chunks
+            # and never wait on an order a buyer is confirming
+            previous = dict(db.query(Order.id, Order.status).filter(
+                SettlementService._due(now)
+            ).order_by(Order.id).limit(limit).with_for_update(skip_locked=True).all())
+            ids = list(previous)
+            if not ids:
+                db.rollback()
+                return 0, 0
+
+            db.query(Order).filter(
+                Order.id.in_(ids),
+                Order.settled_at.is_(None)
+            ).update({
+                "status": "delivered",
+                "delivered_at": func.coalesce(Order.delivered_at, now),
+                "settled_at": now,
+            }, synchronize_session=False)
+            settled = SettlementService.release(db, previous, now)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        metrics.inc("escrow_orders_settled_total", settled)
+        return len(ids), settled
+
+    @staticmethod
+    def sweep(db: Session, chunk: Optional[int] = None) -> int:
+        """Settle every due order, ESCROW_SWEEP_CHUNK per transaction"""
+        chunk = chunk or settings.ESCROW_SWEEP_CHUNK
+        started = time.perf_counter()
+        metrics.set_gauge("escrow_backlog", SettlementService.backlog(db))
+        db.commit()
+
+        total = 0
+        while True:
+            claimed, settled = SettlementService.settle_chunk(db, chunk)
+            total += settled
+            if claimed < chunk:
+                break
+
+        metrics.set_gauge("escrow_sweep_seconds", time.perf_counter() - started)
+        metrics.inc("escrow_sweeps_total")
+        return total
+
+    @staticmethod
+    def run_once() -> int:
+        db = SessionLocal()
+        try:
+            return SettlementService.sweep(db)
+        finally:
+            db.close()
+
+    @staticmethod
+    async def sweep_forever():
+        """Background task settling overdue orders every ESCROW_SWEEP_SECONDS"""
+        while True:
+            try:
+                await run_in_threadpool(SettlementService.run_once)
+            except Exception as e:
+                print(f"Escrow sweep failed: {e}")
+            await asyncio.sleep(settings.ESCROW_SWEEP_SECONDS)
@@ -0,0 +1,271 @@
+import asyncio
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+import numpy as np
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from config import settings
+from db.session import SessionLocal
+from models import Listing
+from services.listing_query import ListingQueryBuilder
+from utils import metrics
+
+metrics.describe("similar_index_rows", "Listings in this worker's similar-listings index")
+metrics.describe("similar_index_bytes", "Memory held by the index vectors")
+metrics.describe("similar_index_build_seconds", "Duration of the last full index build")
+metrics.describe("similar_index_refresh_seconds", "Duration of the last incremental index refresh")
+metrics.describe("similar_index_rebuilds_total", "Full index builds")
+
+FIT_SAMPLE = 50000  # listings the text model and clusters are fitted on
+VOCABULARY = 20000  # most frequent terms kept; the model holds SIMILAR_DIMENSIONS floats per term
+REBUILD_DRIFT = 0.2  # listings changed since the last fit, as a share of the index
+SYNC_OVERLAP = timedelta(minutes=1)  # status changes committed late are still picked up
+
+
+def _document(title: str, description: Optional[str], category: str) -> str:
+    # The category is one more term, so listings in the same one score higher
+    return f"{title} {description or ''} category_{category}"
+
+
+@dataclass(frozen=True)
+class SimilarIndex:
+    """One snapshot of the index; refreshes build a new one and swap it in"""
+    ids: np.ndarray  # listing id per row
+    vectors: np.ndarray  # unit-length float32, one row per listing
+    alive: np.ndarray  # False once the listing stopped being active
+    clusters: np.ndarray  # cluster of each row
+    centroids: np.ndarray
+    members: np.ndarray  # rows grouped by cluster: cluster c owns members[offsets[c]:offsets[c + 1]]
+    offsets: np.ndarray
+    order: np.ndarray  # rows sorted by listing id, for lookups by id
+    model: object  # fitted text -> vector pipeline
+    built_at: datetime
+    synced_at: datetime  # changes after this are not in the index yet
+    max_id: int
+    drift: int = 0  # listings changed since built_at
+
+
+class SimilarListingService:
+    """Related listings from an in-memory approximate nearest-neighbour index.
+
+    Active listings are embedded as TF-IDF over title, description and
+    category, reduced with truncated SVD to SIMILAR_DIMENSIONS, and grouped
+    into about sqrt(n) clusters; a lookup scores only the SIMILAR_PROBES
+    clusters nearest the listing. Each worker keeps its own index, caught up
+    every SIMILAR_REFRESH_SECONDS with new listings and status changes, and
+    refitted every SIMILAR_REBUILD_SECONDS (which also picks up edits) or
+    once REBUILD_DRIFT of it has changed. Until the first build finishes,
+    lookups fall back to the listing's category.
+    """
+
+    _index: Optional[SimilarIndex] = None
+
+    @staticmethod
+    def _embed(model, documents: List[str]) -> np.ndarray:
+        return model.transform(documents).astype(np.float32)
+
+    @staticmethod
+    def _assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        """Nearest centroid per row, in chunks to bound memory"""
+        clusters = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), 10000):
+            clusters[start:start + 10000] = np.argmax(vectors[start:start + 10000] @ centroids.T, axis=1)
+        return clusters
+
+    @staticmethod
+    def _rows(index: SimilarIndex, listing_ids) -> np.ndarray:
+        """Row of each listing id in the index, -1 where absent"""
+        listing_ids = np.asarray(listing_ids, dtype=np.int64)
+        positions = np.minimum(np.searchsorted(index.ids, listing_ids, sorter=index.order), len(index.ids) - 1)
+        rows = index.order[positions]
+        return np.where(index.ids[rows] == listing_ids, rows, -1)
+
+    @staticmethod
+    def _group(clusters: np.ndarray, count: int):
+        members = np.argsort(clusters, kind="stable").astype(np.int32)
+        offsets = np.searchsorted(clusters[members], np.arange(count + 1))
+        return members, offsets
+
+    @staticmethod
+    def build(db: Session) -> Optional[SimilarIndex]:
+        """Fit the text model and clusters on the active listings; None if too few"""
+        from sklearn.cluster import MiniBatchKMeans
+        from sklearn.decomposition import TruncatedSVD
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.pipeline import make_pipeline
+        from sklearn.preprocessing import Normalizer
+
+        synced_at = datetime.utcnow()
+        rows = db.query(Listing.id, Listing.title, Listing.description, Listing.category).filter(
+            Listing.status == "active"
+        ).order_by(Listing.id).all()
+        if len(rows) < 2:
+            return None
+        ids = np.array([row.id for row in rows], dtype=np.int64)
+        documents = [_document(row.title, row.description, row.category) for row in rows]
+        del rows
+
+        rng = np.random.default_rng(0)
+        sample = rng.choice(len(documents), min(FIT_SAMPLE, len(documents)), replace=False)
+        model = make_pipeline(
+            # Words outside the fitted vocabulary are ignored until the next build
+            TfidfVectorizer(max_features=VOCABULARY, stop_words="english", sublinear_tf=True, dtype=np.float32),
+            TruncatedSVD(n_components=min(settings.SIMILAR_DIMENSIONS, len(sample) - 1), random_state=0),
+            Normalizer(copy=False),
+        )
+        model.fit([documents[i] for i in sample])
+        model[0].stop_words_ = None  # every term cut from the vocabulary; only kept for inspection
+        vectors = np.vstack([
+            SimilarListingService._embed(model, documents[start:start + 10000])
+            for start in range(0, len(documents), 10000)
+        ])
+
+        count = max(1, int(np.sqrt(len(ids))))
+        kmeans = MiniBatchKMeans(n_clusters=count, batch_size=4096, n_init=1, random_state=0)
+        kmeans.fit(vectors[sample[:count * 100]])
+        centroids = kmeans.cluster_centers_.astype(np.float32)
+        centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+        clusters = SimilarListingService._assign(vectors, centroids)
+        members, offsets = SimilarListingService._group(clusters, count)
+
+        return SimilarIndex(
+            ids=ids, vectors=vectors, alive=np.ones(len(ids), dtype=bool), clusters=clusters,
+            centroids=centroids, members=members, offsets=offsets, order=np.arange(len(ids)),
+            model=model, built_at=synced_at, synced_at=synced_at, max_id=int(ids[-1]),
+        )
+
+    @staticmethod
+    def update(db: Session, index: SimilarIndex) -> SimilarIndex:
+        """Fold in listings created or changing status since the index was synced"""
+        synced_at = datetime.utcnow()
+        changed = db.query(
+            Listing.id, Listing.title, Listing.description, Listing.category, Listing.status
+        ).filter(or_(
+            Listing.id > index.max_id,
+            Listing.status_changed_at >= index.synced_at - SYNC_OVERLAP
+        )).order_by(Listing.id).all()
+        if not changed:
+            return replace(index, synced_at=synced_at)
+
+        found = SimilarListingService._rows(index, [row.id for row in changed])
+        alive = index.alive.copy()
+        alive[[row for row, listing in zip(found, changed) if row >= 0 and listing.status != "active"]] = False
+        ids, vectors, clusters = index.ids, index.vectors, index.clusters
+        active = [i for i, listing in enumerate(changed) if listing.status == "active"]
+        if active:
+            embedded = SimilarListingService._embed(index.model, [
+                _document(changed[i].title, changed[i].description, changed[i].category) for i in active
+            ])
+            assigned = SimilarListingService._assign(embedded, index.centroids)
+            rows = found[active]
+            known, new = rows >= 0, rows < 0
+            if known.any():
+                vectors, clusters = vectors.copy(), clusters.copy()
+                vectors[rows[known]], clusters[rows[known]] = embedded[known], assigned[known]
+                alive[rows[known]] = True
+            if new.any():
+                ids = np.concatenate([ids, np.array([changed[i].id for i in active], dtype=np.int64)[new]])
+                vectors = np.vstack([vectors, embedded[new]])
+                clusters = np.concatenate([clusters, assigned[new]])
+                alive = np.concatenate([alive, np.ones(int(new.sum()), dtype=bool)])
+        members, offsets = SimilarListingService._group(clusters, len(index.centroids))
+
+        return replace(
+            index, ids=ids, vectors=vectors, alive=alive, clusters=clusters, members=members,
+            offsets=offsets, order=np.argsort(ids, kind="stable"), synced_at=synced_at,
+            max_id=max(index.max_id, changed[-1].id), drift=index.drift + len(changed),
+        )
+
+    @staticmethod
+    def search(index: SimilarIndex, vector: np.ndarray, limit: int, exclude_id: Optional[int] = None) -> List[int]:
+        """Ids of up to ``limit`` live listings nearest ``vector``, best first"""
+        probes = min(settings.SIMILAR_PROBES, len(index.centroids))
+        nearest = np.argpartition(index.centroids @ vector, -probes)[-probes:]
+        rows = np.concatenate([index.members[index.offsets[c]:index.offsets[c + 1]] for c in nearest])
+        rows = rows[index.alive[rows]]
+        take = min(limit + 1, len(rows))
+        if not take:
+            return []
+        scores = index.vectors[rows] @ vector
+        top = np.argpartition(scores, -take)[-take:]
+        top = top[np.argsort(-scores[top])]
+        return [int(i) for i in index.ids[rows[top]] if i != exclude_id][:limit]
+
+    @staticmethod
+    def similar(db: Session, listing_id: int, limit: int) -> List[Listing]:
+        """Active listings most like an active listing"""
+        index = SimilarListingService._index
+        row = SimilarListingService._rows(index, [listing_id])[0] if index is not None else -1
+        if row >= 0 and index.alive[row]:
+            vector = index.vectors[row]
+        else:
+            listing = db.query(Listing).filter(
+                Listing.id == listing_id,
+                Listing.status == "active"
+            ).first()
+            if not listing:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Listing not found"
+                )
+            if index is None:
+                same_category = ListingQueryBuilder(category=listing.category, limit=limit + 1).build(db).all()
+                return [other for other in same_category if other.id != listing_id][:limit]
+            vector = SimilarListingService._embed(
+                index.model, [_document(listing.title, listing.description, listing.category)]
+            )[0]
+
+        ids = SimilarListingService.search(index, vector, limit, exclude_id=listing_id)
+        # The index may lag a status change by one refresh
+        found = {listing.id: listing for listing in db.query(Listing).filter(
+            Listing.id.in_(ids),
+            Listing.status == "active"
+        )}
+        return [found[i] for i in ids if i in found]
+
+    @staticmethod
+    def refresh(db: Session) -> Optional[SimilarIndex]:
+        """Catch the index up, or rebuild it when it is old or has drifted"""
+        index = SimilarListingService._index
+        started = time.perf_counter()
+        if (
+            index is None
+            or datetime.utcnow() - index.built_at > timedelta(seconds=settings.SIMILAR_REBUILD_SECONDS)
+            or index.drift > REBUILD_DRIFT * len(index.ids)
+        ):
+            index = SimilarListingService.build(db)
+            metrics.set_gauge("similar_index_build_seconds", time.perf_counter() - started)
+            metrics.inc("similar_index_rebuilds_total")
+        else:
+            index = SimilarListingService.update(db, index)
+            metrics.set_gauge("similar_index_refresh_seconds", time.perf_counter() - started)
+        db.rollback()
+
+        SimilarListingService._index = index
+        metrics.set_gauge("similar_index_rows", len(index.ids) if index is not None else 0)
+        metrics.set_gauge("similar_index_bytes", index.vectors.nbytes if index is not None else 0)
+        return index
+
+    @staticmethod
+    def run_once():
+        db = SessionLocal()
+        try:
+            SimilarListingService.refresh(db)
+        finally:
+            db.close()
+
+    @staticmethod
+    async def refresh_forever():
+        """Background task keeping this worker's index current every SIMILAR_REFRESH_SECONDS"""
+        while True:
+            try:
+                await run_in_threadpool(SimilarListingService.run_once)
+            except Exception as e:
+                print(f"Similar listings refresh failed: {e}")
+            await asyncio.sleep(settings.SIMILAR_REFRESH_SECONDS)
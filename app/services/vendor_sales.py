@@ -0,0 +1,234 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from models import (
+    Listing, Vendor, VendorPlan,
+    VendorSalesSummary, VendorDailySales, VendorListingSales
+)
+from services.archive import ArchiveService
+from services.payout import PayoutService
+
+ORDER_STATUSES = ("pending", "confirmed", "shipped", "delivered", "cancelled")
+ZERO = Decimal("0.00")
+
+
+class OrderChange(NamedTuple):
+    """An order moving between statuses, as the rollups need to see it"""
+    vendor_id: int
+    listing_id: int
+    price: Decimal
+    ordered_at: datetime
+    old_status: Optional[str]  # None for a new order
+    new_status: str
+    settled: bool = False
+
+
+def _day(value) -> date:
+    # func.date() gives a date on Postgres and an ISO string on SQLite
+    if isinstance(value, str):
+        return date.fromisoformat(value)
+    return value.date() if isinstance(value, datetime) else value
+
+
+class _Deltas:
+    """Increments for the rollup tables, written with one upsert per table"""
+
+    tables = {
+        VendorSalesSummary: ("vendor_id",),
+        VendorDailySales: ("vendor_id", "day"),
+        VendorListingSales: ("vendor_id", "listing_id"),
+    }
+
+    def __init__(self):
+        self.rows = {model: defaultdict(lambda: defaultdict(int)) for model in self.tables}
+
+    def add(self, model, key: tuple, **deltas):
+        row = self.rows[model][key]
+        for column, amount in deltas.items():
+            row[column] += amount
+
+    def flush(self, db: Session):
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            raise NotImplementedError(f"Sales rollups need INSERT ... ON CONFLICT, not available on {dialect}")
+
+        for model, keys in self.tables.items():
+            if not self.rows[model]:
+                continue
+            table = model.__table__
+            values = [column.name for column in table.columns if column.name not in keys]
+            stmt = insert(table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=list(keys),
+                set_={column: table.c[column] + stmt.excluded[column] for column in values}
+            )
+            # Sorted so concurrent transactions lock rows in the same order
+            params = [
+                {**dict(zip(keys, key)), **{column: deltas.get(column, 0) for column in values}}
+                for key, deltas in sorted(self.rows[model].items())
+            ]
+            db.execute(stmt, params)
+        self.rows = {model: defaultdict(lambda: defaultdict(int)) for model in self.tables}
+
+
+class VendorSalesService:
+    """Incremental sales rollups behind the vendor dashboard.
+
+    Order code reports every change here inside its own transaction, so the
+    rollups commit (or roll back) with the orders they describe. Cancelled
+    orders drop out of orders/gross; payouts are booked on settlement.
+    """
+
+    @staticmethod
+    def record(db: Session, changes: Iterable[OrderChange]):
+        deltas = _Deltas()
+        for change in changes:
+            summary = {}
+            if change.old_status:
+                summary[change.old_status] = -1
+            summary[change.new_status] = summary.get(change.new_status, 0) + 1
+
+            # Joining or leaving the cancelled set moves the sale itself
+            sign = 0
+            if change.old_status in (None, "cancelled") and change.new_status != "cancelled":
+                sign = 1
+            elif change.old_status not in (None, "cancelled") and change.new_status == "cancelled":
+                sign = -1
+            if sign:
+                amount = sign * change.price
+                summary.update(orders=sign, gross=amount)
+                if not change.settled:
+                    summary["escrow"] = amount
+                deltas.add(VendorDailySales, (change.vendor_id, _day(change.ordered_at)), orders=sign, gross=amount)
+                deltas.add(VendorListingSales, (change.vendor_id, change.listing_id), orders=sign, gross=amount)
+            deltas.add(VendorSalesSummary, (change.vendor_id,), **summary)
+        deltas.flush(db)
+
+    @staticmethod
+    def record_settlements(db: Session, settlements: Iterable[Tuple[int, Decimal, Decimal, str]], settled_at: datetime):
+        """Book (vendor_id, price, payout, previous_status) rows settled at ``settled_at``"""
+        deltas = _Deltas()
+        for vendor_id, price, payout, previous_status in settlements:
+            summary = {"escrow": -price, "payouts": payout}
+            if previous_status != "delivered":
+                summary.update({previous_status: -1, "delivered": 1})
+            deltas.add(VendorSalesSummary, (vendor_id,), **summary)
+            deltas.add(VendorDailySales, (vendor_id, settled_at.date()), payouts=payout)
+        deltas.flush(db)
+
+    @staticmethod
+    def rebuild(db: Session) -> int:
+        """Recompute every rollup from the orders, archived ones included; returns vendors covered"""
+        db.query(VendorSalesSummary).delete(synchronize_session=False)
+        db.query(VendorDailySales).delete(synchronize_session=False)
+        db.query(VendorListingSales).delete(synchronize_session=False)
+
+        orders = ArchiveService.all_orders().c
+        live = orders.status != "cancelled"
+        deltas = _Deltas()
+
+        for vendor_id, order_status, count, gross, escrow in db.query(
+            orders.vendor_id, orders.status, func.count(orders.id), func.sum(orders.price),
+            func.sum(case((orders.settled_at.is_(None), orders.price), else_=0))
+        ).group_by(orders.vendor_id, orders.status):
+            summary = {order_status: count}
+            if order_status != "cancelled":
+                summary.update(orders=count, gross=gross, escrow=escrow)
+            deltas.add(VendorSalesSummary, (vendor_id,), **summary)
+
+        day = func.date(orders.ordered_at)
+        for vendor_id, order_day, count, gross in db.query(
+            orders.vendor_id, day, func.count(orders.id), func.sum(orders.price)
+        ).filter(live).group_by(orders.vendor_id, day):
+            deltas.add(VendorDailySales, (vendor_id, _day(order_day)), orders=count, gross=gross)
+
+        day = func.date(orders.settled_at)
+        for vendor_id, settled_day, payouts in db.query(
+            orders.vendor_id, day, func.sum(orders.payout)
+        ).filter(orders.settled_at.isnot(None)).group_by(orders.vendor_id, day):
+            # What was actually credited, not recomputed under today's plan
+            deltas.add(VendorDailySales, (vendor_id, _day(settled_day)), payouts=payouts or 0)
+            deltas.add(VendorSalesSummary, (vendor_id,), payouts=payouts or 0)
+
+        for vendor_id, listing_id, count, gross in db.query(
+            orders.vendor_id, orders.listing_id, func.count(orders.id), func.sum(orders.price)
+        ).filter(live).group_by(orders.vendor_id, orders.listing_id):
+            deltas.add(VendorListingSales, (vendor_id, listing_id), orders=count, gross=gross)
+
+        vendors = len(deltas.rows[VendorSalesSummary])
+        deltas.flush(db)
+        db.commit()
+        return vendors
+
+    @staticmethod
+    def dashboard(db: Session, vendor_id: int, days: int = 30, weeks: int = 12, top: int = 10) -> dict:
+        """Everything on the dashboard from the rollups: a few primary-key reads"""
+        rate = db.query(VendorPlan.remittance_rate).join(Vendor, Vendor.plan_id == VendorPlan.id).filter(
+            Vendor.id == vendor_id
+        ).scalar()
+        if rate is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Vendor profile not found"
+            )
+        summary = db.get(VendorSalesSummary, vendor_id) or VendorSalesSummary(
+            vendor_id=vendor_id, orders=0, gross=0, escrow=0, payouts=0,
+            **{order_status: 0 for order_status in ORDER_STATUSES}
+        )
+
+        today = datetime.utcnow().date()
+        first_day = today - timedelta(days=days - 1)
+        first_week = today - timedelta(days=today.weekday() + 7 * (weeks - 1))
+        rows: Dict[date, VendorDailySales] = {
+            _day(row.day): row for row in db.query(VendorDailySales).filter(
+                VendorDailySales.vendor_id == vendor_id,
+                VendorDailySales.day >= min(first_day, first_week)
+            )
+        }
+
+        def bucket(start: date, length: int) -> dict:
+            covered = [rows[d] for d in (start + timedelta(days=i) for i in range(length)) if d in rows]
+            return {
+                "orders": sum(row.orders for row in covered),
+                "gross": sum((Decimal(row.gross) for row in covered), ZERO),
+                "payouts": sum((Decimal(row.payouts) for row in covered), ZERO),
+            }
+
+        top_listings = db.query(VendorListingSales, Listing.title).join(
+            Listing, Listing.id == VendorListingSales.listing_id
+        ).filter(
+            VendorListingSales.vendor_id == vendor_id,
+            VendorListingSales.orders > 0
+        ).order_by(VendorListingSales.gross.desc()).limit(top).all()
+
+        return {
+            "vendor_id": vendor_id,
+            "remittance_rate": rate,
+            "orders": summary.orders,
+            "gross": summary.gross,
+            "payouts": summary.payouts,
+            "pending_payouts": PayoutService.payout(Decimal(summary.escrow), rate),
+            "status_counts": {order_status: getattr(summary, order_status) for order_status in ORDER_STATUSES},
+            "daily": [
+                {"day": d, **bucket(d, 1)}
+                for d in (first_day + timedelta(days=i) for i in range(days))
+            ],
+            "weekly": [
+                {"week_start": w, **bucket(w, 7)}
+                for w in (first_week + timedelta(weeks=i) for i in range(weeks))
+            ],
+            "top_listings": [
+                {"listing_id": row.listing_id, "title": title, "orders": row.orders, "gross": row.gross}
+                for row, title in top_listings
+            ],
+        }
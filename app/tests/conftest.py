@@ -0,0 +1,58 @@
+"""
+Shared fixtures. Run from the app directory: ``python -m pytest tests``.
+
+Every test gets an empty database with the current schema: SQLite, or the
+(disposable) one in TEST_DATABASE_URL, e.g. to run the suite on Postgres.
+Settings and the engine are read at import time, so the URL is set before
+either, from a scratch directory so a local .env is not picked up.
+"""
+
+import os
+import sys
+import tempfile
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(tempfile.mkdtemp(prefix="clutterhaven-tests-"))
+os.environ["DATABASE_URL"] = os.environ.get("TEST_DATABASE_URL") or "sqlite:///" + os.path.join(os.getcwd(), "test.db")
+
+import pytest
+
+from db.session import engine, SessionLocal
+from models import Base, Listing, User, Vendor, VendorPlan, Wallet
+from utils.token import TokenClaims
+
+
+@pytest.fixture
+def db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def market(db):
+    """A Basic-plan seller with one active listing and a buyer who can afford it"""
+    plan = VendorPlan(name="Basic", monthly_fee=Decimal("0.00"), remittance_rate=Decimal("92.00"),
+                      max_listings_per_month=10)
+    seller = User(full_name="Seller", email="seller@example.com", password_hash="x", user_type="seller")
+    buyer = User(full_name="Buyer", email="buyer@example.com", password_hash="x", user_type="buyer")
+    db.add_all([plan, seller, buyer])
+    db.flush()
+    vendor = Vendor(user_id=seller.id, plan_id=plan.id)
+    db.add_all([vendor, Wallet(user_id=seller.id, balance=Decimal("0.00")),
+                Wallet(user_id=buyer.id, balance=Decimal("100.00"))])
+    db.flush()
+    listing = Listing(vendor_id=vendor.id, title="Desk lamp", price=Decimal("25.00"),
+                      item_condition="used", category="home")
+    db.add(listing)
+    db.commit()
+    return {
+        "buyer": TokenClaims(user_id=buyer.id, user_type="buyer"),
+        "seller": TokenClaims(user_id=seller.id, user_type="seller", vendor_id=vendor.id),
+        "listing_id": listing.id,
+    }
@@ -0,0 +1,54 @@
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+
+from config import settings
+from models import DeliveryRequest
+from schemas.order import DeliveryRequestCreate
+from services.delivery import DeliveryService
+from services.order import OrderService
+
+
+@pytest.fixture
+def order(db, market, monkeypatch):
+    monkeypatch.setattr(settings, "LOGISTICS_CLIENT", "fake")
+    return OrderService.create_order(db, market["buyer"], market["listing_id"])
+
+
+def _request(db, market, order):
+    return DeliveryService.create_request(
+        db, market["buyer"], DeliveryRequestCreate(order_id=order.id, dispatch_option="pickup")
+    )
+
+
+def test_second_request_for_an_order_conflicts(db, market, order):
+    _request(db, market, order)
+
+    with pytest.raises(HTTPException) as error:
+        _request(db, market, order)
+
+    assert error.value.status_code == 409
+    assert db.query(DeliveryRequest).filter(DeliveryRequest.order_id == order.id).count() == 1
+
+
+def test_failed_request_can_be_retried(db, market, order):
+    first = _request(db, market, order)
+    first.delivery_status = "failed"
+    db.commit()
+
+    retry = _request(db, market, order)
+
+    assert retry.id != first.id and retry.delivery_status == "pending"
+
+
+def test_database_refuses_a_second_live_request(db, market, order):
+    # What a request racing past the pre-insert check runs into
+    _request(db, market, order)
+    db.add(DeliveryRequest(order_id=order.id, dispatch_option="pickup", delivery_status="pending",
+                           created_at=datetime.utcnow()))
+
+    with pytest.raises(IntegrityError):
+        db.commit()
+    db.rollback()
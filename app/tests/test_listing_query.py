@@ -0,0 +1,29 @@
+import pytest
+from fastapi import HTTPException
+
+from services.listing_query import ListingQueryBuilder
+
+
+@pytest.mark.parametrize("sort", ["ranked", "newest", "price_asc", "price_desc", "relevance"])
+def test_search_without_category_or_vendor_is_rejected(sort):
+    with pytest.raises(HTTPException) as rejected:
+        ListingQueryBuilder(search="lamp", sort=sort)
+    assert rejected.value.status_code == 400
+
+
+@pytest.mark.parametrize("anchor", [dict(category="home"), dict(vendor_id=1)])
+def test_search_within_category_or_vendor_is_accepted(anchor):
+    builder = ListingQueryBuilder(search="lamp", sort="newest", **anchor)
+    assert builder.plan.endswith("_created")
+
+
+def test_relevance_still_requires_a_search_term():
+    with pytest.raises(HTTPException) as rejected:
+        ListingQueryBuilder(category="home", sort="relevance")
+    assert rejected.value.detail == "relevance sort requires a search term"
+
+
+def test_search_filters_within_category(db, market):
+    found = ListingQueryBuilder(search="lamp", category="home", sort="newest").build(db).all()
+    assert [listing.id for listing in found] == [market["listing_id"]]
+    assert ListingQueryBuilder(search="lamp", category="books").build(db).all() == []
@@ -0,0 +1,63 @@
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException
+
+from models import Order, Wallet
+from services.order import OrderService
+
+
+def _shipped_order(db, market) -> Order:
+    order = OrderService.create_order(db, market["buyer"], market["listing_id"])
+    for step in ("confirmed", "shipped"):
+        OrderService.update_status(db, market["seller"], order.id, step)
+    return order
+
+
+def _balance(db, user_id: int) -> Decimal:
+    return db.query(Wallet.balance).filter(Wallet.user_id == user_id).scalar()
+
+
+def test_buyer_confirms_shipped_order(db, market):
+    order = _shipped_order(db, market)
+
+    OrderService.confirm_delivery(db, market["buyer"].user_id, order.id)
+
+    db.refresh(order)
+    assert order.status == "delivered" and order.settled_at is not None
+    assert _balance(db, market["seller"].user_id) == Decimal("23.00")
+
+
+def test_buyer_confirms_after_seller_marks_delivered(db, market):
+    order = _shipped_order(db, market)
+    OrderService.update_status(db, market["seller"], order.id, "delivered")
+    db.refresh(order)
+    delivered_at = order.delivered_at
+
+    OrderService.confirm_delivery(db, market["buyer"].user_id, order.id)
+
+    db.refresh(order)
+    assert order.status == "delivered" and order.settled_at is not None
+    assert order.delivered_at == delivered_at  # the seller's delivery time is kept
+    assert _balance(db, market["seller"].user_id) == Decimal("23.00")
+
+
+def test_confirming_twice_pays_once(db, market):
+    order = _shipped_order(db, market)
+    OrderService.confirm_delivery(db, market["buyer"].user_id, order.id)
+
+    with pytest.raises(HTTPException) as error:
+        OrderService.confirm_delivery(db, market["buyer"].user_id, order.id)
+
+    assert error.value.status_code == 400
+    assert _balance(db, market["seller"].user_id) == Decimal("23.00")
+
+
+def test_unshipped_order_cannot_be_confirmed(db, market):
+    order = OrderService.create_order(db, market["buyer"], market["listing_id"])
+
+    with pytest.raises(HTTPException) as error:
+        OrderService.confirm_delivery(db, market["buyer"].user_id, order.id)
+
+    assert error.value.status_code == 400
+    assert _balance(db, market["seller"].user_id) == Decimal("0.00")
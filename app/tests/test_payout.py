@@ -0,0 +1,142 @@
+"""
+The payout formula exists three times: SQL (settlement), NumPy (batches and
+reconciliation) and the migration 0008 backfill. These pin all three to
+rounding half up to the cent, on exact half cents, 0 and 100% rates and
+prices near the integer overflow limits.
+"""
+
+import importlib.util
+import os
+from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+from itertools import product
+
+import numpy as np
+import pytest
+from sqlalchemy import text
+
+from models import Listing, Order, User, Vendor, VendorPlan
+from services.payout import CENTS, PayoutService
+from services.vendor_sales import VendorSalesService
+
+PRICES = ["0.01", "0.03", "0.10", "1.25", "10.10", "19.99", "2147.48", "21474836.47", "99999999.99"]
+RATES = ["0.00", "0.01", "50.00", "92.00", "92.50", "95.00", "99.99", "100.00"]
+CASES = [(Decimal(price), Decimal(rate)) for price, rate in product(PRICES, RATES)]
+
+
+def _expected(price: Decimal, rate: Decimal) -> Decimal:
+    return (price * rate / 100).quantize(CENTS, ROUND_HALF_UP)
+
+
+def _migration_0008():
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        "alembic", "versions", "0008_order_payouts.py")
+    spec = importlib.util.spec_from_file_location("migration_0008", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def settled_orders(db):
+    """One settled order per (price, rate) case, payout not yet stored"""
+    buyer = User(full_name="Buyer", email="buyer@example.com", password_hash="x", user_type="buyer")
+    db.add(buyer)
+    plans = {rate: VendorPlan(name=f"plan {rate}", monthly_fee=Decimal("0.00"), remittance_rate=Decimal(rate),
+                              max_listings_per_month=-1) for rate in RATES}
+    db.add_all(plans.values())
+    db.flush()
+    vendors = {}
+    for rate, plan in plans.items():
+        seller = User(full_name="Seller", email=f"seller-{rate}@example.com", password_hash="x", user_type="seller")
+        db.add(seller)
+        db.flush()
+        vendors[rate] = Vendor(user_id=seller.id, plan_id=plan.id)
+    db.add_all(vendors.values())
+    db.flush()
+
+    now = datetime.utcnow()
+    cases = {}
+    for price, rate in CASES:
+        vendor = vendors[str(rate)]
+        listing = Listing(vendor_id=vendor.id, title="Case", price=price, item_condition="new",
+                          category="test", status="sold")
+        db.add(listing)
+        db.flush()
+        order = Order(buyer_id=buyer.id, listing_id=listing.id, vendor_id=vendor.id, price=price,
+                      status="delivered", ordered_at=now, delivered_at=now, settled_at=now)
+        db.add(order)
+        db.flush()
+        cases[order.id] = (price, rate)
+    db.commit()
+    return cases
+
+
+def _stored_payouts(db) -> dict:
+    return {order_id: Decimal(payout).quantize(CENTS) for order_id, payout in db.query(Order.id, Order.payout)}
+
+
+@pytest.mark.parametrize("price,rate", CASES)
+def test_numpy_and_decimal_forms_round_half_up(price, rate):
+    cents = PayoutService.payout_cents(PayoutService.to_cents(price), PayoutService.rate_bps(rate))
+    assert Decimal(int(cents)) * CENTS == _expected(price, rate)
+    assert PayoutService.payout(price, rate) == _expected(price, rate)
+
+
+def test_numpy_form_on_arrays():
+    prices = np.array([PayoutService.to_cents(price) for price, _ in CASES], dtype=np.int64)
+    rates = np.array([PayoutService.rate_bps(rate) for _, rate in CASES], dtype=np.int64)
+    expected = [PayoutService.to_cents(_expected(price, rate)) for price, rate in CASES]
+    assert PayoutService.payout_cents(prices, rates).tolist() == expected
+
+
+def test_exact_half_cents_round_up():
+    assert PayoutService.payout(Decimal("0.01"), Decimal("50.00")) == Decimal("0.01")
+    assert PayoutService.payout(Decimal("0.03"), Decimal("50.00")) == Decimal("0.02")
+    assert PayoutService.payout(Decimal("1.25"), Decimal("50.00")) == Decimal("0.63")
+
+
+def test_settlement_sql_matches(db, settled_orders):
+    db.query(Order).update({"payout": PayoutService.order_payout()}, synchronize_session=False)
+    db.commit()
+
+    stored = _stored_payouts(db)
+    assert {order_id: stored[order_id] for order_id in settled_orders} == {
+        order_id: _expected(price, rate) for order_id, (price, rate) in settled_orders.items()
+    }
+
+
+def test_migration_0008_backfill_matches(db, settled_orders):
+    db.execute(text(_migration_0008().BACKFILL))
+    db.commit()
+
+    stored = _stored_payouts(db)
+    assert {order_id: stored[order_id] for order_id in settled_orders} == {
+        order_id: _expected(price, rate) for order_id, (price, rate) in settled_orders.items()
+    }
+
+
+def test_reconcile_is_clean_after_settlement(db, settled_orders):
+    db.query(Order).update({"payout": PayoutService.order_payout()}, synchronize_session=False)
+    VendorSalesService.rebuild(db)
+    db.commit()
+
+    assert PayoutService.reconcile(db) == {
+        "plans_rate_not_percentage": 2,  # the 0% and 0.01% plans look like fractions
+        "settled_orders_without_payout": 0,
+        "payouts_above_gross": 0,
+        "sql_numpy_disagreements": 0,
+        "vendors_rollup_mismatch": 0,
+    }
+
+
+def test_reconcile_catches_a_wrong_payout(db, settled_orders):
+    db.query(Order).update({"payout": PayoutService.order_payout()}, synchronize_session=False)
+    VendorSalesService.rebuild(db)
+    order_id = next(iter(settled_orders))
+    db.query(Order).filter(Order.id == order_id).update({"payout": Order.price + 1}, synchronize_session=False)
+    db.commit()
+
+    checks = PayoutService.reconcile(db)
+    assert checks["payouts_above_gross"] == 1
+    assert checks["vendors_rollup_mismatch"] == 1
@@ -0,0 +1,40 @@
+import pytest
+from starlette.requests import Request
+
+from config import settings
+from utils.rate_limit import client_ip
+
+
+def _request(forwarded=None) -> Request:
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded is not None else []
+    return Request({"type": "http", "headers": headers, "client": ("10.0.0.9", 5000)})
+
+
+@pytest.fixture
+def behind_proxies(monkeypatch):
+    def configure(hops: int):
+        monkeypatch.setattr(settings, "RATE_LIMIT_TRUST_FORWARDED", True)
+        monkeypatch.setattr(settings, "RATE_LIMIT_TRUSTED_HOPS", hops)
+    return configure
+
+
+def test_forwarded_header_ignored_unless_trusted():
+    assert client_ip(_request("198.51.100.7")) == "10.0.0.9"
+
+
+def test_spoofed_entries_are_skipped(behind_proxies):
+    behind_proxies(1)
+    # The client sent "1.2.3.4"; the proxy appended the address it saw
+    assert client_ip(_request("1.2.3.4, 198.51.100.7")) == "198.51.100.7"
+
+
+def test_trusted_hops_count_from_the_right(behind_proxies):
+    behind_proxies(2)
+    assert client_ip(_request("1.2.3.4, 198.51.100.7, 10.0.0.2")) == "198.51.100.7"
+    # Fewer entries than hops: every one came from a proxy, take the oldest
+    assert client_ip(_request("198.51.100.7")) == "198.51.100.7"
+
+
+def test_empty_header_falls_back_to_peer(behind_proxies):
+    behind_proxies(1)
+    assert client_ip(_request(" , ")) == "10.0.0.9"
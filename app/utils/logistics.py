@@ -0,0 +1,131 @@
+"""
+Logistics partner clients used by the delivery dispatcher.
+
+A client takes whole batches of shipments and reports on many tracking
+references at once, so partner traffic grows with the number of batches,
+not orders. Pick the implementation with LOGISTICS_CLIENT:
+
+- ``http`` (default): the partner's batch API at LOGISTICS_PARTNER_URLS[partner]
+- ``fake``: in-process, accepts everything and delivers on a later poll
+  (development, load tests and benchmarks); must be chosen explicitly
+
+Shipment ``request_id``s double as idempotency keys: a batch retried after
+a timeout must not create a second shipment.
+"""
+
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+import httpx
+
+from config import settings
+
+# Statuses a partner may report for a tracking reference
+TRACKING_STATUSES = ("in_transit", "delivered", "failed")
+
+
+class LogisticsClient(ABC):
+    """Interface every partner client implements"""
+
+    @abstractmethod
+    def submit(self, shipments: List[dict]) -> Dict[int, Optional[str]]:
+        """Book ``shipments``; returns request_id -> tracking reference, None if rejected.
+
+        Raises if the batch as a whole could not be submitted.
+        """
+
+    @abstractmethod
+    def track(self, references: List[str]) -> Dict[str, str]:
+        """Current status of each known reference (see TRACKING_STATUSES)"""
+
+
+class FakeLogisticsClient(LogisticsClient):
+    def __init__(self, partner: str, latency: float = 0.0, transit_polls: int = 2):
+        self.partner = partner
+        self.latency = latency  # seconds per call, to mimic a remote API
+        self.transit_polls = transit_polls  # track() calls before a shipment shows delivered
+        self.calls = 0
+        self._references: Dict[int, str] = {}
+        self._polls: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _call(self):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def submit(self, shipments: List[dict]) -> Dict[int, Optional[str]]:
+        with self._lock:
+            self._call()
+            for shipment in shipments:
+                request_id = shipment["request_id"]
+                if request_id not in self._references:
+                    reference = f"{self.partner}-{uuid.uuid4().hex[:12]}"
+                    self._references[request_id] = reference
+                    self._polls[reference] = 0
+            return {shipment["request_id"]: self._references[shipment["request_id"]] for shipment in shipments}
+
+    def track(self, references: List[str]) -> Dict[str, str]:
+        with self._lock:
+            self._call()
+            statuses = {}
+            for reference in references:
+                if reference in self._polls:
+                    self._polls[reference] += 1
+                    delivered = self._polls[reference] >= self.transit_polls
+                    statuses[reference] = "delivered" if delivered else "in_transit"
+            return statuses
+
+
+class HttpLogisticsClient(LogisticsClient):
+    """Partner batch API:
+
+    POST {base}/shipments/batch  {"shipments": [...]}
+        -> {"accepted": {"<request_id>": "<reference>"}, "rejected": [<request_id>]}
+    POST {base}/shipments/status {"references": [...]}
+        -> {"statuses": {"<reference>": "<status>"}}
+    """
+
+    def __init__(self, partner: str, base_url: str, timeout: float = 10.0):
+        self.partner = partner
+        self.http = httpx.Client(base_url=base_url, timeout=timeout)
+
+    def submit(self, shipments: List[dict]) -> Dict[int, Optional[str]]:
+        response = self.http.post("/shipments/batch", json={"shipments": shipments})
+        response.raise_for_status()
+        accepted = {int(key): value for key, value in response.json().get("accepted", {}).items()}
+        return {shipment["request_id"]: accepted.get(shipment["request_id"]) for shipment in shipments}
+
+    def track(self, references: List[str]) -> Dict[str, str]:
+        response = self.http.post("/shipments/status", json={"references": references})
+        response.raise_for_status()
+        statuses = response.json().get("statuses", {})
+        return {ref: status for ref, status in statuses.items() if status in TRACKING_STATUSES}
+
+
+def supports(partner: str) -> bool:
+    """Whether requests for ``partner`` can be dispatched"""
+    return settings.LOGISTICS_CLIENT == "fake" or partner in settings.LOGISTICS_PARTNER_URLS
+
+
+def create_client(partner: str) -> LogisticsClient:
+    if settings.LOGISTICS_CLIENT == "fake":
+        return FakeLogisticsClient(partner)
+    if settings.LOGISTICS_CLIENT == "http":
+        if partner not in settings.LOGISTICS_PARTNER_URLS:
+            raise ValueError(f"No LOGISTICS_PARTNER_URLS entry for {partner!r}")
+        return HttpLogisticsClient(partner, settings.LOGISTICS_PARTNER_URLS[partner])
+    raise ValueError(f"Unknown LOGISTICS_CLIENT {settings.LOGISTICS_CLIENT!r}")
+
+
+_clients: Dict[str, LogisticsClient] = {}
+
+
+def client(partner: str) -> LogisticsClient:
+    """The client for ``partner``, created on first use"""
+    if partner not in _clients:
+        _clients[partner] = create_client(partner)
+    return _clients[partner]
@@ -0,0 +1,57 @@
+"""
+In-process counters and gauges, rendered for Prometheus at GET /metrics.
+
+Values are per worker process; scrape each worker or sum them downstream.
+"""
+
+import threading
+from collections import defaultdict
+from typing import Dict, Tuple
+
+Labels = Tuple[Tuple[str, str], ...]
+
+_lock = threading.Lock()
+_counters: Dict[str, Dict[Labels, float]] = defaultdict(dict)
+_gauges: Dict[str, Dict[Labels, float]] = defaultdict(dict)
+_help: Dict[str, str] = {}
+
+
+def _labels(labels: dict) -> Labels:
+    return tuple(sorted(labels.items()))
+
+
+def describe(name: str, text: str):
+    _help[name] = text
+
+
+def inc(name: str, value: float = 1.0, **labels):
+    key = _labels(labels)
+    with _lock:
+        series = _counters[name]
+        series[key] = series.get(key, 0.0) + value
+
+
+def set_gauge(name: str, value: float, **labels):
+    with _lock:
+        _gauges[name][_labels(labels)] = value
+
+
+def value(name: str, **labels) -> float:
+    key = _labels(labels)
+    with _lock:
+        return _counters.get(name, {}).get(key, _gauges.get(name, {}).get(key, 0.0))
+
+
+def render() -> str:
+    """Prometheus text exposition format"""
+    lines = []
+    with _lock:
+        for kind, families in (("counter", _counters), ("gauge", _gauges)):
+            for name, series in sorted(families.items()):
+                if name in _help:
+                    lines.append(f"# HELP {name} {_help[name]}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, number in sorted(series.items()):
+                    label_text = ",".join(f'{key}="{val}"' for key, val in labels)
+                    lines.append(f"{name}{{{label_text}}} {number:g}" if label_text else f"{name} {number:g}")
+    return "\n".join(lines) + "\n"
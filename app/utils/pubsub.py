@@ -0,0 +1,101 @@
+"""
+In-process publish/subscribe for push endpoints.
+
+Subscribers register interest in topics and each gets a small bounded
+queue. Publishing only touches the subscribers of the event's topics, so
+the cost is proportional to the interested connections, not to every open
+one; an idle subscriber costs a queue and a parked coroutine.
+"""
+
+import asyncio
+import json
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Set
+
+# Put in a subscriber's queue after it fell behind and events were dropped
+RESYNC = {"type": "resync"}
+
+
+class Subscription:
+    def __init__(self, bus: "Bus", topics: Set[str], queue_size: int):
+        self.bus = bus
+        self.topics = topics
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+    def deliver(self, event: dict):
+        if self.queue.full():
+            # Slow consumer: drop its backlog and tell it to refetch
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            event = RESYNC
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[dict]:
+        """Next event, or None when ``timeout`` passes first"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Bus:
+    """Topic fan-out bound to the event loop its subscribers run on"""
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._topics: Dict[str, Set[Subscription]] = defaultdict(set)
+
+    def subscribe(self, topics: Iterable[str]) -> Subscription:
+        self.loop = asyncio.get_running_loop()
+        subscription = Subscription(self, set(topics), self.queue_size)
+        for topic in subscription.topics:
+            self._topics[topic].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        for topic in subscription.topics:
+            subscribers = self._topics.get(topic)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._topics[topic]
+
+    def subscriber_count(self) -> int:
+        return len({s for subscribers in self._topics.values() for s in subscribers})
+
+    def _deliver(self, topics: Iterable[str], event: dict):
+        targets = set()
+        for topic in topics:
+            targets.update(self._topics.get(topic, ()))
+        for subscription in targets:
+            subscription.deliver(event)
+
+    def publish(self, topics: Iterable[str], event: dict):
+        """Deliver ``event`` to every subscriber of any of ``topics``; safe from any thread"""
+        if self.loop is None or self.loop.is_closed():
+            return  # nobody has subscribed in this process
+        topics = list(topics)
+        try:
+            on_loop = asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            self._deliver(topics, event)
+        else:
+            self.loop.call_soon_threadsafe(self._deliver, topics, event)
+
+
+def sse_message(event: dict, event_id: Optional[int] = None) -> str:
+    """Encode ``event`` as one Server-Sent Events message"""
+    id_line = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{id_line}event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
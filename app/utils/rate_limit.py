@@ -0,0 +1,177 @@
+"""
+Token-bucket rate limiting.
+
+A bucket holds up to ``capacity`` tokens and refills at ``rate`` tokens per
+second; each request takes one. Bucket state lives in a backend:
+
+    memory  per-process dict (default; limits apply per worker)
+    redis   shared by every worker and host, via one atomic Lua call
+            (needs the optional ``redis`` package and RATE_LIMIT_REDIS_URL)
+    fake    the redis backend against an in-process stand-in client, for
+            exercising the shared path without a server
+"""
+
+import fnmatch
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from fastapi import Request
+
+from config import settings
+
+
+@dataclass(frozen=True)
+class Limit:
+    """``capacity`` requests in a burst, refilled at ``per_minute``"""
+    per_minute: float
+    capacity: int
+
+    @property
+    def rate(self) -> float:
+        return self.per_minute / 60.0
+
+
+def _refill(tokens: float, updated: float, now: float, limit: Limit) -> Tuple[float, float]:
+    """Take one token; returns (tokens left, seconds to wait when none was available)"""
+    tokens = min(limit.capacity, tokens + (now - updated) * limit.rate)
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / limit.rate
+
+
+class MemoryBackend:
+    """Buckets in this process, least recently used evicted past ``max_keys``"""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, limit: Limit, now: Optional[float] = None) -> float:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (limit.capacity, now))
+            tokens, wait = _refill(tokens, updated, now, limit)
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+TAKE_SCRIPT = """
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local rate, capacity, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= 1 then tokens = tokens - 1 else wait = (1 - tokens) / rate end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(wait)
+"""
+
+
+class RedisBackend:
+    """Buckets shared through Redis; the refill-and-take runs as one script"""
+
+    def __init__(self, client, prefix: str = "ratelimit:"):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisBackend":
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis needs the 'redis' package installed")
+        return cls(redis.Redis.from_url(url))
+
+    def take(self, key: str, limit: Limit, now: Optional[float] = None) -> float:
+        now = time.time() if now is None else now
+        wait = self.client.eval(TAKE_SCRIPT, 1, self.prefix + key, limit.rate, limit.capacity, now)
+        return float(wait)
+
+    def clear(self):
+        """Drop this limiter's buckets; other keys in the database are left alone"""
+        batch = []
+        for key in self.client.scan_iter(match=self.prefix + "*", count=1000):
+            batch.append(key)
+            if len(batch) == 1000:
+                self.client.delete(*batch)
+                batch = []
+        if batch:
+            self.client.delete(*batch)
+
+
+class FakeRedis:
+    """Just enough of the redis client for RedisBackend, kept in memory"""
+
+    def __init__(self):
+        self._hashes: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def eval(self, script: str, numkeys: int, key: str, rate: float, capacity: int, now: float) -> str:
+        limit = Limit(per_minute=rate * 60, capacity=capacity)
+        with self._lock:
+            tokens, updated = self._hashes.get(key, (capacity, now))
+            tokens, wait = _refill(tokens, updated, max(now, updated), limit)
+            self._hashes[key] = (tokens, max(now, updated))
+        return str(wait)
+
+    def scan_iter(self, match: str, count: int = 10):
+        with self._lock:
+            keys = [key for key in self._hashes if fnmatch.fnmatchcase(key, match)]
+        return iter(keys)
+
+    def delete(self, *keys: str) -> int:
+        with self._lock:
+            return sum(self._hashes.pop(key, None) is not None for key in keys)
+
+
+def create_backend(name: str):
+    if name == "memory":
+        return MemoryBackend()
+    if name == "redis":
+        return RedisBackend.from_url(settings.RATE_LIMIT_REDIS_URL)
+    if name == "fake":
+        return RedisBackend(FakeRedis())
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND {name!r}")
+
+
+_backend = None
+
+
+def backend():
+    """The configured backend, created on first use"""
+    global _backend
+    if _backend is None:
+        _backend = create_backend(settings.RATE_LIMIT_BACKEND)
+    return _backend
+
+
+def client_ip(request: Request) -> str:
+    """Caller address, taken from X-Forwarded-For only behind a trusted proxy.
+
+    Proxies append the address they saw, so the client can forge every
+    entry except the last RATE_LIMIT_TRUSTED_HOPS; the leftmost of those is
+    the address the outermost trusted proxy was connected from.
+    """
+    if settings.RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = [entry.strip() for entry in request.headers.get("x-forwarded-for", "").split(",")]
+        forwarded = [entry for entry in forwarded if entry]
+        if forwarded:
+            return forwarded[-min(max(settings.RATE_LIMIT_TRUSTED_HOPS, 1), len(forwarded))]
+    return request.client.host if request.client else "unknown"
+
+
+def retry_after_header(wait: float) -> Dict[str, str]:
+    return {"Retry-After": str(max(1, math.ceil(wait)))}
@@ -1,25 +1,241 @@
-from jose import JWTError, jwt
-from datetime import datetime, timedelta
-from app.config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
-from app.schemas.users import TokenData
-from fastapi import HTTPException, status
+"""
+JWT signing and verification.
 
-def create_access_token(data: dict):
+Keys are parsed once per process and looked up by the ``kid`` header, so a
+new signing key can be rolled out while tokens signed with the previous one
+(listed in JWT_VERIFY_KEYS) keep verifying until they expire. Verified
+tokens are cached by hash until their ``exp``, which lets the hot path skip
+signature checks entirely; revoked sessions are refused from an in-memory
+list (see services/session.py) rather than a per-request query.
+"""
+
+import hashlib
+import heapq
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import jwt
+from jwt.algorithms import get_default_algorithms
+
+from config import settings
+
+LEEWAY_SECONDS = 10  # clock skew tolerated on exp
+
+
+@dataclass(frozen=True)
+class TokenClaims:
+    """Identity embedded in an access token"""
+    user_id: int
+    user_type: Optional[str] = None
+    is_admin: bool = False
+    vendor_id: Optional[int] = None
+    session_id: Optional[str] = None
+    exp: float = 0.0
+
+    @property
+    def complete(self) -> bool:
+        """False for tokens issued before claims were embedded"""
+        return self.user_type is not None
+
+
+def _read_key(value: str) -> str:
+    """Key material given inline or as a path to a PEM file"""
+    if value and os.path.isfile(value):
+        with open(value) as f:
+            return f.read()
+    return value
+
+
+class KeyRing:
+    """Signing key plus every key still accepted for verification"""
+
+    def __init__(self, algorithm: str, key_id: str, signing_key: str, verify_keys: Dict[str, str]):
+        self.algorithm = algorithm
+        self.key_id = key_id
+        self._algorithm = get_default_algorithms()[algorithm]
+        self.signing_key = self._algorithm.prepare_key(signing_key)
+
+        self.verify_keys = {kid: self._algorithm.prepare_key(_read_key(key)) for kid, key in verify_keys.items()}
+        if key_id not in self.verify_keys:
+            # Asymmetric: verify our own tokens with the signing key's public half
+            own = self.signing_key.public_key() if hasattr(self.signing_key, "public_key") else self.signing_key
+            self.verify_keys[key_id] = own
+
+    @classmethod
+    def from_settings(cls) -> "KeyRing":
+        if settings.ALGORITHM.startswith("HS"):
+            signing_key = settings.SECRET_KEY
+        else:
+            signing_key = _read_key(settings.JWT_PRIVATE_KEY)
+            if not signing_key:
+                raise RuntimeError(f"JWT_PRIVATE_KEY is required for {settings.ALGORITHM}")
+        return cls(settings.ALGORITHM, settings.JWT_KEY_ID, signing_key, settings.JWT_VERIFY_KEYS)
+
+    def key_for(self, token: str):
+        """Verification key named by the token's kid (tokens without one use ours)"""
+        kid = jwt.get_unverified_header(token).get("kid", self.key_id)
+        key = self.verify_keys.get(kid)
+        if key is None:
+            raise jwt.InvalidKeyError(f"Unknown key id {kid!r}")
+        return key
+
+
+@lru_cache(maxsize=None)
+def key_ring() -> KeyRing:
+    return KeyRing.from_settings()
+
+
+class TokenCache:
+    """Bounded LRU of token hash -> claims, each entry valid until the token's exp"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[bytes, TokenClaims]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[TokenClaims]:
+        key = self._key(token)
+        with self._lock:
+            claims = self._entries.get(key)
+            if claims is None:
+                return None
+            if claims.exp + LEEWAY_SECONDS < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return claims
+
+    def put(self, token: str, claims: TokenClaims):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[self._key(token)] = claims
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RevocationList:
+    """Session ids whose access tokens must be refused before they expire.
+
+    An entry only has to outlive the longest access token, so the set holds
+    just the sessions revoked in the last ACCESS_TOKEN_EXPIRE_MINUTES and a
+    lookup is a dict hit. Expiries are also kept in a heap, so pruning only
+    touches the entries that have expired; syncs re-adding the same
+    revocations push nothing.
+    """
+
+    def __init__(self):
+        self._revoked: Dict[str, float] = {}  # sid -> time its last access token expires
+        self._expiries: List[Tuple[float, str]] = []  # heap of (until, sid), stale once an entry is extended
+        self._lock = threading.Lock()
+
+    def add(self, session_id: str, until: float):
+        with self._lock:
+            if until > self._revoked.get(session_id, 0.0):
+                self._revoked[session_id] = until
+                heapq.heappush(self._expiries, (until, session_id))
+            now = time.time()
+            while self._expiries and self._expiries[0][0] < now:
+                expires, sid = heapq.heappop(self._expiries)
+                if self._revoked.get(sid) == expires:
+                    del self._revoked[sid]
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._revoked
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+    def clear(self):
+        with self._lock:
+            self._revoked.clear()
+            self._expiries.clear()
+
+
+token_cache = TokenCache(settings.TOKEN_CACHE_SIZE)
+revocations = RevocationList()
+
+
+def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    """Sign ``data`` with the current key, stamping its kid and an exp"""
+    ring = key_ring()
     to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-
-def decode_access_token(token: str):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-    )
+    expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
+    to_encode["exp"] = expire
+
+    # Ensure sub is stored as string for consistency
+    if "sub" in to_encode and isinstance(to_encode["sub"], int):
+        to_encode["sub"] = str(to_encode["sub"])
+
+    return jwt.encode(to_encode, ring.signing_key, algorithm=ring.algorithm, headers={"kid": ring.key_id})
+
+
+def decode_token(token: str) -> Optional[dict]:
+    """Verify signature and expiry; returns the payload or None"""
+    ring = key_ring()
+    try:
+        return jwt.decode(
+            token,
+            ring.key_for(token),
+            algorithms=[ring.algorithm],
+            leeway=timedelta(seconds=LEEWAY_SECONDS),
+            options={"require": ["exp", "sub"]},
+        )
+    except jwt.PyJWTError:
+        return None
+
+
+def access_token_ttl() -> float:
+    """Seconds an access token can stay acceptable after it is issued"""
+    return settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60 + LEEWAY_SECONDS
+
+
+def verify_access_token(token: str) -> Optional[TokenClaims]:
+    """Claims for a valid, unrevoked token, from the cache when it was seen before"""
+    claims = token_cache.get(token)
+    if claims is None:
+        claims = _verify(token)
+    if claims is None or (claims.session_id is not None and claims.session_id in revocations):
+        return None
+    return claims
+
+
+def still_valid(claims: TokenClaims) -> bool:
+    """Whether claims verified earlier are still unexpired and unrevoked (for long-lived streams)"""
+    if claims.exp + LEEWAY_SECONDS < time.time():
+        return False
+    return claims.session_id is None or claims.session_id not in revocations
+
+
+def _verify(token: str) -> Optional[TokenClaims]:
+    payload = decode_token(token)
+    if payload is None:
+        return None
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-        return TokenData(email=email)
-    except JWTError:
-        raise credentials_exception
\ No newline at end of file
+        vendor_id = payload.get("vid")
+        claims = TokenClaims(
+            user_id=int(payload["sub"]),
+            user_type=payload.get("user_type"),
+            is_admin=bool(payload.get("is_admin", False)),
+            vendor_id=int(vendor_id) if vendor_id is not None else None,
+            session_id=payload.get("sid"),
+            exp=float(payload["exp"]),
+        )
+    except (ValueError, TypeError):
+        return None
+    token_cache.put(token, claims)
+    return claims